@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+"""Compares container-targeted operations (exec and archive upload)
+sent through swarm manager against the ones sent directly to node's
+daemon.
+
+Requires a running cluster managed by docker-machine.
+
+Usage::
+
+    python benchmarks/bench_docker_routing.py MASTER_NODE NODE CONTAINER \\
+        [-n ITERATIONS] [-s SIZE_KB]
+"""
+import argparse
+import os
+import time
+
+from gluuengine.dockerclient import Docker
+from gluuengine.machine import Machine
+from gluuengine.setup.artifacts import make_bundle
+
+
+def run(docker, container, bundle, iterations):
+    start = time.time()
+    for _ in xrange(iterations):
+        docker.exec_cmd(container, "true")
+    exec_elapsed = time.time() - start
+
+    start = time.time()
+    for _ in xrange(iterations):
+        docker.put_bundle(container, "/tmp/bench", bundle, create_dir=False)
+    put_elapsed = time.time() - start
+    return exec_elapsed, put_elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("master_node")
+    parser.add_argument("node")
+    parser.add_argument("container")
+    parser.add_argument("-n", "--iterations", type=int, default=50)
+    parser.add_argument("-s", "--size", type=int, default=256,
+                        help="size of uploaded file (in KB)")
+    args = parser.parse_args()
+
+    machine = Machine()
+    docker = Docker(machine.config(args.node),
+                    machine.swarm_config(args.master_node))
+    bundle = make_bundle({"payload": os.urandom(args.size * 1024)})
+    docker.exec_cmd(args.container, "mkdir -p /tmp/bench")
+
+    for name, route_to_node in [("swarm", False), ("node", True)]:
+        docker.route_to_node = route_to_node
+        exec_elapsed, put_elapsed = run(docker, args.container, bundle,
+                                        args.iterations)
+        print("{:<6} exec {:.1f}ms/op, put_archive ({}KB) {:.1f}ms/op".format(
+            name,
+            exec_elapsed / args.iterations * 1000,
+            args.size,
+            put_elapsed / args.iterations * 1000,
+        ))
+
+    docker.exec_cmd(args.container, "rm -rf /tmp/bench")
+
+
+if __name__ == "__main__":
+    main()
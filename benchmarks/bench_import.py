@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+"""Measures the cost of importing ``gluuengine.app`` and creating the app.
+
+Each sample runs in a fresh interpreter, so module caches don't skew
+the result.
+
+Usage::
+
+    python benchmarks/bench_import.py [-n SAMPLES]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+SNIPPETS = {
+    "import": "import gluuengine.app",
+    "create_app": "from gluuengine.app import create_app; create_app()",
+    "cli_app": "from gluuengine.app import create_app; "
+               "create_app(register_api=False)",
+}
+
+TIMER = """
+import time
+start = time.time()
+{}
+print(time.time() - start)
+"""
+
+
+def measure(snippet, samples):
+    env = dict(os.environ, API_ENV="test")
+    results = []
+    for _ in range(samples):
+        output = subprocess.check_output(
+            [sys.executable, "-c", TIMER.format(snippet)],
+            env=env,
+        )
+        results.append(float(output.strip().splitlines()[-1]))
+    results.sort()
+    return results[len(results) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--samples", type=int, default=10)
+    args = parser.parse_args()
+
+    for name, snippet in sorted(SNIPPETS.items()):
+        median = measure(snippet, args.samples)
+        print("{:<12} median={:.1f}ms".format(name, median * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+"""Measures TLS handshakes per second and request latency of nginx
+containers, e.g. a node created with docker-proxy (default) against
+a node created with ``DOCKER_USERLAND_PROXY=false``.
+
+Each request opens a new connection (without session resumption),
+so every request pays a full TLS handshake.
+
+Usage::
+
+    python benchmarks/bench_nginx_edge.py proxy=NODE1_IP nat=NODE2_IP \\
+        [-c CONCURRENCY] [-d DURATION] [-p PATH]
+"""
+import argparse
+import socket
+import ssl
+import threading
+import time
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    idx = min(int(round(pct / 100.0 * len(values))) - 1, len(values) - 1)
+    return values[max(idx, 0)]
+
+
+def make_context():
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    return ctx
+
+
+def worker(host, port, path, deadline, results):
+    ctx = make_context()
+    request = "GET {} HTTP/1.1\r\nHost: {}\r\nConnection: close\r\n\r\n".format(
+        path, host,
+    )
+
+    while time.time() < deadline:
+        start = time.time()
+        sock = None
+        try:
+            sock = ctx.wrap_socket(socket.create_connection((host, port), 5),
+                                   server_hostname=host)
+            handshake = time.time() - start
+
+            sock.sendall(request)
+            # status line is enough; the rest is discarded
+            sock.recv(4096)
+            latency = time.time() - start
+        except (socket.error, ssl.SSLError):
+            results["errors"] += 1
+            continue
+        finally:
+            if sock is not None:
+                sock.close()
+
+        results["handshakes"].append(handshake)
+        results["latencies"].append(latency)
+
+
+def run(host, port, path, concurrency, duration):
+    results = {"handshakes": [], "latencies": [], "errors": 0}
+    deadline = time.time() + duration
+
+    threads = [
+        threading.Thread(target=worker,
+                         args=(host, port, path, deadline, results))
+        for _ in xrange(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("targets", nargs="+",
+                        help="LABEL=HOST[:PORT] of each nginx")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-d", "--duration", type=int, default=30,
+                        help="duration of each run (in seconds)")
+    parser.add_argument("-p", "--path", default="/")
+    args = parser.parse_args()
+
+    for target in args.targets:
+        label, _, addr = target.partition("=")
+        host, _, port = addr.partition(":")
+
+        results = run(host, int(port or 443), args.path,
+                      args.concurrency, args.duration)
+        print("{:<8} {:.0f} handshakes/s, handshake p99 {:.1f}ms, "
+              "request p50 {:.1f}ms p99 {:.1f}ms, {} errors".format(
+                  label,
+                  len(results["handshakes"]) / float(args.duration),
+                  percentile(results["handshakes"], 99) * 1000,
+                  percentile(results["latencies"], 50) * 1000,
+                  percentile(results["latencies"], 99) * 1000,
+                  results["errors"],
+              ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+"""Compares rendering setup templates using a fresh jinja environment
+(per setup object) against the shared template registry.
+
+Usage::
+
+    python benchmarks/bench_render.py [-n ITERATIONS]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import timeit
+
+from jinja2 import Environment
+from jinja2 import PackageLoader
+
+from gluuengine.setup.templates import TemplateRegistry
+
+TEMPLATES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "gluuengine",
+    "templates",
+)
+
+NGINX_CTX = {
+    "ox_cluster_hostname": "ox.example.com",
+    "cert_file": "/etc/certs/nginx.crt",
+    "key_file": "/etc/certs/nginx.key",
+}
+
+LDAP_CTX = {
+    "ldap_binddn": "cn=directory manager,o=gluu",
+    "encoded_ox_ldap_pw": "secret",
+    "ldap_hosts": "ldap.example.com:1636",
+    "inumAppliance": "@!1234",
+    "certFolder": "/etc/certs",
+}
+
+
+def render_fresh():
+    env = Environment(loader=PackageLoader("gluuengine", "templates"))
+    env.get_template("nginx/gluu_https.conf").render(**NGINX_CTX)
+    env.get_template("_shared/ox-ldap.properties").render(**LDAP_CTX)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        registry = TemplateRegistry(TEMPLATES_DIR, cache_dir)
+        registry.precompile()
+
+        def render_shared():
+            registry.render("nginx/gluu_https.conf", NGINX_CTX)
+            registry.render("_shared/ox-ldap.properties", LDAP_CTX)
+
+        def render_cold():
+            # new process with warm bytecode cache
+            TemplateRegistry(TEMPLATES_DIR, cache_dir).render(
+                "nginx/gluu_https.conf", NGINX_CTX,
+            )
+
+        for name, func in [("fresh env", render_fresh),
+                           ("cold registry", render_cold),
+                           ("shared registry", render_shared)]:
+            elapsed = timeit.timeit(func, number=args.iterations)
+            print("{:<16} {:.3f}ms/op".format(
+                name, elapsed / args.iterations * 1000,
+            ))
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+"""Compares the former round-robin scale-in loop against the heap-based
+victim selection.
+
+Usage::
+
+    python benchmarks/bench_scale_in.py [-c CONTAINERS] [-n NODES]
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+from datetime import timedelta
+from itertools import cycle
+
+from gluuengine.placement.scalein import select_victims
+
+
+class FakeContainer(object):
+    def __init__(self, node_id, created_at):
+        self.node_id = node_id
+        self.created_at = created_at
+        self.container_attrs = {}
+
+
+def select_round_robin(containers, number, node_ids):
+    node_id_pool = cycle(node_ids)
+    containers_reorder = []
+    while True:
+        nid = node_id_pool.next()
+        for con in containers:
+            if con.node_id == nid and con not in containers_reorder:
+                containers_reorder.append(con)
+                break
+        if len(containers_reorder) == number:
+            break
+    return containers_reorder
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--containers", type=int, default=5000)
+    parser.add_argument("-n", "--nodes", type=int, default=50)
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    node_ids = ["node-{}".format(i) for i in xrange(args.nodes)]
+    containers = [
+        FakeContainer(random.choice(node_ids),
+                      now - timedelta(seconds=random.randint(0, 86400)))
+        for _ in xrange(args.containers)
+    ]
+    number = args.containers // 2
+
+    for name, func in [
+        ("round-robin", lambda: select_round_robin(containers, number, node_ids)),
+        ("heap", lambda: select_victims(containers, number)),
+    ]:
+        start = time.time()
+        func()
+        print("{:<12} {:.3f}s ({} of {} containers)".format(
+            name, time.time() - start, number, args.containers,
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,37 +6,16 @@
 '''The app module, containing the app factory function.'''
 import os
 
-from crochet import setup as crochet_setup
 from flask import Flask
+from flask_restful import Api
+from werkzeug.utils import import_string
 
 from .settings import ProdConfig
 from .settings import DevConfig
 from .settings import TestConfig
-from .extensions import restapi
 from .extensions import ma
 from .extensions import db
 from .extensions import migrate
-from .resource import NodeResource
-from .resource import NodeListResource
-from .resource import CreateNodeResource
-from .resource import ClusterResource
-from .resource import ClusterListResource
-from .resource import ProviderResource
-from .resource import ProviderListResource
-from .resource import CreateProviderResource
-from .resource import LicenseKeyListResource
-from .resource import LicenseKeyResource
-from .resource import ContainerLogResource
-from .resource import ContainerLogSetupResource
-from .resource import ContainerLogTeardownResource
-from .resource import ContainerLogListResource
-from .resource import ContainerListResource
-from .resource import ContainerResource
-from .resource import NewContainerResource
-from .resource import ScaleContainerResource
-from .resource import LdapSettingResource
-from .setup.signals import connect_setup_signals
-from .setup.signals import connect_teardown_signals
 from .log import configure_global_logging
 
 
@@ -52,7 +31,13 @@ def _get_config_object(api_env=""):
     return config
 
 
-def create_app():
+def create_app(register_api=True):
+    """Creates the app.
+
+    :param register_api: Whether to register REST API resources;
+                         CLI commands which don't serve requests
+                         can skip it to avoid importing the resources.
+    """
     configure_global_logging()
 
     api_env = os.environ.get("API_ENV")
@@ -67,97 +52,154 @@ def create_app():
         silent=True,
     )
 
-    register_resources()
     register_extensions(app)
+    if register_api:
+        register_resources(app)
+
+    # reactor is only needed when serving requests or running background
+    # tasks, hence CLI commands don't have to pay the cost
+    app.before_first_request(init_reactor)
+    return app
+
+
+def init_reactor():
+    """Starts crochet/twisted reactor and connects setup signals.
+
+    Calling this function multiple times is safe.
+    """
+    from crochet import setup as crochet_setup
+    from .setup.signals import connect_setup_signals
+    from .setup.signals import connect_teardown_signals
 
     crochet_setup()
     connect_setup_signals()
     connect_teardown_signals()
-    return app
 
 
 def register_extensions(app):  # pragma: no cover
-    restapi.init_app(app)
     db.init_app(app)
     ma.init_app(app)
     migrate.init_app(app)
 
 
-def register_resources():  # pragma: no cover
-    restapi.add_resource(CreateNodeResource,
-                         '/nodes/<string:node_type>',
-                         endpoint='create_node')
-    restapi.add_resource(NodeListResource, '/nodes', endpoint='node_list')
-    restapi.add_resource(NodeResource,
-                         '/nodes/<string:node_name>',
-                         endpoint='node')
-
-    restapi.add_resource(ContainerLogResource,
-                         '/container_logs/<container_name>',
-                         endpoint="containerlog",
-                         )
-    restapi.add_resource(ContainerLogSetupResource,
-                         '/container_logs/<container_name>/setup',
-                         endpoint="containerlog_setup",
-                         )
-    restapi.add_resource(ContainerLogTeardownResource,
-                         '/container_logs/<container_name>/teardown',
-                         endpoint="containerlog_teardown",
-                         )
-    restapi.add_resource(ContainerLogListResource,
-                         '/container_logs',
-                         endpoint="containerlog_list",
-                         )
-
-    restapi.add_resource(ClusterListResource,
-                         '/clusters',
-                         endpoint="cluster_list",
-                         )
-    restapi.add_resource(ClusterResource,
-                         '/clusters/<string:cluster_id>',
-                         endpoint="cluster",
-                         )
-
-    restapi.add_resource(ProviderResource,
-                         "/providers/<string:provider_id>",
-                         endpoint="provider")
-    restapi.add_resource(ProviderListResource,
-                         "/providers",
-                         "/filter-providers/<string:provider_type>",
-                         endpoint="provider_list")
-    restapi.add_resource(CreateProviderResource,
-                         "/providers/<string:provider_type>",
-                         endpoint="create_provider")
-
-    restapi.add_resource(LicenseKeyListResource, "/license_keys",
-                         endpoint="licensekey_list")
-    restapi.add_resource(LicenseKeyResource,
-                         "/license_keys/<string:license_key_id>",
-                         endpoint="licensekey")
-
-    restapi.add_resource(ContainerListResource,
-                         "/containers",
-                         "/filter-containers/<string:container_type>",
-                         endpoint="container_list",
-                         )
-    restapi.add_resource(ContainerResource,
-                         "/containers/<string:container_id>",
-                         endpoint="container",
-                         )
-    restapi.add_resource(NewContainerResource,
-                         "/containers/<string:container_type>",
-                         endpoint="new_container",
-                         )
-    restapi.add_resource(ScaleContainerResource,
-                         "/scale-containers/<string:container_type>/<int:number>",
-                         endpoint="scale_container",
-                         )
-
-    restapi.add_resource(LdapSettingResource,
-                         "/settings/ldap",
-                         endpoint="ldap_setting",
-                         )
-
-
-# to satisfy Flask>=0.11, use this as FLASK_APP value
-_application = create_app()
+def add_resource(api, import_path, *urls, **kwargs):
+    """Registers resource by its import path.
+
+    :param api: An instance of :class:`flask_restful.Api`.
+    :param import_path: Import path to resource class in ``module:class``
+                        format.
+    :param urls: URL rules of the resource.
+    :param kwargs: Keyword arguments passed to ``Api.add_resource``.
+    """
+    api.add_resource(import_string(import_path), *urls, **kwargs)
+
+
+def register_resources(app):  # pragma: no cover
+    # each app has its own ``Api``, hence creating more than one app
+    # in a process won't register the same endpoints twice
+    api = Api(app, catch_all_404s=True)
+
+    add_resource(api, "gluuengine.resource.node:CreateNodeResource",
+                 '/nodes/<string:node_type>',
+                 endpoint='create_node')
+    add_resource(api, "gluuengine.resource.node:NodeListResource",
+                 '/nodes',
+                 endpoint='node_list')
+    add_resource(api, "gluuengine.resource.node:NodeResource",
+                 '/nodes/<string:node_name>',
+                 endpoint='node')
+
+    add_resource(api, "gluuengine.resource.node:NodeStatsResource",
+                 '/nodes/<string:node_name>/stats',
+                 endpoint='node_stats')
+
+    add_resource(api, "gluuengine.resource.node:NodeCpusetResource",
+                 '/nodes/<string:node_name>/cpuset',
+                 endpoint='node_cpuset')
+
+    add_resource(api, "gluuengine.resource.container:ContainerLogResource",
+                 '/container_logs/<container_name>',
+                 endpoint="containerlog")
+    add_resource(api, "gluuengine.resource.container:ContainerLogSetupResource",
+                 '/container_logs/<container_name>/setup',
+                 endpoint="containerlog_setup")
+    add_resource(api, "gluuengine.resource.container:ContainerLogTeardownResource",
+                 '/container_logs/<container_name>/teardown',
+                 endpoint="containerlog_teardown")
+    add_resource(api, "gluuengine.resource.container:ContainerLogListResource",
+                 '/container_logs',
+                 endpoint="containerlog_list")
+
+    add_resource(api, "gluuengine.resource.cluster:ClusterListResource",
+                 '/clusters',
+                 endpoint="cluster_list")
+    add_resource(api, "gluuengine.resource.cluster:ClusterResource",
+                 '/clusters/<string:cluster_id>',
+                 endpoint="cluster")
+
+    add_resource(api, "gluuengine.resource.provider:ProviderResource",
+                 "/providers/<string:provider_id>",
+                 endpoint="provider")
+    add_resource(api, "gluuengine.resource.provider:ProviderListResource",
+                 "/providers",
+                 "/filter-providers/<string:provider_type>",
+                 endpoint="provider_list")
+    add_resource(api, "gluuengine.resource.provider:CreateProviderResource",
+                 "/providers/<string:provider_type>",
+                 endpoint="create_provider")
+
+    add_resource(api, "gluuengine.resource.license:LicenseKeyListResource",
+                 "/license_keys",
+                 endpoint="licensekey_list")
+    add_resource(api, "gluuengine.resource.license:LicenseKeyResource",
+                 "/license_keys/<string:license_key_id>",
+                 endpoint="licensekey")
+    add_resource(api, "gluuengine.resource.license:LicenseWatcherResource",
+                 "/license_watcher",
+                 endpoint="license_watcher")
+
+    add_resource(api, "gluuengine.resource.container:ContainerListResource",
+                 "/containers",
+                 "/filter-containers/<string:container_type>",
+                 endpoint="container_list")
+    add_resource(api, "gluuengine.resource.container:ContainerResource",
+                 "/containers/<string:container_id>",
+                 endpoint="container")
+    add_resource(api, "gluuengine.resource.container:ContainerStatsResource",
+                 "/containers/<string:container_id>/stats",
+                 endpoint="container_stats")
+    add_resource(api, "gluuengine.resource.container:NewContainerResource",
+                 "/containers/<string:container_type>",
+                 endpoint="new_container")
+    add_resource(api, "gluuengine.resource.container:ScaleContainerResource",
+                 "/scale-containers/<string:container_type>/<int:number>",
+                 endpoint="scale_container")
+
+    add_resource(api, "gluuengine.resource.deployment:DeploymentListResource",
+                 "/deployments",
+                 endpoint="deployment_list")
+    add_resource(api, "gluuengine.resource.deployment:DeploymentResource",
+                 "/deployments/<string:container_type>",
+                 endpoint="deployment")
+
+    add_resource(api, "gluuengine.resource.deployment:AutoscalerResource",
+                 "/autoscaler",
+                 endpoint="autoscaler")
+
+    add_resource(api, "gluuengine.resource.profile:ResourceProfileListResource",
+                 "/resource_profiles",
+                 endpoint="resource_profile_list")
+    add_resource(api, "gluuengine.resource.profile:ResourceProfileResource",
+                 "/resource_profiles/<string:profile_id>",
+                 endpoint="resource_profile")
+
+    add_resource(api, "gluuengine.resource.drift:DriftResource",
+                 "/reconcile",
+                 endpoint="reconcile")
+
+    add_resource(api, "gluuengine.resource.setting:LdapSettingResource",
+                 "/settings/ldap",
+                 endpoint="ldap_setting")
+    add_resource(api, "gluuengine.resource.setting:NginxSettingResource",
+                 "/settings/nginx",
+                 endpoint="nginx_setting")
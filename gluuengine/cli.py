@@ -4,14 +4,12 @@
 # All rights reserved.
 
 import os
-import uuid
 
 import click
+from flask.cli import ScriptInfo
 from flask_migrate.cli import db as migrator
 
 from .app import create_app
-from .dockerclient import Docker
-from .errors import DockerExecError
 from .machine import Machine
 from .model import Node
 from .model import Container
@@ -22,8 +20,10 @@ CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
 
 
 @click.group(context_settings=CONTEXT_SETTINGS)
-def main():
-    pass
+@click.pass_context
+def main(ctx):
+    # allows db migrator commands to create the app without FLASK_APP
+    ctx.obj = ScriptInfo(create_app=lambda info: create_app(register_api=False))
 
 
 def _distribute_ox_files(type_):
@@ -42,7 +42,7 @@ def _distribute_ox_files(type_):
         },
     }
     ox = ox_map[type_]
-    app = create_app()
+    app = create_app(register_api=False)
     mc = Machine()
 
     click.echo("distributing custom {} files".format(ox["name"]))
@@ -97,7 +97,10 @@ def distribute_oxtrust_files():
 def distribute_ssl_cert():
     """Distribute SSL certificate and key.
     """
-    app = create_app()
+    from .helper import ContainerLifecycleHelper
+    from .setup.truststore import TruststoreManager
+
+    app = create_app(register_api=False)
 
     ssl_cert = os.path.join(app.config["SSL_CERT_DIR"], "nginx.crt")
     if not os.path.exists(ssl_cert):
@@ -116,15 +119,20 @@ def distribute_ssl_cert():
             click.echo("master node is not available; process cancelled")
             return
 
-        mc = Machine()
-        dk = Docker(mc.config(master_node.name),
-                    mc.swarm_config(master_node.name))
+        # exec and archive operations are sent to the daemon of the node
+        # where container runs
+        lifecycle = ContainerLifecycleHelper(app)
+
+        def get_docker(container):
+            node = Node.query.get(container.node_id)
+            return lifecycle.get_docker(node.name)
 
         ngx_containers = Container.query.filter_by(
             type="nginx", state="SUCCESS",
         ).all()
 
         for ngx in ngx_containers:
+            dk = get_docker(ngx)
             click.echo("copying {} to {}:/etc/certs/nginx.crt".format(ssl_cert, ngx.name))
             dk.copy_to_container(ngx.cid, ssl_cert, "/etc/certs/nginx.crt")
             click.echo("copying {} to {}:/etc/certs/nginx.key".format(ssl_key, ngx.name))
@@ -136,32 +144,19 @@ def distribute_ssl_cert():
         ).first()
 
         if oxtrust:
+            dk = get_docker(oxtrust)
             click.echo("copying {} to {}:/etc/certs/nginx.crt".format(ssl_cert, oxtrust.name))
             dk.copy_to_container(oxtrust.cid, ssl_cert, "/etc/certs/nginx.crt")
             click.echo("copying {} to {}:/etc/certs/nginx.key".format(ssl_key, oxtrust.name))
             dk.copy_to_container(oxtrust.cid, ssl_key, "/etc/certs/nginx.key")
 
-            der_cmd = "openssl x509 -outform der -in /etc/certs/nginx.crt " \
-                      "-out /etc/certs/nginx.der"
-            dk.exec_cmd(oxtrust.cid, der_cmd)
-
-            import_cmd = " ".join([
-                "keytool -importcert -trustcacerts",
-                "-alias '{}'".format(uuid.uuid4()),
-                "-file /etc/certs/nginx.der",
-                "-keystore {}".format(oxtrust.truststore_fn),
-                "-storepass changeit -noprompt",
-            ])
-            import_cmd = '''sh -c "{}"'''.format(import_cmd)
-
-            try:
-                click.echo("importing ssl cert into {} "
-                           "keystore".format(oxtrust.name))
-                dk.exec_cmd(oxtrust.cid, import_cmd)
-            except DockerExecError as exc:
-                if exc.exit_code == 1:
-                    # certificate already imported
-                    click.echo("certificate already imported")
+        # truststore of Java containers must include the new certificate
+        click.echo("distributing truststore to Java containers")
+        report = TruststoreManager(app).distribute()
+        click.echo("truststore {} pushed to {} container(s); {} skipped; "
+                   "{} failed".format(report["digest"], len(report["pushed"]),
+                                      len(report["skipped"]),
+                                      len(report["failed"])))
 
     # mark the process as finished
     click.echo("distributing SSL cert and key is done")
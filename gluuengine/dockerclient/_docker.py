@@ -4,13 +4,20 @@
 # All rights reserved.
 
 import json
+import logging
 import os
 import shutil
 import tempfile
+import threading
 from collections import namedtuple
 from contextlib import contextmanager
 
 import docker
+import docker.errors
+from requests.exceptions import ConnectionError
+from requests.exceptions import ConnectTimeout
+from requests.packages.urllib3.exceptions import ConnectTimeoutError
+from requests.packages.urllib3.exceptions import NewConnectionError
 
 from ..errors import DockerExecError
 from ..utils import make_tarfile
@@ -20,13 +27,79 @@ from ..utils import extract_tarfile
 DockerExecResult = namedtuple("DockerExecResult",
                               ["cmd", "exit_code", "retval"])
 
+logger = logging.getLogger(__name__)
+
+#: Period (in microseconds) of CPU CFS scheduler used with ``cpu_quota``
+CPU_PERIOD = 100000
+
+
+def get_resource_config(resources=None, ulimits=None):
+    """Converts resource limits into arguments of
+    ``docker.Client.create_host_config``.
+
+    :param resources: A ``dict`` of limits, e.g. ``mem_limit``,
+                      ``mem_reservation``, ``cpu_shares``, ``cpu_quota``,
+                      ``cpuset_cpus``, ``pids_limit``, ``nofile``,
+                      and ``nproc``.
+    :param ulimits: Base ulimit settings; ``nofile`` and ``nproc``
+                    limits take precedence over them.
+    :returns: A ``dict`` of keyword arguments.
+    """
+    resources = resources or {}
+    config = {}
+
+    for key in ("mem_limit", "mem_reservation", "cpu_shares", "cpuset_cpus",
+                "pids_limit"):
+        if resources.get(key):
+            config[key] = resources[key]
+
+    if resources.get("cpu_quota"):
+        config["cpu_quota"] = resources["cpu_quota"]
+        config["cpu_period"] = CPU_PERIOD
+
+    # ulimit may be a ``dict`` or ``docker.types.Ulimit`` object
+    ulimits = {ulimit.get("name", ulimit.get("Name")): ulimit
+               for ulimit in (ulimits or [])}
+    for name in ("nofile", "nproc"):
+        if resources.get(name):
+            ulimits[name] = {
+                "name": name,
+                "soft": resources[name],
+                "hard": resources[name],
+            }
+    config["ulimits"] = [ulimits[name] for name in sorted(ulimits)]
+    return config
+
+
+def is_connect_error(exc):
+    """Checks whether error is raised while connecting to Docker daemon,
+    i.e. before the request is sent.
+
+    :param exc: An instance of ``requests.exceptions.ConnectionError``.
+    """
+    if isinstance(exc, ConnectTimeout):
+        return True
+
+    # ``requests`` wraps ``urllib3.exceptions.MaxRetryError``
+    reason = exc.args[0] if exc.args else None
+    reason = getattr(reason, "reason", reason)
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError,))
+
 
 class Docker(object):
+    #: Whether to send container-targeted operations (e.g. exec and
+    #: archive) directly to node's daemon instead of swarm manager
+    route_to_node = True
+
     def __init__(self, config, swarm_config):
         self.config = config
         self.swarm_config = swarm_config
         self.registry_base_url = "gluufederation"
 
+        # long-lived client of node's Docker daemon; see `stream_stats`
+        self._node_client = None
+        self._node_client_lock = threading.Lock()
+
     def image_exists(self, name):
         """Checks whether a docker image exists.
 
@@ -39,7 +112,8 @@ class Docker(object):
 
     def setup_container(self, name, image, env=None, port_bindings=None,
                         volumes=None, ulimits=None, hostname=None,
-                        command=None, aliases=None):
+                        command=None, aliases=None, resources=None,
+                        networks=None):
         image = "{}/{}".format(self.registry_base_url, image)
 
         # pull the image first if not exist
@@ -56,6 +130,8 @@ class Docker(object):
             hostname=hostname,
             command=command,
             aliases=aliases,
+            resources=resources,
+            networks=networks,
         )
 
     def remove_container(self, container_id):
@@ -63,22 +139,88 @@ class Docker(object):
 
         :param container_id: ID or name of the container.
         """
-        with self._get_client() as client:
-            return client.remove_container(container_id, force=True)
+        return self._run_on_container(
+            lambda client: client.remove_container(container_id, force=True)
+        )
 
     def inspect_container(self, container_id):
         """Inspects given container.
 
         :param container_id: ID or name of the container.
         """
-        with self._get_client() as client:
-            return client.inspect_container(container_id)
+        return self._run_on_container(
+            lambda client: client.inspect_container(container_id)
+        )
 
     def stop_container(self, container_id):  # pragma: no cover
         """Stops given container.
         """
+        self._run_on_container(lambda client: client.stop(container_id))
+
+    def restart_container(self, container_id):  # pragma: no cover
+        """Restarts given container.
+        """
+        self._run_on_container(lambda client: client.restart(container_id))
+
+    def get_info(self):
+        """Gets system-wide information of the node.
+        """
+        with self._get_client(use_swarm=False) as client:
+            return client.info()
+
+    def list_containers(self, all_=False):
+        """Lists containers in the node.
+
+        :param all_: Whether to include non-running containers.
+        """
+        with self._get_client(use_swarm=False) as client:
+            return client.containers(all=all_)
+
+    def get_stats(self, container_id):
+        """Gets a snapshot of resource usage of given container.
+
+        :param container_id: ID or name of the container.
+        """
+        with self._get_client(use_swarm=False) as client:
+            return client.stats(container_id, stream=False)
+
+    def stream_stats(self, container_id):
+        """Streams resource usage of given container (roughly every second)
+        until the container stops.
+
+        Streams share a long-lived client (hence its connection pool)
+        of the node's Docker daemon; call :meth:`close` to release it.
+
+        :param container_id: ID or name of the container.
+        """
+        with self._node_client_lock:
+            if self._node_client is None:
+                self._node_client = docker.Client(
+                    base_url=self.config.get("base_url"),
+                    tls=self.config.get("tls"),
+                )
+            client = self._node_client
+
+        for stats in client.stats(container_id, decode=True):
+            yield stats
+
+    def events(self, since=None, filters=None):
+        """Streams events of the cluster via swarm.
+
+        :param since: Unix timestamp of the oldest event to get.
+        :param filters: Filters of events, e.g. ``{"type": "container"}``.
+        """
         with self._get_client() as client:
-            client.stop(container_id)
+            for event in client.events(since=since, filters=filters, decode=True):
+                yield event
+
+    def close(self):
+        """Closes long-lived client (if any).
+        """
+        with self._node_client_lock:
+            if self._node_client is not None:
+                self._node_client.close()
+                self._node_client = None
 
     def pull_image(self, image):
         with self._get_client(use_swarm=False) as client:
@@ -98,7 +240,8 @@ class Docker(object):
 
     def run_container(self, name, image, env=None, port_bindings=None,
                       volumes=None, ulimits=None, hostname=None,
-                      command=None, aliases=None):
+                      command=None, aliases=None, resources=None,
+                      networks=None):
         """Runs a docker container in detached mode.
 
         This is a two-steps operation:
@@ -112,15 +255,18 @@ class Docker(object):
         :param port_bindings: Port bindings.
         :param volumes: Mapped volumes.
         :param ulimits: ulimit settings.
+        :param resources: Resource limits; see :func:`get_resource_config`.
+        :param networks: Names of networks to attach the container to;
+                         defaults to ``gluunet`` network.
         :returns: A string of container ID in long format if container
                   is running successfully, otherwise an empty string.
         """
         env = env or {}
         port_bindings = port_bindings or {}
         volumes = volumes or {}
-        ulimits = ulimits or []
         command = command or []
         aliases = aliases or []
+        networks = networks or ["gluunet"]
 
         with self._get_client() as client:
             container = client.create_container(
@@ -131,15 +277,16 @@ class Docker(object):
                 host_config=client.create_host_config(
                     port_bindings=port_bindings,
                     binds=volumes,
-                    ulimits=ulimits,
                     restart_policy={
                         "Name": "always",
                     },
+                    **get_resource_config(resources, ulimits)
                 ),
                 hostname=hostname,
                 command=command,
+                # only 1 network can be set when creating the container
                 networking_config=client.create_networking_config({
-                    "gluunet": client.create_endpoint_config(
+                    networks[0]: client.create_endpoint_config(
                         aliases=aliases,
                     )
                 }),
@@ -147,6 +294,10 @@ class Docker(object):
             container_id = container["Id"]
 
             if container_id:
+                for network in networks[1:]:
+                    client.connect_container_to_network(
+                        container_id, network, aliases=aliases,
+                    )
                 client.start(container=container_id)
             return container_id
 
@@ -155,9 +306,13 @@ class Docker(object):
         tmp_path = res.retval
 
         with make_tarfile(src) as tf:
-            with self._get_client() as client:
+            def put_archive(client):
+                # rewind in case of fallback
+                tf.seek(0)
                 client.put_archive(container, tmp_path, tf)
 
+            self._run_on_container(put_archive)
+
         self.exec_cmd(
             container,
             "mkdir -p {}".format(os.path.dirname(dest)),
@@ -168,22 +323,40 @@ class Docker(object):
         )
         self.exec_cmd(container, "rm -rf {}".format(tmp_path))
 
+    def put_bundle(self, container, dest_dir, bundle, create_dir=True):
+        """Extracts tar bundle into a directory inside the container.
+
+        :param container: ID or name of the container.
+        :param dest_dir: Destination directory.
+        :param bundle: Bytes of tar archive.
+        :param create_dir: Whether to create destination directory first.
+        """
+        if create_dir:
+            self.exec_cmd(container, "mkdir -p {}".format(dest_dir))
+        self._run_on_container(
+            lambda client: client.put_archive(container, dest_dir, bundle)
+        )
+
     def copy_from_container(self, container, src, dest):
         with tempfile.NamedTemporaryFile() as fd:
-            with self._get_client() as client:
+            def get_archive(client):
+                fd.seek(0)
+                fd.truncate()
                 resp, _ = client.get_archive(container, src)
                 for stream in resp:
                     fd.write(stream)
-                fd.seek(0)
 
-                # pull archive to temporary path
-                tmp_path = tempfile.mkdtemp()
-                extract_tarfile(fd, tmp_path)
+            self._run_on_container(get_archive)
+            fd.seek(0)
+
+            # pull archive to temporary path
+            tmp_path = tempfile.mkdtemp()
+            extract_tarfile(fd, tmp_path)
 
-                if not os.path.exists(os.path.dirname(dest)):
-                    os.makedirs(os.path.dirname(dest))
-                shutil.move("{}/{}".format(tmp_path, os.path.basename(src)), dest)
-                shutil.rmtree(tmp_path)
+            if not os.path.exists(os.path.dirname(dest)):
+                os.makedirs(os.path.dirname(dest))
+            shutil.move("{}/{}".format(tmp_path, os.path.basename(src)), dest)
+            shutil.rmtree(tmp_path)
 
     def _swarm_conf_str(self):
         cfg_str = " ".join([
@@ -195,22 +368,89 @@ class Docker(object):
         ])
         return cfg_str
 
+    def ensure_network(self, name, driver, subnet, options=None):
+        """Creates network if it doesn't exist.
+
+        Network is created through swarm manager (if any), hence
+        it's available to all nodes.
+
+        :param name: Name of the network.
+        :param driver: Network driver, e.g. ``overlay``.
+        :param subnet: Subnet of the network in CIDR format.
+        :param options: A ``dict`` of driver options.
+        :returns: ``True`` if network is created, otherwise ``False``.
+        """
+        def exists(client):
+            # ``name`` filter also matches partial names
+            return any(network["Name"] == name
+                       for network in client.networks(names=[name]))
+
+        use_swarm = bool(self.swarm_config.get("base_url"))
+        with self._get_client(use_swarm=use_swarm) as client:
+            if exists(client):
+                return False
+
+            ipam = docker.utils.create_ipam_config(
+                pool_configs=[docker.utils.create_ipam_pool(subnet=subnet)],
+            )
+            try:
+                client.create_network(name, driver=driver, options=options,
+                                      ipam=ipam, check_duplicate=True)
+            except docker.errors.APIError:
+                # network may be created by concurrent deployment
+                if exists(client):
+                    return False
+                raise
+            logger.info("network {} is created".format(name))
+            return True
+
     def exec_cmd(self, container, cmd):
-        with self._get_client() as client:
+        def run_exec(client):
             exec_cmd = client.exec_create(container, cmd=cmd)
             retval = client.exec_start(exec_cmd)
             inspect = client.exec_inspect(exec_cmd)
+            return retval, inspect
 
-            if inspect["ExitCode"] != 0:
-                raise DockerExecError(
-                    "error while running docker exec",
-                    retval,
-                    inspect["ExitCode"],
-                )
+        retval, inspect = self._run_on_container(run_exec)
 
-            result = DockerExecResult(cmd=cmd, exit_code=inspect["ExitCode"],
-                                      retval=retval.strip())
-            return result
+        if inspect["ExitCode"] != 0:
+            raise DockerExecError(
+                "error while running docker exec",
+                retval,
+                inspect["ExitCode"],
+            )
+
+        result = DockerExecResult(cmd=cmd, exit_code=inspect["ExitCode"],
+                                  retval=retval.strip())
+        return result
+
+    def _run_on_container(self, func):
+        """Runs container-targeted operation.
+
+        The operation is sent to node's daemon directly, hence it skips
+        the extra hop through swarm manager. Swarm is used as fallback
+        if node's daemon is unknown or unreachable, or the container
+        is not found in the node. Errors raised after the request is sent
+        (e.g. connection reset or read timeout) are not retried, as the
+        operation may have been executed already.
+
+        :param func: A callable which accepts ``docker.Client`` object.
+        :returns: Return value of ``func``.
+        """
+        if self.route_to_node and self.config.get("base_url"):
+            try:
+                with self._get_client(use_swarm=False) as client:
+                    return func(client)
+            except (ConnectionError, docker.errors.NotFound) as exc:
+                if not self.swarm_config.get("base_url"):
+                    raise
+                if isinstance(exc, ConnectionError) and not is_connect_error(exc):
+                    raise
+                logger.warn("unable to reach container via node's daemon; "
+                            "falling back to swarm; reason={}".format(exc))
+
+        with self._get_client() as client:
+            return func(client)
 
     @contextmanager
     def _get_client(self, use_swarm=True):
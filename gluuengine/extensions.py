@@ -9,12 +9,10 @@ in app.py
 
 import os
 
-from flask_restful import Api
 from flask_marshmallow import Marshmallow
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 
-restapi = Api(catch_all_404s=True)
 ma = Marshmallow()
 db = SQLAlchemy(session_options={"expire_on_commit": False})
 migrate = Migrate(
@@ -4,10 +4,25 @@
 # All rights reserved.
 
 import multiprocessing
-import os
-import time
 
+from .app import init_reactor
+from .metrics import StatsCollector
+from .metrics.collector import TASK_INTERVAL as STATS_TASK_INTERVAL
+from .task import Autoscaler
+from .task import DeploymentReconciler
+from .task import DockerEventWatcher
+from .task import DriftReconciler
 from .task import LicenseWatcherTask
+from .task import TaskScheduler
+from .task import TicketKeyRotator
+from .task.autoscaler import TASK_INTERVAL as AUTOSCALER_TASK_INTERVAL
+from .task.drift import TASK_INTERVAL as DRIFT_TASK_INTERVAL
+from .task.eventwatcher import TASK_INTERVAL as EVENTS_TASK_INTERVAL
+from .task.licensewatcher import TASK_INTERVAL as LICENSE_TASK_INTERVAL
+from .task.reconciler import TASK_INTERVAL as RECONCILER_TASK_INTERVAL
+from .task.ticketkeys import TASK_INTERVAL as TICKET_KEY_TASK_INTERVAL
+from .setup.keypool import KeyPool
+from .setup.keypool import TASK_INTERVAL as KEYPOOL_TASK_INTERVAL
 from .utils import as_boolean
 
 
@@ -21,33 +36,71 @@ errorlog = '-'
 raw_env = 'API_ENV=prod'  # 'prod|test|dev'
 
 
-def on_exit(server):
-    app = server.app.load_wsgiapp()
-    runfile = os.path.join(app.config["DATA_DIR"], "lwatcher.run")
-
-    try:
-        os.unlink(runfile)
-    except OSError:
-        pass
-
-
 def post_fork(server, worker):
-    # task is launched after a worker has been forked; as task is running
+    # tasks are launched after a worker has been forked; as tasks are running
     # inside crochet/twisted reactor, we cannot use `when_ready` nor `pre_fork`
     # hook because, somehow, reactor seems unitialized in those hooks
     app = server.app.load_wsgiapp()
-    runfile = os.path.join(app.config["DATA_DIR"], "lwatcher.run")
+
+    # reactor is not started by the app factory, hence start it here
+    # before scheduling any task
+    init_reactor()
+
+    # every worker takes part in leader election, but each task is only
+    # executed by a single worker (the one holding the task's lock)
+    scheduler = TaskScheduler(app)
 
     if as_boolean(app.config["ENABLE_LICENSE"]):
-        if not os.path.isfile(runfile):
-            with open(runfile, "w") as fd:
-                fd.write("1")
+        scheduler.add_task(
+            "license_watcher",
+            LicenseWatcherTask(app).monitor_license,
+            LICENSE_TASK_INTERVAL,
+        )
+
+    scheduler.add_task(
+        "keypool",
+        KeyPool.from_app(app).refill,
+        KEYPOOL_TASK_INTERVAL,
+        in_thread=True,
+    )
+    scheduler.add_task(
+        "event_watcher",
+        DockerEventWatcher(app).watch,
+        EVENTS_TASK_INTERVAL,
+        in_thread=True,
+    )
+    scheduler.add_task(
+        "drift",
+        DriftReconciler(app).check,
+        DRIFT_TASK_INTERVAL,
+        in_thread=True,
+    )
+    scheduler.add_task(
+        "stats_collector",
+        StatsCollector(app).sync,
+        STATS_TASK_INTERVAL,
+        in_thread=True,
+    )
+    scheduler.add_task(
+        "reconciler",
+        DeploymentReconciler(app).reconcile,
+        RECONCILER_TASK_INTERVAL,
+        in_thread=True,
+    )
 
-            app.logger.info("launching task on worker {}".format(worker))
-            LicenseWatcherTask(app).perform_job()
+    scheduler.add_task(
+        "ticket_key",
+        TicketKeyRotator(app).rotate,
+        TICKET_KEY_TASK_INTERVAL,
+        in_thread=True,
+    )
 
+    if as_boolean(app.config["AUTOSCALER_ENABLED"]):
+        scheduler.add_task(
+            "autoscaler",
+            Autoscaler(app).scale,
+            AUTOSCALER_TASK_INTERVAL,
+            in_thread=True,
+        )
 
-def pre_fork(server, worker):
-    # delay before forking other workers, this will give time for a worker
-    # to claim task
-    time.sleep(1)
+    scheduler.start()
@@ -9,3 +9,7 @@ from .container_helper import OxidpContainerHelper  # noqa
 from .container_helper import NginxContainerHelper  # noqa
 from .container_helper import OxasimbaContainerHelper  # noqa
 from .container_helper import OxelevenContainerHelper  # noqa
+from .lifecycle_helper import ContainerLifecycleHelper  # noqa
+from .scale_helper import SCALE_HELPER_CLASSES  # noqa
+from .scale_helper import setup_helper_generator  # noqa
+from .scale_helper import teardown_helper_generator  # noqa
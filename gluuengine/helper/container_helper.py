@@ -12,6 +12,9 @@ import docker.errors
 from requests.exceptions import SSLError
 from requests.exceptions import ConnectionError
 from crochet import run_in_reactor
+from twisted.internet import reactor
+from twisted.internet.threads import deferToThreadPool
+from twisted.python.threadpool import ThreadPool
 
 from ..extensions import db
 from ..model import STATE_SUCCESS
@@ -22,16 +25,45 @@ from ..model import STATE_TEARDOWN_FINISHED
 from ..model import Cluster
 from ..model import Node
 from ..model import ContainerLog
+from ..model import ResourceProfile
 from ..setup import OxauthSetup
 from ..setup import OxtrustSetup
 from ..setup import OxidpSetup
 from ..setup import NginxSetup
+from ..setup.nginx_setup import OXAUTH_STATIC_ROOT
 from ..setup import OxasimbaSetup
 from ..setup import OxelevenSetup
 from ..log import create_file_logger
 from ..utils import exc_traceback
+from ..utils import as_boolean
 from ..machine import Machine
 from ..dockerclient import Docker
+from ..node.network import ensure_container_networks
+from ..placement.cpuset import CpusetAllocator
+from ..placement.jvm import JVM_CONTAINER_TYPES
+from ..placement.jvm import JvmSizer
+from ..placement.jvm import get_jvm_containers
+
+# container setups have their own threadpool, so they don't compete
+# with background tasks running in reactor's threadpool
+_setup_pool = None
+
+
+def get_setup_pool(max_workers):
+    """Gets threadpool where container setups run.
+
+    Must be called in reactor thread.
+
+    :param max_workers: Maximum number of threads in the pool.
+    """
+    global _setup_pool
+
+    if _setup_pool is None:
+        _setup_pool = ThreadPool(minthreads=0, maxthreads=max_workers,
+                                 name="container-setup")
+        _setup_pool.start()
+        reactor.addSystemEventTrigger("during", "shutdown", _setup_pool.stop)
+    return _setup_pool
 
 
 class BaseContainerHelper(object):
@@ -73,7 +105,10 @@ class BaseContainerHelper(object):
 
     @run_in_reactor
     def setup(self):
-        self.mp_setup()
+        # setups run concurrently (up to ``SETUP_MAX_WORKERS``)
+        # without blocking the reactor
+        pool = get_setup_pool(self.app.config["SETUP_MAX_WORKERS"])
+        return deferToThreadPool(reactor, pool, self.mp_setup)
 
     def mp_setup(self):
         """Runs the container setup.
@@ -83,18 +118,38 @@ class BaseContainerHelper(object):
                 self.logger.info("{} setup is started".format(self.container.name))
                 start = time.time()
 
+                # limits are kept for reference, as profile may be
+                # changed after the container is deployed
+                resources = ResourceProfile.get_limits(self.container.type,
+                                                       self.node.id)
+                container_attrs = dict(self.container.container_attrs or {})
+                container_attrs["resources"] = resources
+                self.container.container_attrs = container_attrs
+
+                cpuset = self.get_cpuset()
+                if cpuset:
+                    resources = dict(resources, cpuset_cpus=cpuset)
+
+                env = [
+                    "constraint:node=={}".format(self.node.name),
+                ]
+                # written into Jetty's supervisor program by setup
+                self.get_jvm_options()
+
                 cid = self.docker.setup_container(
                     name=self.container.name,
                     image="{}:{}".format(self.container.image,
                                          self.app.config["GLUU_IMAGE_TAG"]),
-                    env=[
-                        "constraint:node=={}".format(self.node.name),
-                    ],
+                    env=env,
                     port_bindings=self.port_bindings,
                     volumes=self.volumes,
                     ulimits=self.ulimits,
                     command=self.command,
                     aliases=self.aliases,
+                    resources=resources,
+                    networks=ensure_container_networks(self.docker,
+                                                       self.app.config,
+                                                       self.container.type),
                 )
 
                 # container is not running
@@ -142,6 +197,44 @@ class BaseContainerHelper(object):
                 handler.close()
                 self.logger.removeHandler(handler)
 
+    def get_cpuset(self):
+        """Allocates dedicated cores to the container (if pinning is
+        enabled).
+
+        Must be called within app context.
+
+        :returns: Cpuset string, or empty string if the container
+                  is not pinned.
+        """
+        if not as_boolean(self.app.config["CPU_PINNING_ENABLED"]):
+            return ""
+
+        cpus = self.docker.get_info().get("NCPU", 0)
+        return CpusetAllocator(self.app).allocate(self.container, cpus,
+                                                  self.docker)
+
+    def get_jvm_options(self):
+        """Computes JVM options of the container (if any) and saves
+        them into container attributes.
+
+        Must be called within app context.
+
+        :returns: A list of JVM options.
+        """
+        if (self.container.type not in JVM_CONTAINER_TYPES
+                or not as_boolean(self.app.config["JVM_AUTO_SIZING"])):
+            return []
+
+        # container being deployed is counted as well
+        density = len(get_jvm_containers(self.node.id))
+        options = JvmSizer(self.app, self.docker).get_options(self.container,
+                                                              density)
+
+        container_attrs = dict(self.container.container_attrs or {})
+        container_attrs["jvm_options"] = options
+        self.container.container_attrs = container_attrs
+        return options
+
     def on_setup_error(self):
         """Callback that supposed to be called when error occurs in setup
         process.
@@ -300,6 +393,16 @@ class NginxContainerHelper(BaseContainerHelper):
     setup_class = NginxSetup
     port_bindings = {80: ("0.0.0.0", 80,), 443: ("0.0.0.0", 443,)}
 
+    @property
+    def volumes(self):
+        # oxAuth static resources served directly by nginx
+        return {
+            "/var/gluu/webapps/oxauth/static": {
+                "bind": "{}/oxauth/static".format(OXAUTH_STATIC_ROOT),
+                "mode": "ro",
+            },
+        }
+
     @property
     def aliases(self):
         _aliases = [self.container.type]
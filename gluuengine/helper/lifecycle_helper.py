@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import logging
+import threading
+import time
+from collections import defaultdict
+
+import concurrent.futures
+
+from ..extensions import db
+from ..model import STATE_DISABLED
+from ..model import STATE_SUCCESS
+from ..model import Container
+from ..model import Node
+from ..machine import Machine
+from ..dockerclient import Docker
+
+# Maximum number of nodes processed concurrently
+BULK_MAX_WORKERS = 10
+
+
+class ContainerLifecycleHelper(object):
+    """Changes lifecycle state of many containers at once.
+
+    States are updated in a single DB transaction, while the actual
+    stop/restart operations are executed concurrently across nodes
+    (containers in the same node are processed sequentially).
+
+    :param app: An instance of :class:`flask.Flask`.
+    :param max_workers: Maximum number of nodes processed concurrently.
+    """
+    def __init__(self, app, max_workers=BULK_MAX_WORKERS):
+        self.logger = logging.getLogger(
+            __name__ + "." + self.__class__.__name__,
+        )
+        self.app = app
+        self.max_workers = max_workers
+        self.machine = Machine()
+
+        # Docker clients, keyed by node name, reused across operations
+        self._dockers = {}
+        self._swarm_config = None
+        self._dockers_lock = threading.Lock()
+
+    def get_docker(self, node_name):
+        """Gets Docker client for given node.
+
+        :param node_name: Name of the node.
+        """
+        with self._dockers_lock:
+            if self._swarm_config is None:
+                with self.app.app_context():
+                    master_node = Node.query.filter_by(type="master").first()
+                self._swarm_config = self.machine.swarm_config(master_node.name)
+
+        if node_name not in self._dockers:
+            docker = Docker(self.machine.config(node_name), self._swarm_config)
+            with self._dockers_lock:
+                self._dockers.setdefault(node_name, docker)
+        return self._dockers[node_name]
+
+    def disable_containers(self, nodes, type_):
+        """Disables containers having specific type.
+
+        Disabled container will be stopped and excluded from cluster's network.
+        All containers having specific type are disabled regardless of
+        their state, except those already disabled.
+
+        :param nodes: A list of node objects.
+        :param type_: Type of the container.
+        :returns: A report of affected containers.
+        """
+        return self._change_state(nodes, type_, None,
+                                  STATE_DISABLED, "stop")
+
+    def enable_containers(self, nodes, type_):
+        """Enables containers having specific type.
+
+        Enabled container will be restarted and included into cluster's network.
+
+        :param nodes: A list of node objects.
+        :param type_: Type of the container.
+        :returns: A report of affected containers.
+        """
+        return self._change_state(nodes, type_, STATE_DISABLED,
+                                  STATE_SUCCESS, "restart")
+
+    def _change_state(self, nodes, type_, from_state, to_state, action):
+        """Changes state of containers and applies the action to them.
+
+        Containers whose action has failed are rolled back
+        to their previous state.
+
+        :param nodes: A list of node objects.
+        :param type_: Type of the container.
+        :param from_state: State of containers to change (``None`` means
+                           any state other than ``to_state``).
+        :param to_state: New state of the containers.
+        :param action: Docker action, either ``stop`` or ``restart``.
+        """
+        start = time.time()
+        node_names = {node.id: node.name for node in nodes}
+        report = {
+            "type": type_,
+            "state": to_state,
+            "action": action,
+            "changed": [],
+            "failed": [],
+            "elapsed": 0,
+        }
+
+        if not node_names:
+            return report
+
+        with self.app.app_context():
+            query = Container.query.filter(
+                Container.node_id.in_(node_names.keys()),
+                Container.type == type_,
+            )
+            if from_state:
+                query = query.filter(Container.state == from_state)
+            else:
+                query = query.filter(Container.state != to_state)
+            containers = query.all()
+
+            if not containers:
+                return report
+
+            # update all states in a single transaction
+            query.update({"state": to_state}, synchronize_session=False)
+            db.session.commit()
+
+        prev_states = {}
+        containers_by_node = defaultdict(list)
+        for container in containers:
+            prev_states[container.id] = container.state
+            container.state = to_state
+            containers_by_node[node_names[container.node_id]].append(container)
+
+        max_workers = min(self.max_workers, len(containers_by_node))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._apply_action, node_name, node_containers, action)
+                for node_name, node_containers in containers_by_node.iteritems()
+            ]
+
+            for future in concurrent.futures.as_completed(futures):
+                changed, failed = future.result()
+                report["changed"].extend(changed)
+                report["failed"].extend(failed)
+
+        if report["failed"]:
+            self._rollback_states(report["failed"], prev_states, to_state)
+
+        report["elapsed"] = time.time() - start
+        self.logger.info(
+            "{} {} container(s) changed to {} state; {} failed ({} seconds)".format(
+                len(report["changed"]), type_, to_state,
+                len(report["failed"]), report["elapsed"],
+            )
+        )
+        return report
+
+    def _rollback_states(self, failed, prev_states, to_state):
+        """Restores previous state of containers whose action has failed.
+
+        :param failed: A list of failed items from the report.
+        :param prev_states: A ``dict`` of previous states keyed by container ID.
+        :param to_state: State set by the failed change.
+        """
+        ids_by_state = defaultdict(list)
+        for item in failed:
+            ids_by_state[prev_states[item["id"]]].append(item["id"])
+
+        with self.app.app_context():
+            for state, ids in ids_by_state.iteritems():
+                # skip containers whose state has been changed meanwhile
+                Container.query.filter(
+                    Container.id.in_(ids),
+                    Container.state == to_state,
+                ).update({"state": state}, synchronize_session=False)
+            db.session.commit()
+
+    def _apply_action(self, node_name, containers, action):
+        changed = []
+        failed = []
+
+        try:
+            docker = self.get_docker(node_name)
+        except Exception as exc:
+            self.logger.warn("unable to connect to {} node; "
+                             "reason={}".format(node_name, exc))
+            for container in containers:
+                failed.append({"id": container.id, "name": container.name,
+                               "node": node_name, "error": str(exc)})
+            return changed, failed
+
+        for container in containers:
+            try:
+                if action == "stop":
+                    docker.stop_container(container.cid)
+                else:
+                    docker.restart_container(container.cid)
+                changed.append({"name": container.name, "node": node_name})
+            except Exception as exc:
+                self.logger.warn("unable to {} container {}; "
+                                 "reason={}".format(action, container.name, exc))
+                failed.append({"id": container.id, "name": container.name,
+                               "node": node_name, "error": str(exc)})
+        return changed, failed
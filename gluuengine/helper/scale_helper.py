@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import os
+
+from ..extensions import db
+from ..model import STATE_IN_PROGRESS
+from ..model import STATE_SETUP_IN_PROGRESS
+from ..model import STATE_TEARDOWN_IN_PROGRESS
+from ..model import ContainerLog
+from ..model import OxauthContainer
+from .container_helper import OxauthContainerHelper
+
+#: Helper classes of container types which can be scaled
+SCALE_HELPER_CLASSES = {
+    "oxauth": OxauthContainerHelper,
+    # "oxidp": OxidpContainerHelper,  # disabled for now
+}
+
+#: Model classes of container types which can be scaled
+SCALE_CONTAINER_CLASSES = {
+    "oxauth": OxauthContainer,
+    # "oxidp": OxidpContainer,  # disabled for now
+}
+
+
+def setup_helper_generator(app, container_type, cluster_id, node_ids):
+    """Creates containers (marked as ``IN_PROGRESS``) and yields helper
+    object to run their setup.
+
+    :param app: An instance of :class:`flask.Flask`.
+    :param container_type: Type of the container.
+    :param cluster_id: ID of the cluster.
+    :param node_ids: An iterable of node's ID, one for each container.
+    """
+    with app.app_context():
+        for node_id in node_ids:
+            container_class = SCALE_CONTAINER_CLASSES[container_type]
+            container = container_class(**{
+                "cluster_id": cluster_id,
+                "node_id": node_id,
+                "state": STATE_IN_PROGRESS,
+                # "container_attrs": {},
+            })
+            db.session.add(container)
+            db.session.flush()
+            container.name = "{}_{}".format(container.image, container.id)
+            db.session.commit()
+
+            # log related setup
+            container_log = ContainerLog.create_or_get(container)
+            container_log.state = STATE_SETUP_IN_PROGRESS
+            # TODO: update the row
+            db.session.add(container_log)
+            db.session.commit()
+            logpath = os.path.join(app.config["CONTAINER_LOG_DIR"],
+                                   container_log.setup_log)
+
+            # make the setup obj
+            helper_class = SCALE_HELPER_CLASSES[container_type]
+            helper = helper_class(container, app, logpath)
+            yield helper
+
+
+def teardown_helper_generator(app, containers):
+    """Removes containers from database and yields helper object
+    to run their teardown.
+
+    :param app: An instance of :class:`flask.Flask`.
+    :param containers: A list of container objects.
+    """
+    with app.app_context():
+        for container in containers:
+            db.session.delete(container)
+            db.session.commit()
+            container_log = ContainerLog.create_or_get(container)
+            container_log.state = STATE_TEARDOWN_IN_PROGRESS
+            # TODO: update the row
+            db.session.add(container_log)
+            db.session.commit()
+            logpath = os.path.join(app.config["CONTAINER_LOG_DIR"],
+                                   container_log.teardown_log)
+            helper_class = SCALE_HELPER_CLASSES[container.type]
+            helper = helper_class(container, app, logpath)
+            yield helper
@@ -7,8 +7,6 @@ import json
 import re
 import os
 
-from docker.tls import TLSConfig
-
 from ..utils import po_run
 
 LS_FIELDS = ["Name", "Active", "ActiveHost", "ActiveSwarm", "DriverName",
@@ -25,6 +23,10 @@ class Machine(object):
         return po_run(cmd, raise_error)
 
     def _config(self, cmd, machine_name, docker_friendly):
+        # imported here as docker-py is slow to import and only needed
+        # when talking to the nodes
+        from docker.tls import TLSConfig
+
         stdout, _, _ = self._run(cmd)
         config = stdout.strip()
         regexp = """(--tlsverify\n)?--tlscacert="(.+)"\n--tlscert="(.+)"\n--tlskey="(.+)"\n-H=(.+)"""
@@ -101,7 +103,15 @@ class Machine(object):
     def _get_rackspace_cmd(self, provider):
         pass
 
-    def create(self, node, provider, discovery):
+    def create(self, node, provider, discovery, engine_opts=None):
+        """Creates a node.
+
+        :param node: Node object.
+        :param provider: Provider object.
+        :param discovery: Discovery node object.
+        :param engine_opts: Extra options of Docker engine,
+                            e.g. ``["userland-proxy=false"]``.
+        """
         cmd = [
             "create",
             "--driver={}".format(provider.driver),
@@ -129,6 +139,9 @@ class Machine(object):
             cmd.append(self._dicovery(discovery))
             cmd.append('--engine-label=org.gluu.node-type={}'.format(node.type))
 
+        for opt in engine_opts or []:
+            cmd.append('--engine-opt={}'.format(opt))
+
         cmd.append(node.name)
         cmd = " ".join(cmd)
         self._run(cmd)
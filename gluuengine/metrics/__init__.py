@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+from .collector import StatsCollector  # noqa
+from .collector import read_stats  # noqa
+from .ringbuffer import RingBuffer  # noqa
+from .ringbuffer import StatsSeries  # noqa
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import logging
+import os
+import threading
+import time
+
+from ..dockerclient import Docker
+from ..machine import Machine
+from ..model import STATE_SUCCESS
+from ..model import Container
+from ..model import Node
+from ..placement.stats import get_cpu_used
+from ..placement.stats import get_mem_used
+from .ringbuffer import StatsSeries
+from .ringbuffer import write_atomic
+
+# Default interval (in seconds) to sync streams with containers table
+TASK_INTERVAL = 10
+
+# Interval (in seconds) to save stats into files
+FLUSH_INTERVAL = 10
+
+# Delay (in seconds) before reopening a stream which ended unexpectedly
+RECONNECT_DELAY = 5
+
+#: Collected metrics; CPU is in number of CPUs and memory is in bytes
+METRICS = ("cpu", "memory",)
+
+
+def get_stats_file(stats_dir, kind, key):
+    """Gets path to stats file.
+
+    :param stats_dir: Base directory of stats files.
+    :param kind: Either ``containers`` or ``nodes``.
+    :param key: ID of the container or name of the node.
+    """
+    return os.path.join(stats_dir, kind, key)
+
+
+def read_stats(app, kind, key):
+    """Reads stats saved by collector.
+
+    Stats are saved into files, so every worker is able to read them
+    regardless of which worker is running the collector.
+
+    :param app: An instance of :class:`flask.Flask`.
+    :param kind: Either ``containers`` or ``nodes``.
+    :param key: ID of the container or name of the node.
+    :returns: An instance of :class:`~gluuengine.metrics.StatsSeries`
+              or ``None`` if stats are unavailable.
+    """
+    path = get_stats_file(app.config["STATS_DIR"], kind, key)
+    try:
+        return StatsSeries.load(path, METRICS)
+    except (IOError, EOFError):
+        return None
+
+
+class StatsCollector(object):
+    """Collects resource usage of containers from Docker stats streams.
+
+    Each container listed in ``containers`` table has its own stream;
+    streams of containers in the same node share a single Docker client.
+    Samples are downsampled into fixed-size ring buffers per container,
+    and aggregated per node every second.
+
+    :param app: An instance of :class:`flask.Flask`.
+    """
+    def __init__(self, app):
+        self.logger = logging.getLogger(
+            __name__ + "." + self.__class__.__name__,
+        )
+        self.app = app
+        self.stats_dir = app.config["STATS_DIR"]
+        self.machine = Machine()
+
+        # Docker clients keyed by node name
+        self._dockers = {}
+        self._dockers_lock = threading.Lock()
+
+        # streams keyed by container ID
+        self._streams = {}
+
+        # series keyed by container ID and node name
+        self._series = {}
+        self._node_series = {}
+
+        # latest sample of each container, used for node aggregation
+        self._latest = {}
+
+        self._lock = threading.Lock()
+        self._aggregator = None
+
+    def get_docker(self, node_name):
+        with self._dockers_lock:
+            if node_name not in self._dockers:
+                self._dockers[node_name] = Docker(self.machine.config(node_name), {})
+            return self._dockers[node_name]
+
+    def load_series(self, kind, key):
+        """Loads series saved previously (e.g. by other process
+        which used to run the collector), so history is preserved.
+
+        :param kind: Either ``containers`` or ``nodes``.
+        :param key: ID of the container or name of the node.
+        :returns: An instance of :class:`~gluuengine.metrics.StatsSeries`.
+        """
+        path = get_stats_file(self.stats_dir, kind, key)
+        try:
+            return StatsSeries.load(path, METRICS)
+        except (IOError, EOFError):
+            return StatsSeries(METRICS)
+
+    def sync(self):
+        """Opens streams of new containers and closes streams of removed
+        containers.
+
+        This method does blocking I/O and must not be executed
+        in reactor thread.
+        """
+        with self.app.app_context():
+            node_names = {node.id: node.name for node in Node.query.all()}
+            wanted = {
+                container.id: (container.cid, node_names[container.node_id])
+                for container in Container.query.filter_by(state=STATE_SUCCESS)
+                if container.cid and container.node_id in node_names
+            }
+
+        for container_id in set(self._streams) - set(wanted):
+            self.stop_stream(container_id)
+
+        for container_id, (cid, node_name) in wanted.iteritems():
+            if container_id not in self._streams:
+                self.start_stream(container_id, cid, node_name)
+
+        with self._lock:
+            known_nodes = set(self._node_series)
+
+        for node_name in set(node_names.itervalues()) - known_nodes:
+            series = self.load_series("nodes", node_name)
+            with self._lock:
+                self._node_series.setdefault(node_name, series)
+
+        with self._dockers_lock:
+            removed = [self._dockers.pop(node_name) for node_name in
+                       set(self._dockers) - set(node_names.itervalues())]
+        for docker in removed:
+            docker.close()
+
+        for node_name in known_nodes - set(node_names.itervalues()):
+            with self._lock:
+                self._node_series.pop(node_name, None)
+            try:
+                os.unlink(get_stats_file(self.stats_dir, "nodes", node_name))
+            except OSError:
+                pass
+
+        if self._aggregator is None:
+            for kind in ("containers", "nodes",):
+                path = os.path.join(self.stats_dir, kind)
+                if not os.path.exists(path):
+                    os.makedirs(path)
+
+            self._aggregator = threading.Thread(target=self.aggregate_forever)
+            self._aggregator.daemon = True
+            self._aggregator.start()
+
+    def start_stream(self, container_id, cid, node_name):
+        series = self.load_series("containers", container_id)
+        with self._lock:
+            self._series[container_id] = series
+
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=self.consume,
+            args=(container_id, cid, node_name, stop),
+        )
+        thread.daemon = True
+        self._streams[container_id] = {
+            "node": node_name,
+            "stop": stop,
+            "thread": thread,
+        }
+        thread.start()
+
+    def stop_stream(self, container_id):
+        stream = self._streams.pop(container_id)
+        stream["stop"].set()
+
+        with self._lock:
+            self._series.pop(container_id, None)
+            self._latest.pop(container_id, None)
+
+        try:
+            os.unlink(get_stats_file(self.stats_dir, "containers", container_id))
+        except OSError:
+            pass
+
+    def consume(self, container_id, cid, node_name, stop):
+        """Reads stats stream of a container until the stream is stopped.
+
+        :param container_id: ID of the container in database.
+        :param cid: ID of the container in Docker.
+        :param node_name: Name of the node where container is running.
+        :param stop: An instance of ``threading.Event`` to stop the stream.
+        """
+        docker = self.get_docker(node_name)
+
+        while not stop.is_set():
+            try:
+                for stats in docker.stream_stats(cid):
+                    if stop.is_set():
+                        break
+                    self.record(container_id, stats)
+            except Exception as exc:
+                self.logger.warn("stats stream of {} container is "
+                                 "interrupted; reason={}".format(cid, exc))
+            stop.wait(RECONNECT_DELAY)
+
+    def record(self, container_id, stats):
+        """Records a sample of container stats.
+
+        :param container_id: ID of the container in database.
+        :param stats: Stats of the container as returned by Docker API.
+        """
+        values = {
+            "cpu": get_cpu_used(stats),
+            "memory": get_mem_used(stats),
+        }
+
+        with self._lock:
+            # stream has been stopped
+            if container_id not in self._streams:
+                return
+
+            if container_id not in self._series:
+                self._series[container_id] = StatsSeries(METRICS)
+            self._series[container_id].add(time.time(), **values)
+            self._latest[container_id] = values
+
+    def aggregate(self):
+        """Aggregates latest samples of containers into node series.
+        """
+        now = time.time()
+        totals = {}
+
+        with self._lock:
+            for container_id, values in self._latest.iteritems():
+                stream = self._streams.get(container_id)
+                if not stream:
+                    continue
+
+                node_totals = totals.setdefault(
+                    stream["node"], dict.fromkeys(METRICS, 0),
+                )
+                for metric, value in values.iteritems():
+                    node_totals[metric] += value
+
+            for node_name, values in totals.iteritems():
+                if node_name not in self._node_series:
+                    self._node_series[node_name] = StatsSeries(METRICS)
+                self._node_series[node_name].add(now, **values)
+
+    def save(self):
+        """Saves all series into files.
+        """
+        # serialize within the lock, but write files outside of it,
+        # so streams are not blocked by disk I/O
+        with self._lock:
+            dumps = [
+                (get_stats_file(self.stats_dir, "containers", key), value.dumps())
+                for key, value in self._series.iteritems()
+            ]
+            dumps.extend(
+                (get_stats_file(self.stats_dir, "nodes", key), value.dumps())
+                for key, value in self._node_series.iteritems()
+            )
+
+        for path, data in dumps:
+            try:
+                write_atomic(path, data)
+            except (IOError, OSError) as exc:
+                self.logger.warn("unable to save stats into {}; "
+                                 "reason={}".format(path, exc))
+
+    def aggregate_forever(self):
+        ticks = 0
+        while True:
+            time.sleep(1)
+            ticks += 1
+
+            try:
+                self.aggregate()
+                if ticks % FLUSH_INTERVAL == 0:
+                    self.save()
+            except Exception as exc:
+                self.logger.warn("unable to aggregate stats; "
+                                 "reason={}".format(exc))
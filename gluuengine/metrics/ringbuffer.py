@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import os
+import tempfile
+from array import array
+
+NAN = float("nan")
+
+#: Resolution tiers as tuples of name, step (in seconds), and size;
+#: i.e. 5 minutes of 1-second points, 1 day of 1-minute points,
+#: and 1 week of 1-hour points
+TIERS = (
+    ("1s", 1, 300),
+    ("1m", 60, 1440),
+    ("1h", 3600, 168),
+)
+
+
+class RingBuffer(object):
+    """Fixed-size buffer of time-series points backed by arrays.
+
+    Each slot holds the average of values added within ``step`` seconds;
+    timestamps are not stored, as they are derived from position of the
+    slot relative to the latest slot.
+
+    :param size: Number of slots.
+    :param step: Time span (in seconds) of each slot.
+    """
+    def __init__(self, size, step):
+        self.size = size
+        self.step = step
+        self.values = array("d", [NAN]) * size
+        self.counts = array("I", [0]) * size
+
+        # slot number (timestamp divided by step) of the latest value
+        self.head = -1
+
+    def add(self, timestamp, value):
+        """Adds a value.
+
+        :param timestamp: Unix timestamp of the value.
+        :param value: The value.
+        """
+        slot = int(timestamp // self.step)
+
+        # value is older than the oldest slot
+        if slot <= self.head - self.size:
+            return
+
+        if slot > self.head:
+            # clear slots skipped since the latest value
+            for skipped in xrange(max(self.head + 1, slot - self.size + 1), slot + 1):
+                idx = skipped % self.size
+                self.values[idx] = NAN
+                self.counts[idx] = 0
+            self.head = slot
+
+        idx = slot % self.size
+        count = self.counts[idx] + 1
+        self.counts[idx] = count
+        if count == 1:
+            self.values[idx] = value
+        else:
+            self.values[idx] += (value - self.values[idx]) / count
+
+    def items(self):
+        """Gets stored points, from the oldest one.
+
+        :returns: A list of ``[timestamp, value]`` pairs.
+        """
+        points = []
+        for slot in xrange(max(self.head - self.size + 1, 0), self.head + 1):
+            idx = slot % self.size
+            if self.counts[idx]:
+                points.append([slot * self.step, self.values[idx]])
+        return points
+
+    def dumps(self):
+        """Serializes buffer into bytes.
+        """
+        return "".join([
+            # stored as double, as ``q`` typecode is unavailable in Python 2
+            array("d", [self.head]).tostring(),
+            self.values.tostring(),
+            self.counts.tostring(),
+        ])
+
+    def load(self, fp):
+        """Reads buffer from a file written by :meth:`dumps`.
+
+        :param fp: File object opened in binary mode.
+        """
+        head = array("d")
+        head.fromfile(fp, 1)
+        values = array("d")
+        values.fromfile(fp, self.size)
+        counts = array("I")
+        counts.fromfile(fp, self.size)
+        self.head, self.values, self.counts = int(head[0]), values, counts
+
+
+class StatsSeries(object):
+    """Multi-resolution series of several metrics.
+
+    Memory usage is constant regardless how long the series is fed.
+
+    :param metrics: Names of the metrics.
+    :param tiers: Resolution tiers; see :data:`TIERS`.
+    """
+    def __init__(self, metrics, tiers=TIERS):
+        self.metrics = metrics
+        self.tiers = tiers
+        self.buffers = {
+            metric: [(name, RingBuffer(size, step)) for name, step, size in tiers]
+            for metric in metrics
+        }
+
+    def add(self, timestamp, **values):
+        """Adds values of metrics into every tier.
+
+        :param timestamp: Unix timestamp of the values.
+        :param values: Values keyed by metric name.
+        """
+        for metric, value in values.iteritems():
+            for _, buf in self.buffers[metric]:
+                buf.add(timestamp, value)
+
+    def as_dict(self, tier=None):
+        """Gets points of every metric, grouped by tier.
+
+        :param tier: Name of a tier to get; if omitted, all tiers
+                     are returned.
+        """
+        data = {}
+        for metric in self.metrics:
+            for name, buf in self.buffers[metric]:
+                if tier and name != tier:
+                    continue
+                data.setdefault(name, {})[metric] = buf.items()
+        return data
+
+    def dumps(self):
+        """Serializes series into bytes.
+        """
+        return "".join(buf.dumps()
+                       for metric in self.metrics
+                       for _, buf in self.buffers[metric])
+
+    def save(self, path):
+        """Saves series into a file atomically.
+
+        :param path: Path to the file.
+        """
+        write_atomic(path, self.dumps())
+
+    @classmethod
+    def load(cls, path, metrics, tiers=TIERS):
+        """Loads series from a file written by :meth:`save`.
+
+        :param path: Path to the file.
+        :param metrics: Names of the metrics.
+        :param tiers: Resolution tiers.
+        """
+        series = cls(metrics, tiers)
+        with open(path, "rb") as fp:
+            for metric in metrics:
+                for _, buf in series.buffers[metric]:
+                    buf.load(fp)
+        return series
+
+
+def write_atomic(path, data):
+    """Writes data into a temporary file and renames it afterwards,
+    so readers never see partially-written file.
+
+    :param path: Path to the file.
+    :param data: Bytes to write.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as fp:
+        fp.write(data)
+    os.rename(tmp, path)
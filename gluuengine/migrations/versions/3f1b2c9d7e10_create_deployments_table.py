@@ -0,0 +1,37 @@
+"""create deployments table
+
+Revision ID: 3f1b2c9d7e10
+Revises: cc03834f1d24
+Create Date: 2017-04-18 10:12:41.538217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1b2c9d7e10'
+down_revision = 'cc03834f1d24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    try:
+        op.create_table(
+            'deployments',
+            sa.Column('id', sa.Unicode(length=36), nullable=False),
+            sa.Column('container_type', sa.Unicode(length=32), nullable=True),
+            sa.Column('replicas', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('container_type')
+        )
+    except sa.exc.InternalError as exc:
+        errno, _ = exc.orig
+        if errno == 1050:
+            pass
+
+
+def downgrade():
+    op.drop_table('deployments')
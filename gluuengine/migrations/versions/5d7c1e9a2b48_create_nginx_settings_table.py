@@ -0,0 +1,42 @@
+"""create nginx_settings table
+
+Revision ID: 5d7c1e9a2b48
+Revises: 8a4e6d2f5c31
+Create Date: 2017-05-02 14:12:45.306219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d7c1e9a2b48'
+down_revision = '8a4e6d2f5c31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    try:
+        op.create_table(
+            'nginx_settings',
+            sa.Column('id', sa.Unicode(length=36), nullable=False),
+            sa.Column('proxy_cache', sa.Boolean(), nullable=True),
+            sa.Column('cache_ttl', sa.Integer(), nullable=True),
+            sa.Column('cache_inactive', sa.Integer(), nullable=True),
+            sa.Column('cache_max_size', sa.Integer(), nullable=True),
+            sa.Column('cache_keys_zone', sa.Integer(), nullable=True),
+            sa.Column('stale_while_revalidate', sa.Boolean(), nullable=True),
+            sa.Column('serve_static', sa.Boolean(), nullable=True),
+            sa.Column('static_ttl', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    except sa.exc.InternalError as exc:
+        errno, _ = exc.orig
+        if errno == 1050:
+            pass
+
+
+def downgrade():
+    op.drop_table('nginx_settings')
@@ -0,0 +1,44 @@
+"""create resource_profiles table
+
+Revision ID: 8a4e6d2f5c31
+Revises: 3f1b2c9d7e10
+Create Date: 2017-04-25 09:31:07.118420
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4e6d2f5c31'
+down_revision = '3f1b2c9d7e10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    try:
+        op.create_table(
+            'resource_profiles',
+            sa.Column('id', sa.Unicode(length=36), nullable=False),
+            sa.Column('container_type', sa.Unicode(length=32), nullable=True),
+            sa.Column('node_id', sa.Unicode(length=36), nullable=True),
+            sa.Column('mem_limit', sa.BigInteger(), nullable=True),
+            sa.Column('mem_reservation', sa.BigInteger(), nullable=True),
+            sa.Column('cpu_shares', sa.Integer(), nullable=True),
+            sa.Column('cpu_quota', sa.Integer(), nullable=True),
+            sa.Column('nofile', sa.Integer(), nullable=True),
+            sa.Column('nproc', sa.Integer(), nullable=True),
+            sa.Column('pids_limit', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('container_type', 'node_id')
+        )
+    except sa.exc.InternalError as exc:
+        errno, _ = exc.orig
+        if errno == 1050:
+            pass
+
+
+def downgrade():
+    op.drop_table('resource_profiles')
@@ -0,0 +1,32 @@
+"""add TLS columns to nginx_settings table
+
+Revision ID: b2e4f7a9c063
+Revises: 5d7c1e9a2b48
+Create Date: 2017-05-09 10:47:21.593104
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2e4f7a9c063'
+down_revision = '5d7c1e9a2b48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('nginx_settings', sa.Column('http2', sa.Boolean(), nullable=True))
+    op.add_column('nginx_settings', sa.Column('ssl_session_cache', sa.Integer(), nullable=True))
+    op.add_column('nginx_settings', sa.Column('ssl_session_timeout', sa.Integer(), nullable=True))
+    op.add_column('nginx_settings', sa.Column('ocsp_stapling', sa.Boolean(), nullable=True))
+    op.add_column('nginx_settings', sa.Column('worker_connections', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('nginx_settings', 'worker_connections')
+    op.drop_column('nginx_settings', 'ocsp_stapling')
+    op.drop_column('nginx_settings', 'ssl_session_timeout')
+    op.drop_column('nginx_settings', 'ssl_session_cache')
+    op.drop_column('nginx_settings', 'http2')
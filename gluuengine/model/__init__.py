@@ -31,6 +31,7 @@ from .base import STATE_IN_PROGRESS  # noqa
 from .base import STATE_FAILED  # noqa
 from .base import STATE_SUCCESS  # noqa
 from .base import STATE_DISABLED  # noqa
+from .base import STATE_STOPPED  # noqa
 
 from .log import ContainerLog  # noqa
 
@@ -40,3 +41,7 @@ from .base import STATE_TEARDOWN_IN_PROGRESS  # noqa
 from .base import STATE_TEARDOWN_FINISHED  # noqa
 
 from .setting import LdapSetting  # noqa
+from .setting import NginxSetting  # noqa
+
+from .deployment import Deployment  # noqa
+from .profile import ResourceProfile  # noqa
@@ -20,6 +20,9 @@ STATE_FAILED = "FAILED"
 #: A flag to mark state as ``DISABLED``
 STATE_DISABLED = "DISABLED"
 
+#: A flag to mark state as ``STOPPED`` (container exited unexpectedly)
+STATE_STOPPED = "STOPPED"
+
 STATE_SETUP_IN_PROGRESS = "SETUP_IN_PROGRESS"
 STATE_SETUP_FINISHED = "SETUP_FINISHED"
 STATE_TEARDOWN_IN_PROGRESS = "TEARDOWN_IN_PROGRESS"
@@ -43,6 +43,7 @@ class Container(BaseModelMixin, db.Model):
             "state": self.state,
             "hostname": self.hostname,
             "cid": self.cid,
+            "resources": (self.container_attrs or {}).get("resources", {}),
         }
 
 
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+from .base import BaseModelMixin
+from ..extensions import db
+
+
+class Deployment(BaseModelMixin, db.Model):
+    """Desired number of replicas of a container type.
+    """
+    __tablename__ = "deployments"
+
+    container_type = db.Column(db.Unicode(32), unique=True)
+    replicas = db.Column(db.Integer, default=0)
+
+    @property
+    def resource_fields(self):
+        return {
+            "id": self.id,
+            "container_type": self.container_type,
+            "replicas": self.replicas,
+        }
@@ -9,7 +9,7 @@ from .base import BaseModelMixin
 from .node import Node
 from ..extensions import db
 from ..utils import decrypt_text
-from ..utils import retrieve_current_date
+from ..utils import get_current_date
 
 
 class LicenseKey(BaseModelMixin, db.Model):
@@ -78,7 +78,7 @@ class LicenseKey(BaseModelMixin, db.Model):
         # expiration_date likely tampered
         if not expiration_date:
             return True
-        current_date = retrieve_current_date()
+        current_date = get_current_date()
         return current_date > expiration_date
 
     def get_workers(self):
@@ -103,6 +103,21 @@ class LicenseKey(BaseModelMixin, db.Model):
     def is_active(self):
         return self._metadata.get("active") is True
 
+    @property
+    def deploy_error(self):
+        """Gets reason why containers cannot be deployed to worker nodes.
+
+        :returns: Error message, or empty string if license permits
+                  the deployment.
+        """
+        if self.expired:
+            return "cannot deploy container to node with expired license"
+        if self.mismatched:
+            return "cannot deploy container to node with incorrect product license"
+        if not self.is_active:
+            return "cannot deploy container to node with non-active license"
+        return ""
+
     @property
     def auto_update(self):
         # for backward compatibility, license that doesn't have
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+from .base import BaseModelMixin
+from ..extensions import db
+
+#: Limits defined in a profile
+LIMIT_FIELDS = (
+    "mem_limit",
+    "mem_reservation",
+    "cpu_shares",
+    "cpu_quota",
+    "nofile",
+    "nproc",
+    "pids_limit",
+)
+
+
+class ResourceProfile(BaseModelMixin, db.Model):
+    """Resource limits of a container type.
+
+    Profile without ``node_id`` applies to the whole cluster; profile
+    with ``node_id`` overrides the cluster-wide profile in that node.
+    """
+    __tablename__ = "resource_profiles"
+
+    container_type = db.Column(db.Unicode(32))
+    node_id = db.Column(db.Unicode(36))
+
+    # memory (in bytes)
+    mem_limit = db.Column(db.BigInteger)
+    mem_reservation = db.Column(db.BigInteger)
+
+    # relative CPU weight and CPU time (in microseconds) per 100ms period
+    cpu_shares = db.Column(db.Integer)
+    cpu_quota = db.Column(db.Integer)
+
+    # ulimits and maximum number of processes
+    nofile = db.Column(db.Integer)
+    nproc = db.Column(db.Integer)
+    pids_limit = db.Column(db.Integer)
+
+    @property
+    def resource_fields(self):
+        fields = {
+            "id": self.id,
+            "container_type": self.container_type,
+            "node_id": self.node_id,
+        }
+        fields.update((field, getattr(self, field)) for field in LIMIT_FIELDS)
+        return fields
+
+    @property
+    def limits(self):
+        """Limits which are set in this profile.
+        """
+        return {field: getattr(self, field) for field in LIMIT_FIELDS
+                if getattr(self, field) is not None}
+
+    @classmethod
+    def get_limits(cls, container_type, node_id=None):
+        """Gets effective limits of a container type in a node.
+
+        :param container_type: Type of the container.
+        :param node_id: ID of the node.
+        :returns: A ``dict`` of limits.
+        """
+        profiles = cls.query.filter(
+            cls.container_type == container_type,
+            db.or_(cls.node_id.is_(None), cls.node_id == node_id),
+        ).all()
+
+        limits = {}
+        # node-specific profile takes precedence
+        for profile in sorted(profiles, key=lambda p: p.node_id is not None):
+            limits.update(profile.limits)
+        return limits
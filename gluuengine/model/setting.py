@@ -44,3 +44,48 @@ class LdapSetting(BaseModelMixin, db.Model):
                                .replace('!', '')
                                .replace('.', '')
         )
+
+
+class NginxSetting(BaseModelMixin, db.Model):
+    __tablename__ = "nginx_settings"
+
+    # cache of discovery endpoints (e.g. openid-configuration)
+    proxy_cache = db.Column(db.Boolean, default=True)
+    cache_ttl = db.Column(db.Integer, default=60)  # in seconds
+    cache_inactive = db.Column(db.Integer, default=600)  # in seconds
+    cache_max_size = db.Column(db.Integer, default=100)  # in MB
+    cache_keys_zone = db.Column(db.Integer, default=10)  # in MB
+
+    # serve stale response while refreshing the cache in background
+    # (requires nginx 1.11.10 or newer)
+    stale_while_revalidate = db.Column(db.Boolean, default=True)
+
+    # serve oxAuth static resources from the mounted volume
+    serve_static = db.Column(db.Boolean, default=True)
+    static_ttl = db.Column(db.Integer, default=3600)  # in seconds
+
+    # TLS and worker tuning
+    http2 = db.Column(db.Boolean, default=True)
+    ssl_session_cache = db.Column(db.Integer, default=10)  # in MB
+    ssl_session_timeout = db.Column(db.Integer, default=14400)  # in seconds
+    ocsp_stapling = db.Column(db.Boolean, default=False)
+    worker_connections = db.Column(db.Integer, default=4096)
+
+    @property
+    def resource_fields(self):
+        return {
+            "id": self.id,
+            "proxy_cache": self.proxy_cache,
+            "cache_ttl": self.cache_ttl,
+            "cache_inactive": self.cache_inactive,
+            "cache_max_size": self.cache_max_size,
+            "cache_keys_zone": self.cache_keys_zone,
+            "stale_while_revalidate": self.stale_while_revalidate,
+            "serve_static": self.serve_static,
+            "static_ttl": self.static_ttl,
+            "http2": self.http2,
+            "ssl_session_cache": self.ssl_session_cache,
+            "ssl_session_timeout": self.ssl_session_timeout,
+            "ocsp_stapling": self.ocsp_stapling,
+            "worker_connections": self.worker_connections,
+        }
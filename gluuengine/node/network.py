@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+from ..utils import as_boolean
+
+#: Network shared by all containers (or only backend containers if
+#: edge network is enabled)
+BACKEND_NETWORK = "gluunet"
+
+#: Network shared by nginx and its upstreams
+EDGE_NETWORK = "gluunet-edge"
+
+#: Types of container which are only attached to edge network
+EDGE_ONLY_TYPES = ("nginx",)
+
+#: Types of container which are only attached to backend network
+BACKEND_ONLY_TYPES = ("oxeleven",)
+
+
+def parse_driver_opts(value):
+    """Parses driver options, e.g. ``key1=value1,key2=value2``.
+
+    :param value: Driver options string.
+    :returns: A list of ``(key, value)`` tuples.
+    """
+    opts = []
+    for item in (value or "").split(","):
+        key, _, val = item.strip().partition("=")
+        if key:
+            opts.append((key, val))
+    return opts
+
+
+def get_networks(config):
+    """Gets overlay networks of the cluster.
+
+    :param config: App config.
+    :returns: A list of ``(name, subnet)`` tuples.
+    """
+    networks = [(BACKEND_NETWORK, config["NETWORK_SUBNET"])]
+    if config["NETWORK_EDGE_SUBNET"]:
+        networks.append((EDGE_NETWORK, config["NETWORK_EDGE_SUBNET"]))
+    return networks
+
+
+def get_network_options(config):
+    """Gets driver options of the networks.
+
+    :param config: App config.
+    :returns: A list of ``(key, value)`` tuples.
+    """
+    opts = []
+    if as_boolean(config["NETWORK_ENCRYPTED"]):
+        opts.append(("encrypted", ""))
+    if config["NETWORK_MTU"]:
+        opts.append(("com.docker.network.driver.mtu", str(config["NETWORK_MTU"])))
+    opts.extend(parse_driver_opts(config["NETWORK_DRIVER_OPTS"]))
+    return opts
+
+
+def get_network_create_cmd(config, name, subnet):
+    """Gets command to create a network (if not exist).
+
+    :param config: App config.
+    :param name: Name of the network.
+    :param subnet: Subnet of the network in CIDR format.
+    """
+    cmd = [
+        "sudo docker network create",
+        "--driver={}".format(config["NETWORK_DRIVER"]),
+        "--subnet={}".format(subnet),
+    ]
+    for key, val in get_network_options(config):
+        cmd.append("--opt={}={}".format(key, val) if val else "--opt={}".format(key))
+    cmd.append(name)
+
+    # skip existing network, so the command can be re-run safely
+    return "sudo docker network inspect {} >/dev/null 2>&1 || {}".format(
+        name, " ".join(cmd),
+    )
+
+
+def get_container_networks(config, container_type):
+    """Gets networks which the container is attached to.
+
+    :param config: App config.
+    :param container_type: Type of the container.
+    :returns: A list of network names.
+    """
+    if not config["NETWORK_EDGE_SUBNET"]:
+        return [BACKEND_NETWORK]
+    if container_type in EDGE_ONLY_TYPES:
+        return [EDGE_NETWORK]
+    if container_type in BACKEND_ONLY_TYPES:
+        return [BACKEND_NETWORK]
+    return [EDGE_NETWORK, BACKEND_NETWORK]
+
+
+def ensure_container_networks(docker, config, container_type):
+    """Gets networks which the container is attached to, creating
+    missing ones, e.g. edge network enabled after nodes are deployed.
+
+    :param docker: An instance of :class:`~gluuengine.dockerclient.Docker`.
+    :param config: App config.
+    :param container_type: Type of the container.
+    :returns: A list of network names.
+    """
+    subnets = dict(get_networks(config))
+    options = dict(get_network_options(config))
+
+    networks = get_container_networks(config, container_type)
+    for name in networks:
+        docker.ensure_network(name, config["NETWORK_DRIVER"],
+                              subnets[name], options)
+    return networks
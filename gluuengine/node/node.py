@@ -11,6 +11,9 @@ from ..extensions import db
 from ..machine import Machine
 from ..log import create_file_logger
 from ..model import Provider
+from ..utils import as_boolean
+from .network import get_networks
+from .network import get_network_create_cmd
 from sqlalchemy.orm.attributes import flag_modified
 
 # REMOTE_DOCKER_CERT_DIR = "/opt/gluu/docker/certs"
@@ -27,6 +30,17 @@ class DeployNode(object):
         with self.app.app_context():
             self.provider = Provider.query.get(node_model_obj.provider_id)
 
+    @property
+    def engine_opts(self):
+        """Extra options of Docker engine.
+        """
+        opts = []
+        if not as_boolean(self.app.config["DOCKER_USERLAND_PROXY"], True):
+            # published ports (e.g. nginx's 80 and 443) are served by
+            # kernel NAT only instead of docker-proxy process
+            opts.append("userland-proxy=false")
+        return opts
+
     def _rng_tools(self):
         with self.app.app_context():
             if not self.node.state_attrs["state_node_create"]:
@@ -189,7 +203,8 @@ class DeployMasterNode(DeployNode):
 
             try:
                 self.logger.info('creating {} node ({})'.format(self.node.name, self.node.type))
-                self.machine.create(self.node, self.provider, self.discovery)
+                self.machine.create(self.node, self.provider, self.discovery,
+                                    engine_opts=self.engine_opts)
                 self.node.state_attrs["state_node_create"] = True
                 flag_modified(self.node, "state_attrs")
                 db.session.add(self.node)
@@ -266,7 +281,11 @@ class DeployMasterNode(DeployNode):
 
             try:
                 self.logger.info("creating overlay network")
-                self.machine.ssh(self.node.name, "sudo docker network create --driver overlay --subnet=10.0.9.0/24 gluunet")
+                cmd_list = [
+                    get_network_create_cmd(self.app.config, name, subnet)
+                    for name, subnet in get_networks(self.app.config)
+                ]
+                self.machine.ssh(self.node.name, " && ".join(cmd_list))
                 self.node.state_attrs["state_network_create"] = True
                 flag_modified(self.node, "state_attrs")
                 db.session.add(self.node)
@@ -311,7 +330,8 @@ class DeployWorkerNode(DeployNode):
 
             try:
                 self.logger.info('creating {} node ({})'.format(self.node.name, self.node.type))
-                self.machine.create(self.node, self.provider, self.discovery)
+                self.machine.create(self.node, self.provider, self.discovery,
+                                    engine_opts=self.engine_opts)
                 self.node.state_attrs["state_node_create"] = True
                 flag_modified(self.node, "state_attrs")
                 db.session.add(self.node)
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+from .engine import PlacementEngine  # noqa
+from .engine import PlacementError  # noqa
+from .scalein import select_victims  # noqa
+from .stats import NodeStats  # noqa
+from .strategy import SpreadStrategy  # noqa
+from .strategy import BinpackStrategy  # noqa
+from .strategy import LeastLoadedStrategy  # noqa
+from .strategy import get_strategy  # noqa
+from .jvm import JvmSizer  # noqa
+from .jvm import get_jvm_options  # noqa
+from .jvm import merge_jvm_options  # noqa
+from .cpuset import CpusetAllocator  # noqa
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import logging
+import math
+import threading
+
+from ..extensions import db
+from ..model import STATE_DISABLED
+from ..model import STATE_FAILED
+from ..model import STATE_IN_PROGRESS
+from ..model import STATE_STOPPED
+from ..model import STATE_SUCCESS
+from ..model import Container
+
+#: Types of container which are pinned to dedicated cores
+PINNED_CONTAINER_TYPES = ("oxauth", "nginx",)
+
+#: CFS period (in microseconds) used to convert ``cpu_quota`` into cores
+CPU_PERIOD = 100000
+
+# allocations of all nodes are serialized, as containers in a node
+# may be deployed concurrently
+_lock = threading.Lock()
+
+
+def parse_cpuset(value):
+    """Parses cpuset string (e.g. ``0-2,5``) into a list of cores.
+
+    :param value: Cpuset string.
+    """
+    cores = set()
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cores.update(xrange(int(start), int(end) + 1))
+        else:
+            cores.add(int(part))
+    return sorted(cores)
+
+
+def format_cpuset(cores):
+    """Formats a list of cores into cpuset string, e.g. ``0-2,5``.
+
+    :param cores: A list of cores.
+    """
+    ranges = []
+    for core in sorted(cores):
+        if ranges and core == ranges[-1][1] + 1:
+            ranges[-1][1] = core
+        else:
+            ranges.append([core, core])
+    return ",".join(
+        str(start) if start == end else "{}-{}".format(start, end)
+        for start, end in ranges
+    )
+
+
+def allocate_cores(cpus, used, count, reserved=1):
+    """Selects free cores.
+
+    Contiguous cores are preferred, so the container shares caches
+    of adjacent cores; otherwise the lowest free cores are selected.
+
+    :param cpus: Number of CPUs in the node.
+    :param used: Cores allocated to other containers.
+    :param count: Number of cores to allocate.
+    :param reserved: Number of lowest cores kept for the system
+                     and unpinned containers.
+    :returns: A list of cores, or empty list if there are not enough
+              free cores.
+    """
+    used = set(used)
+    free = [core for core in xrange(reserved, cpus) if core not in used]
+    if count <= 0 or len(free) < count:
+        return []
+
+    for idx in xrange(len(free) - count + 1):
+        block = free[idx:idx + count]
+        if block[-1] - block[0] == count - 1:
+            return block
+    return free[:count]
+
+
+class CpusetAllocator(object):
+    """Assigns non-overlapping cores to containers in a node.
+
+    Allocations are kept in ``cpuset`` attribute of each container,
+    hence cores are reclaimed once the container is removed from
+    database (or marked as failed and removed from Docker).
+
+    :param app: An instance of :class:`flask.Flask`.
+    """
+    def __init__(self, app):
+        self.logger = logging.getLogger(
+            __name__ + "." + self.__class__.__name__,
+        )
+        self.app = app
+
+    def get_allocations(self, node_id, docker=None):
+        """Gets cores allocated in a node.
+
+        Failed containers keep their cores while they still exist
+        in Docker.
+
+        Must be called within app context.
+
+        :param node_id: ID of the node.
+        :param docker: An instance of :class:`~gluuengine.dockerclient.Docker`
+                       connected to the node; without it, failed containers
+                       which were created keep their cores.
+        :returns: A ``dict`` of container name and its list of cores.
+        """
+        containers = Container.query.filter(
+            Container.node_id == node_id,
+            Container.type.in_(PINNED_CONTAINER_TYPES),
+            Container.state.in_([STATE_SUCCESS, STATE_IN_PROGRESS,
+                                 STATE_STOPPED, STATE_DISABLED,
+                                 STATE_FAILED]),
+        ).all()
+
+        existing = None
+        if docker and any(container.state == STATE_FAILED for container in containers):
+            try:
+                existing = set(ctr["Id"][:12] for ctr in docker.list_containers(True))
+            except Exception as exc:
+                self.logger.warn("unable to list containers; "
+                                 "reason={}".format(exc))
+
+        allocations = {}
+        for container in containers:
+            if container.state == STATE_FAILED and (
+                    not container.cid
+                    or (existing is not None and container.cid not in existing)):
+                continue
+
+            cpuset = (container.container_attrs or {}).get("cpuset")
+            if cpuset:
+                allocations[container.name] = parse_cpuset(cpuset)
+        return allocations
+
+    def count_cores(self, resources):
+        """Gets number of cores needed by a container with given limits.
+
+        CPU quota is rounded up to whole cores; otherwise
+        ``CPU_PINNING_CORES`` config is used.
+
+        :param resources: A ``dict`` of limits of resource profile.
+        """
+        if resources.get("cpu_quota"):
+            return int(math.ceil(float(resources["cpu_quota"]) / CPU_PERIOD))
+        return self.app.config["CPU_PINNING_CORES"]
+
+    def get_cores_count(self, container):
+        """Gets number of cores needed by the container.
+
+        :param container: Container object.
+        """
+        resources = (container.container_attrs or {}).get("resources", {})
+        return self.count_cores(resources)
+
+    def allocate(self, container, cpus, docker=None):
+        """Allocates cores to the container and saves the allocation.
+
+        Must be called within app context.
+
+        :param container: Container object.
+        :param cpus: Number of CPUs in container's node.
+        :param docker: Docker client of container's node.
+        :returns: Cpuset string, or empty string if the container
+                  is not pinned.
+        """
+        if container.type not in PINNED_CONTAINER_TYPES:
+            return ""
+
+        with _lock:
+            used = set()
+            allocations = self.get_allocations(container.node_id, docker)
+            for name, cores in allocations.iteritems():
+                if name != container.name:
+                    used.update(cores)
+
+            cores = allocate_cores(cpus, used, self.get_cores_count(container),
+                                   self.app.config["CPU_PINNING_RESERVED"])
+            if not cores:
+                self.logger.warn("not enough free cores for {}; container "
+                                 "is not pinned".format(container.name))
+                return ""
+
+            cpuset = format_cpuset(cores)
+            container_attrs = dict(container.container_attrs or {})
+            container_attrs["cpuset"] = cpuset
+            container.container_attrs = container_attrs
+
+            # allocation must be visible to concurrent deployments
+            db.session.add(container)
+            db.session.commit()
+        return cpuset
+
+    def get_allocation_map(self, node_id, cpus, docker=None):
+        """Gets allocation map of a node.
+
+        Must be called within app context.
+
+        :param node_id: ID of the node.
+        :param cpus: Number of CPUs in the node.
+        :param docker: Docker client of the node.
+        """
+        allocations = self.get_allocations(node_id, docker)
+        reserved = range(min(self.app.config["CPU_PINNING_RESERVED"], cpus))
+
+        used = set(reserved)
+        for cores in allocations.values():
+            used.update(cores)
+
+        return {
+            "cpus": cpus,
+            "reserved": format_cpuset(reserved),
+            "allocations": {name: format_cpuset(cores)
+                            for name, cores in allocations.iteritems()},
+            "free": format_cpuset(core for core in xrange(cpus)
+                                  if core not in used),
+        }
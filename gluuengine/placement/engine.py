@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import logging
+import time
+
+import concurrent.futures
+
+from ..dockerclient import Docker
+from ..machine import Machine
+from ..model import STATE_IN_PROGRESS
+from ..model import STATE_SUCCESS
+from ..model import Container
+from ..model import LicenseKey
+from ..model import Node
+from ..model import ResourceProfile
+from ..utils import as_boolean
+from .cpuset import PINNED_CONTAINER_TYPES
+from .cpuset import CpusetAllocator
+from .stats import NodeStats
+from .stats import get_cpu_used
+from .stats import get_mem_used
+from .strategy import get_strategy
+
+# Types of container which can only be deployed to master node
+MASTER_ONLY_TYPES = ("oxtrust", "oxeleven",)
+
+# Maximum number of nodes (or containers in a node) inspected concurrently
+STATS_MAX_WORKERS = 10
+
+# Maximum age (in seconds) of node stats saved by stats collector
+STATS_MAX_AGE = 30
+
+# Time limit (in seconds) for fetching stats of containers in a node
+STATS_TIMEOUT = 3
+
+
+class PlacementError(Exception):
+    """Raised when there's no node available for the container.
+    """
+
+
+class PlacementEngine(object):
+    """Selects nodes for new containers based on capacity and usage
+    of each node.
+
+    :param app: An instance of :class:`flask.Flask`.
+    :param strategy: Name of placement strategy; defaults to
+                     ``PLACEMENT_STRATEGY`` config.
+    """
+    def __init__(self, app, strategy=None):
+        self.logger = logging.getLogger(
+            __name__ + "." + self.__class__.__name__,
+        )
+        self.app = app
+        self.strategy = get_strategy(strategy or app.config["PLACEMENT_STRATEGY"])
+        self.container_mem = app.config["PLACEMENT_CONTAINER_MEM"]
+        self.machine = Machine()
+
+    def workers_allowed(self):
+        """Checks whether license permits deployment to worker nodes.
+        """
+        if not as_boolean(self.app.config["ENABLE_LICENSE"]):
+            return True
+
+        license_key = LicenseKey.query.first()
+        return bool(license_key and not license_key.deploy_error)
+
+    def get_candidates(self, container_type):
+        """Gets running nodes which may host the container.
+
+        Must be called within app context.
+
+        :param container_type: Type of the container.
+        """
+        types = ["master"]
+        if container_type not in MASTER_ONLY_TYPES and self.workers_allowed():
+            types.append("worker")
+
+        running_nodes = set(self.machine.list("running"))
+        nodes = [
+            node for node in Node.query.filter(Node.type.in_(types)).all()
+            if node.name in running_nodes
+        ]
+
+        if container_type == "nginx":
+            # only 1 nginx per node
+            nodes = [node for node in nodes
+                     if not node.count_containers(type_="nginx")]
+        return nodes
+
+    def get_collected_usage(self, node):
+        """Gets latest usage of the node saved by stats collector.
+
+        :param node: Node object.
+        :returns: A tuple of CPU and memory used, or ``None`` if stats
+                  are unavailable or outdated.
+        """
+        # avoid circular import
+        from ..metrics import read_stats
+
+        series = read_stats(self.app, "nodes", node.name)
+        if not series:
+            return None
+
+        points = series.as_dict("1s")["1s"]
+        if not points["cpu"] or not points["memory"]:
+            return None
+
+        timestamp, cpu_used = points["cpu"][-1]
+        if time.time() - timestamp > STATS_MAX_AGE:
+            return None
+        return cpu_used, points["memory"][-1][1]
+
+    def get_live_usage(self, docker):
+        """Gets usage of the node by fetching stats of its containers.
+
+        Stats which aren't fetched within ``STATS_TIMEOUT`` seconds
+        are excluded.
+
+        :param docker: Docker client of the node.
+        :returns: A tuple of CPU and memory used.
+        """
+        cpu_used = 0.0
+        mem_used = 0
+
+        containers = docker.list_containers()
+        if not containers:
+            return cpu_used, mem_used
+
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(STATS_MAX_WORKERS, len(containers)),
+        )
+        futures = [executor.submit(docker.get_stats, ctr["Id"])
+                   for ctr in containers]
+        done, not_done = concurrent.futures.wait(futures, timeout=STATS_TIMEOUT)
+
+        # don't wait for slow requests
+        executor.shutdown(wait=False)
+
+        for future in done:
+            if future.exception():
+                continue
+            cpu_used += get_cpu_used(future.result())
+            mem_used += get_mem_used(future.result())
+
+        if not_done:
+            self.logger.warn("stats of {} container(s) are not available "
+                             "within {} seconds".format(len(not_done),
+                                                        STATS_TIMEOUT))
+        return cpu_used, mem_used
+
+    def get_node_stats(self, node):
+        """Collects capacity and usage of the node.
+
+        Usage is taken from stats collector; if unavailable, stats of
+        containers are fetched from node's Docker daemon.
+
+        :param node: Node object.
+        :returns: An instance of :class:`~gluuengine.placement.stats.NodeStats`.
+        """
+        docker = Docker(self.machine.config(node.name), {})
+        info = docker.get_info()
+        stats = NodeStats(node, cpus=info.get("NCPU", 0),
+                          mem_total=info.get("MemTotal", 0))
+
+        usage = self.get_collected_usage(node)
+        if usage is None:
+            usage = self.get_live_usage(docker)
+        stats.cpu_used, stats.mem_used = usage
+
+        # containers being deployed are not running yet, hence they
+        # are counted from database instead
+        with self.app.app_context():
+            stats.containers = Container.query.filter(
+                Container.node_id == node.id,
+                Container.state.in_([STATE_SUCCESS, STATE_IN_PROGRESS]),
+            ).count()
+        return stats
+
+    def collect_stats(self, nodes):
+        """Collects stats of nodes concurrently.
+
+        Unreachable nodes are excluded.
+
+        :param nodes: A list of node objects.
+        :returns: A list of :class:`~gluuengine.placement.stats.NodeStats`.
+        """
+        if not nodes:
+            return []
+
+        results = []
+        max_workers = min(STATS_MAX_WORKERS, len(nodes))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.get_node_stats, node): node
+                       for node in nodes}
+
+            for future in concurrent.futures.as_completed(futures):
+                node = futures[future]
+                try:
+                    results.append(future.result())
+                except Exception as exc:
+                    self.logger.warn("unable to collect stats of {} node; "
+                                     "reason={}".format(node.name, exc))
+        return results
+
+    def filter_pinnable(self, stats_list, container_type):
+        """Filters nodes having enough free cores for a pinned container.
+
+        Must be called within app context.
+
+        :param stats_list: A list of :class:`~gluuengine.placement.stats.NodeStats`.
+        :param container_type: Type of the container.
+        :returns: A list of :class:`~gluuengine.placement.stats.NodeStats`;
+                  all nodes are returned if none has enough free cores,
+                  as the container can still run unpinned.
+        """
+        allocator = CpusetAllocator(self.app)
+        reserved = self.app.config["CPU_PINNING_RESERVED"]
+
+        pinnable = []
+        for stats in stats_list:
+            # cores are counted the same way as they're allocated
+            needed = allocator.count_cores(
+                ResourceProfile.get_limits(container_type, stats.node.id),
+            )
+            docker = Docker(self.machine.config(stats.node.name), {})
+            used = sum(len(cores) for cores in
+                       allocator.get_allocations(stats.node.id, docker).values())
+            if stats.cpus - reserved - used >= needed:
+                pinnable.append(stats)
+
+        if not pinnable:
+            self.logger.warn("no node has enough free cores for "
+                             "pinned container")
+            return stats_list
+        return pinnable
+
+    def select(self, stats_list, count=1):
+        """Selects nodes using the strategy.
+
+        Each selection is accounted into node stats, so subsequent
+        selections see the expected usage.
+
+        :param stats_list: A list of :class:`~gluuengine.placement.stats.NodeStats`.
+        :param count: Number of containers to place.
+        :returns: A list of node objects (one for each container).
+        """
+        selected = []
+        for _ in xrange(count):
+            if not stats_list:
+                break
+
+            fit = [stats for stats in stats_list
+                   if self.strategy.fits(stats, self.container_mem)]
+            if not fit:
+                # none has enough memory; overcommit the best node
+                # rather than rejecting the deployment
+                self.logger.warn("no node has enough memory for new container")
+                fit = stats_list
+
+            best = min(fit, key=lambda stats: self.strategy.score(stats, self.container_mem))
+            best.add_container(self.container_mem)
+            selected.append(best.node)
+        return selected
+
+    def place(self, container_type, count=1):
+        """Selects nodes for new containers.
+
+        Must be called within app context.
+
+        :param container_type: Type of the container.
+        :param count: Number of containers to place.
+        :returns: A list of node objects (one for each container).
+        :raises: :class:`PlacementError` if there's no available node.
+        """
+        nodes = self.get_candidates(container_type)
+        stats_list = self.collect_stats(nodes)
+        if not stats_list:
+            raise PlacementError("no node available for {} "
+                                 "container".format(container_type))
+
+        if (container_type in PINNED_CONTAINER_TYPES
+                and as_boolean(self.app.config["CPU_PINNING_ENABLED"])):
+            stats_list = self.filter_pinnable(stats_list, container_type)
+
+        selected = self.select(stats_list, count)
+        self.logger.info("{} {} container(s) placed using {} strategy: {}".format(
+            count, container_type, self.strategy.name,
+            ", ".join(node.name for node in selected),
+        ))
+        return selected
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import os.path
+
+from ..model import STATE_IN_PROGRESS
+from ..model import STATE_SUCCESS
+from ..model import Container
+from .cpuset import parse_cpuset
+
+#: Types of container running JVM which are sized by the engine
+JVM_CONTAINER_TYPES = ("oxauth", "oxtrust",)
+
+MB = 1024 ** 2
+
+# smallest heap given to a JVM, even if node is overcommitted
+MIN_HEAP = 256 * MB
+
+# heap that makes G1 worth its overhead
+G1_MIN_HEAP = 2048 * MB
+
+# fraction of container's memory used for heap; the rest is for
+# metaspace, code cache, thread stacks, and other native memory
+HEAP_RATIO = 0.65
+
+METASPACE_RATIO = 0.1
+MIN_METASPACE = 128 * MB
+MAX_METASPACE = 512 * MB
+
+
+def get_jvm_options(mem_total, cpus, density, mem_limit=None,
+                    node_mem_ratio=0.75, pinned_cpus=0):
+    """Computes JVM options of a container.
+
+    Without memory limit, container's memory budget is its share of
+    node's memory among the JVM containers in the node.
+
+    :param mem_total: Total memory of the node (in bytes).
+    :param cpus: Number of CPUs in the node.
+    :param density: Number of JVM containers in the node.
+    :param mem_limit: Memory limit of the container (in bytes).
+    :param node_mem_ratio: Fraction of node's memory available
+                           for JVM containers.
+    :param pinned_cpus: Number of cores dedicated to the container
+                        (if pinned).
+    :returns: A list of JVM options.
+    """
+    density = max(density, 1)
+    cpus = max(cpus, 1)
+
+    budget = mem_limit or int(mem_total * node_mem_ratio / density)
+
+    heap = max(int(budget * HEAP_RATIO) // MB * MB, MIN_HEAP)
+    metaspace = min(max(int(budget * METASPACE_RATIO) // MB * MB,
+                        MIN_METASPACE), MAX_METASPACE)
+
+    if pinned_cpus:
+        gc_threads = pinned_cpus
+    else:
+        # GC threads are shared by all JVMs in the node
+        gc_threads = max(cpus // density, 1)
+
+    options = [
+        "-server",
+        # fixed heap size avoids resizing pauses and makes
+        # container's memory usage predictable
+        "-Xms{}m".format(heap // MB),
+        "-Xmx{}m".format(heap // MB),
+        "-XX:MetaspaceSize={}m".format(metaspace // MB),
+        "-XX:MaxMetaspaceSize={}m".format(metaspace // MB),
+        "-Xss{}".format("256k" if budget < 1024 * MB else "512k"),
+    ]
+
+    if heap >= G1_MIN_HEAP and gc_threads >= 2:
+        options.extend([
+            "-XX:+UseG1GC",
+            "-XX:MaxGCPauseMillis=200",
+            "-XX:ConcGCThreads={}".format(max(gc_threads // 4, 1)),
+        ])
+    elif gc_threads >= 2:
+        options.append("-XX:+UseParallelGC")
+    else:
+        options.append("-XX:+UseSerialGC")
+
+    options.extend([
+        "-XX:ParallelGCThreads={}".format(gc_threads),
+        "-XX:+DisableExplicitGC",
+    ])
+    return options
+
+
+def get_option_key(option):
+    """Gets key of a JVM option; options sharing the same key override
+    each other.
+
+    :param option: A JVM option, e.g. ``-Xmx1024m``.
+    :returns: Key of the option.
+    """
+    if option.startswith("-XX:"):
+        name = option[4:].lstrip("+-").split("=", 1)[0]
+        # garbage collectors can't be combined
+        if name.startswith("Use") and name.endswith("GC"):
+            return "-XX:Use*GC"
+        return "-XX:" + name
+
+    for prefix in ("-Xms", "-Xmx", "-Xss", "-Xmn",):
+        if option.startswith(prefix):
+            return prefix
+    return option.split("=", 1)[0]
+
+
+def merge_jvm_options(command, options, previous=None):
+    """Merges JVM options into a java command line.
+
+    Options overridden by the new ones (or previously set by the engine)
+    are removed; other options (e.g. ``-D`` flags) are kept as-is.
+
+    :param command: Command line that runs ``java``.
+    :param options: A list of JVM options.
+    :param previous: A list of JVM options previously merged into
+                     the command.
+    :returns: The merged command line.
+    :raises ValueError: If ``java`` is not found in the command.
+    """
+    tokens = command.split()
+    try:
+        java = [os.path.basename(token) for token in tokens].index("java")
+    except ValueError:
+        raise ValueError("java is not found in command {!r}".format(command))
+
+    keys = set(get_option_key(option) for option in options)
+    previous = set(previous or [])
+    rest = [token for token in tokens[java + 1:]
+            if token not in previous and get_option_key(token) not in keys]
+    return " ".join(tokens[:java + 1] + list(options) + rest)
+
+
+def get_jvm_containers(node_id, exclude=None):
+    """Gets JVM containers deployed (or being deployed) in a node.
+
+    Must be called within app context.
+
+    :param node_id: ID of the node.
+    :param exclude: ID of container to exclude, e.g. container being
+                    removed.
+    :returns: A list of container objects.
+    """
+    query = Container.query.filter(
+        Container.node_id == node_id,
+        Container.type.in_(JVM_CONTAINER_TYPES),
+        Container.state.in_([STATE_SUCCESS, STATE_IN_PROGRESS]),
+    )
+    if exclude:
+        query = query.filter(Container.id != exclude)
+    return query.all()
+
+
+class JvmSizer(object):
+    """Sizes JVM of containers in a node.
+
+    :param app: An instance of :class:`flask.Flask`.
+    :param docker: An instance of :class:`~gluuengine.dockerclient.Docker`
+                   connected to the node.
+    """
+    def __init__(self, app, docker):
+        self.app = app
+        self.docker = docker
+        self._info = None
+
+    @property
+    def info(self):
+        if self._info is None:
+            self._info = self.docker.get_info()
+        return self._info
+
+    def get_options(self, container, density):
+        """Computes JVM options of a container.
+
+        :param container: Container object.
+        :param density: Number of JVM containers in the node.
+        :returns: A list of JVM options.
+        """
+        container_attrs = container.container_attrs or {}
+        resources = container_attrs.get("resources", {})
+        return get_jvm_options(
+            self.info.get("MemTotal", 0),
+            self.info.get("NCPU", 1),
+            density,
+            mem_limit=resources.get("mem_limit"),
+            node_mem_ratio=self.app.config["JVM_NODE_MEM_RATIO"],
+            pinned_cpus=len(parse_cpuset(container_attrs.get("cpuset"))),
+        )
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import heapq
+from collections import defaultdict
+
+
+def is_unhealthy(container):
+    """Checks whether container is reported as unhealthy.
+
+    :param container: Container object.
+    """
+    attrs = container.container_attrs or {}
+    return attrs.get("health") == "unhealthy"
+
+
+def _victim_key(container):
+    # sorted in reverse order, hence unhealthy and newest containers
+    # come first; containers without ``created_at`` come last
+    return (
+        is_unhealthy(container),
+        container.created_at is not None,
+        container.created_at,
+    )
+
+
+def select_victims(containers, number):
+    """Selects containers to remove when scaling in.
+
+    Unhealthy containers are removed first, followed by containers
+    from the node having the most containers, so remaining containers
+    are kept balanced across nodes. Within a node, newest container
+    is removed first.
+
+    :param containers: A list of container objects.
+    :param number: Number of containers to remove.
+    :returns: A list of container objects.
+    """
+    groups = defaultdict(list)
+    for container in containers:
+        groups[container.node_id].append(container)
+
+    heap = []
+    for node_id, group in groups.iteritems():
+        group.sort(key=_victim_key, reverse=True)
+        # the last item is the next victim of the group
+        group.reverse()
+        heapq.heappush(heap, _heap_entry(node_id, group))
+
+    victims = []
+    while heap and len(victims) < number:
+        _, _, node_id = heapq.heappop(heap)
+        group = groups[node_id]
+        victims.append(group.pop())
+        if group:
+            heapq.heappush(heap, _heap_entry(node_id, group))
+    return victims
+
+
+def _heap_entry(node_id, group):
+    return (not is_unhealthy(group[-1]), -len(group), node_id)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+
+class NodeStats(object):
+    """Resource capacity and usage of a node.
+
+    :param node: Node object.
+    :param cpus: Number of CPUs.
+    :param mem_total: Total memory (in bytes).
+    :param mem_used: Memory used by containers (in bytes).
+    :param cpu_used: CPU used by containers (in number of CPUs).
+    :param containers: Number of containers.
+    """
+    def __init__(self, node, cpus=0, mem_total=0, mem_used=0,
+                 cpu_used=0.0, containers=0):
+        self.node = node
+        self.cpus = cpus
+        self.mem_total = mem_total
+        self.mem_used = mem_used
+        self.cpu_used = cpu_used
+        self.containers = containers
+
+    @property
+    def mem_free(self):
+        return max(self.mem_total - self.mem_used, 0)
+
+    @property
+    def mem_ratio(self):
+        """Fraction of memory in use.
+        """
+        if not self.mem_total:
+            return 1.0
+        return float(self.mem_used) / self.mem_total
+
+    @property
+    def cpu_ratio(self):
+        """Fraction of CPU in use.
+        """
+        if not self.cpus:
+            return 1.0
+        return float(self.cpu_used) / self.cpus
+
+    @property
+    def load(self):
+        """Load of the node, i.e. the most utilized resource.
+        """
+        return max(self.mem_ratio, self.cpu_ratio)
+
+    def add_container(self, mem):
+        """Accounts new container placed into the node.
+
+        :param mem: Estimated memory used by the container (in bytes).
+        """
+        self.containers += 1
+        self.mem_used += mem
+
+    def as_dict(self):
+        return {
+            "node": self.node.name,
+            "cpus": self.cpus,
+            "mem_total": self.mem_total,
+            "mem_used": self.mem_used,
+            "cpu_used": self.cpu_used,
+            "containers": self.containers,
+        }
+
+
+def get_cpu_used(stats):
+    """Computes CPU usage (in number of CPUs) from container stats.
+
+    :param stats: Stats of the container as returned by Docker API.
+    """
+    cpu_stats = stats.get("cpu_stats", {})
+    precpu_stats = stats.get("precpu_stats", {})
+
+    cpu_delta = (cpu_stats.get("cpu_usage", {}).get("total_usage", 0)
+                 - precpu_stats.get("cpu_usage", {}).get("total_usage", 0))
+    system_delta = (cpu_stats.get("system_cpu_usage", 0)
+                    - precpu_stats.get("system_cpu_usage", 0))
+
+    if cpu_delta <= 0 or system_delta <= 0:
+        return 0.0
+
+    online_cpus = len(cpu_stats.get("cpu_usage", {}).get("percpu_usage") or [1])
+    return float(cpu_delta) / system_delta * online_cpus
+
+
+def get_mem_used(stats):
+    """Gets memory usage (in bytes) from container stats.
+
+    Page cache is excluded, as it can be reclaimed by the kernel.
+
+    :param stats: Stats of the container as returned by Docker API.
+    """
+    mem_stats = stats.get("memory_stats", {})
+    usage = mem_stats.get("usage", 0)
+    cache = mem_stats.get("stats", {}).get("cache", 0)
+    return max(usage - cache, 0)
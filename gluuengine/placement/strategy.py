@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+
+class BaseStrategy(object):
+    """Base class of placement strategy.
+
+    Subclass must implement ``score`` method; node with the lowest
+    score is selected.
+    """
+    name = ""
+
+    def score(self, stats, mem):
+        """Scores a node.
+
+        :param stats: An instance of :class:`~gluuengine.placement.stats.NodeStats`.
+        :param mem: Estimated memory used by the container (in bytes).
+        :returns: A sortable score.
+        """
+        raise NotImplementedError("score method must be overriden")
+
+    def fits(self, stats, mem):
+        """Checks whether node has enough memory for the container.
+
+        :param stats: An instance of :class:`~gluuengine.placement.stats.NodeStats`.
+        :param mem: Estimated memory used by the container (in bytes).
+        """
+        return stats.mem_free >= mem
+
+
+class SpreadStrategy(BaseStrategy):
+    """Places container into node having the fewest containers.
+
+    Ties are broken by the amount of free memory, so bigger node
+    is preferred.
+    """
+    name = "spread"
+
+    def score(self, stats, mem):
+        return (stats.containers, -stats.mem_free)
+
+
+class BinpackStrategy(BaseStrategy):
+    """Places container into the most utilized node which still has
+    enough memory, so the other nodes are kept free.
+    """
+    name = "binpack"
+
+    def score(self, stats, mem):
+        return (stats.mem_free, -stats.containers)
+
+
+class LeastLoadedStrategy(BaseStrategy):
+    """Places container into node having the lowest CPU or memory
+    utilization, relative to node capacity.
+    """
+    name = "least-loaded"
+
+    def score(self, stats, mem):
+        return (stats.load, stats.containers)
+
+
+#: Available strategies, keyed by name
+STRATEGIES = {
+    SpreadStrategy.name: SpreadStrategy,
+    BinpackStrategy.name: BinpackStrategy,
+    LeastLoadedStrategy.name: LeastLoadedStrategy,
+}
+
+
+def get_strategy(name):
+    """Gets placement strategy by its name.
+
+    :param name: Name of the strategy.
+    :returns: An instance of strategy class.
+    """
+    try:
+        return STRATEGIES[name]()
+    except KeyError:
+        raise ValueError("unsupported placement strategy {}".format(name))
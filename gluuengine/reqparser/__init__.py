@@ -13,3 +13,6 @@ from .provider import AwsProviderReq  # noqa
 from .license import LicenseKeyReq  # noqa
 from .container import ContainerReq  # noqa
 from .setting import LdapSettingReq  # noqa
+from .setting import NginxSettingReq  # noqa
+from .deployment import DeploymentReq  # noqa
+from .profile import ResourceProfileReq  # noqa
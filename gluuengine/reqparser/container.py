@@ -13,7 +13,8 @@ from ..model import LicenseKey
 
 
 class ContainerReq(ma.Schema):
-    node_id = ma.Str(required=True)
+    # if omitted, node is selected by placement engine
+    node_id = ma.Str()
 
     @validates("node_id")
     def validate_node(self, value):
@@ -36,17 +37,8 @@ class ContainerReq(ma.Schema):
                 raise ValidationError("cannot deploy container to worker node "
                                       "due to missing license")
 
-            if license_key.expired:
-                raise ValidationError("cannot deploy container to "
-                                      "node with expired license")
-
-            if license_key.mismatched:
-                raise ValidationError("cannot deploy container to "
-                                      "node with incorrect product license")
-
-            if not license_key.is_active:
-                raise ValidationError("cannot deploy container to "
-                                      "node with non-active license")
+            if license_key.deploy_error:
+                raise ValidationError(license_key.deploy_error)
 
     @post_load
     def finalize_data(self, data):
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+from marshmallow import validates
+from marshmallow import ValidationError
+
+from ..extensions import ma
+
+
+class DeploymentReq(ma.Schema):
+    replicas = ma.Int(required=True)
+
+    @validates("replicas")
+    def validate_replicas(self, value):
+        """Validates number of replicas.
+
+        :param value: Desired number of replicas.
+        """
+        if value < 0:
+            raise ValidationError("replicas cannot be lower than 0")
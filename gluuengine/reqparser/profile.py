@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+from marshmallow import validates
+from marshmallow import validates_schema
+from marshmallow import ValidationError
+
+from ..extensions import ma
+from ..model import Node
+from ..model import ResourceProfile
+from ..model.profile import LIMIT_FIELDS
+
+#: Container types which may have resource profile
+PROFILE_CONTAINER_TYPES = (
+    "oxauth",
+    "oxtrust",
+    "nginx",
+    "oxeleven",
+)
+
+
+class ResourceProfileReq(ma.Schema):
+    container_type = ma.Str(required=True)
+
+    # if omitted, profile applies to all nodes
+    node_id = ma.Str(missing=None, allow_none=True)
+
+    mem_limit = ma.Int(missing=None, allow_none=True)
+    mem_reservation = ma.Int(missing=None, allow_none=True)
+    cpu_shares = ma.Int(missing=None, allow_none=True)
+    cpu_quota = ma.Int(missing=None, allow_none=True)
+    nofile = ma.Int(missing=None, allow_none=True)
+    nproc = ma.Int(missing=None, allow_none=True)
+    pids_limit = ma.Int(missing=None, allow_none=True)
+
+    @validates("container_type")
+    def validate_container_type(self, value):
+        """Validates container type.
+
+        :param value: Type of the container.
+        """
+        if value not in PROFILE_CONTAINER_TYPES:
+            raise ValidationError("unsupported container type")
+
+    @validates("node_id")
+    def validate_node(self, value):
+        """Validates node's ID.
+
+        :param value: ID of the node.
+        """
+        if value and not Node.query.get(value):
+            raise ValidationError("invalid node ID")
+
+    @validates_schema
+    def validate_limits(self, data):
+        """Validates limits.
+
+        :param data: Profile data.
+        """
+        for field in LIMIT_FIELDS:
+            if data.get(field) is not None and data[field] <= 0:
+                raise ValidationError("{} must be greater than 0".format(field),
+                                      field)
+
+        mem_limit = data.get("mem_limit")
+        mem_reservation = data.get("mem_reservation")
+        if mem_limit and mem_reservation and mem_reservation > mem_limit:
+            raise ValidationError("mem_reservation cannot be greater than "
+                                  "mem_limit", "mem_reservation")
+
+        # only 1 profile per container type and node
+        profile = ResourceProfile.query.filter_by(
+            container_type=data.get("container_type"),
+            node_id=data.get("node_id"),
+        ).first()
+        if profile and profile.id != self.context.get("profile_id"):
+            raise ValidationError("profile for the container type and node "
+                                  "already exists", "container_type")
@@ -3,6 +3,9 @@
 #
 # All rights reserved.
 
+from marshmallow import validates_schema
+from marshmallow import ValidationError
+
 from ..extensions import ma
 
 
@@ -14,3 +17,36 @@ class LdapSettingReq(ma.Schema):
     encoded_salt = ma.Str(required=True)
     inum_appliance = ma.Str(required=True)
     inum_org = ma.Str(missing="")
+
+
+class NginxSettingReq(ma.Schema):
+    proxy_cache = ma.Bool(missing=True)
+    cache_ttl = ma.Int(missing=60)
+    cache_inactive = ma.Int(missing=600)
+    cache_max_size = ma.Int(missing=100)
+    cache_keys_zone = ma.Int(missing=10)
+    stale_while_revalidate = ma.Bool(missing=True)
+    serve_static = ma.Bool(missing=True)
+    static_ttl = ma.Int(missing=3600)
+    http2 = ma.Bool(missing=True)
+    ssl_session_cache = ma.Int(missing=10)
+    ssl_session_timeout = ma.Int(missing=14400)
+    ocsp_stapling = ma.Bool(missing=False)
+    worker_connections = ma.Int(missing=4096)
+
+    @validates_schema
+    def validate_cache(self, data):
+        """Validates cache sizes and TTLs.
+
+        :param data: Setting data.
+        """
+        for field in ("cache_ttl", "cache_inactive", "cache_max_size",
+                      "cache_keys_zone", "static_ttl", "ssl_session_cache",
+                      "ssl_session_timeout", "worker_connections"):
+            if data.get(field, 0) <= 0:
+                raise ValidationError("{} must be greater than 0".format(field),
+                                      field)
+
+        if data.get("cache_inactive", 0) < data.get("cache_ttl", 0):
+            raise ValidationError("cache_inactive cannot be lower than "
+                                  "cache_ttl", "cache_inactive")
@@ -3,28 +3,6 @@
 #
 # All rights reserved.
 
-from .provider import ProviderResource  # noqa
-from .provider import ProviderListResource  # noqa
-from .provider import CreateProviderResource  # noqa
-
-from .license import LicenseKeyListResource  # noqa
-from .license import LicenseKeyResource  # noqa
-
-from .cluster import ClusterResource  # noqa
-from .cluster import ClusterListResource  # noqa
-
-from .node import NodeResource  # noqa
-from .node import NodeListResource  # noqa
-from .node import CreateNodeResource  # noqa
-
-from .container import ContainerLogResource  # noqa
-from .container import ContainerLogSetupResource  # noqa
-from .container import ContainerLogTeardownResource  # noqa
-from .container import ContainerLogListResource  # noqa
-
-from .container import ContainerListResource  # noqa
-from .container import ContainerResource  # noqa
-from .container import NewContainerResource  # noqa
-from .container import ScaleContainerResource  # noqa
-
-from .setting import LdapSettingResource  # noqa
+# Resources are registered by their import path (see ``gluuengine.app``)
+# and only imported when the app registers its REST API, hence nothing
+# is imported here.
@@ -3,6 +3,7 @@
 #
 # All rights reserved.
 
+from blinker import signal
 from flask import request
 from flask import url_for
 from flask_restful import Resource
@@ -30,6 +31,7 @@ class ClusterResource(Resource):
 
         db.session.delete(cluster)
         db.session.commit()
+        signal("cluster_changed").send(cluster)
         return {}, 204
 
 
@@ -54,6 +56,7 @@ class ClusterListResource(Resource):
         cluster = Cluster(**data)
         db.session.add(cluster)
         db.session.commit()
+        signal("cluster_changed").send(cluster)
 
         headers = {
             "Location": url_for("cluster", cluster_id=cluster.id),
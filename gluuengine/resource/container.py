@@ -4,7 +4,6 @@
 # All rights reserved.
 
 import os
-from itertools import cycle
 
 import concurrent.futures
 from flask import abort
@@ -26,6 +25,9 @@ from ..helper import OxtrustContainerHelper
 from ..helper import NginxContainerHelper
 # from ..helper import OxasimbaContainerHelper
 from ..helper import OxelevenContainerHelper
+from ..helper import SCALE_HELPER_CLASSES
+from ..helper import setup_helper_generator
+from ..helper import teardown_helper_generator
 from ..model import OxauthContainer
 from ..model import OxtrustContainer
 from ..model.container import Container
@@ -38,6 +40,11 @@ from ..machine import Machine
 from ..utils import as_boolean
 from ..model.node import Node
 from ..model import Cluster
+from ..model import Deployment
+from ..metrics import read_stats
+from ..placement import PlacementEngine
+from ..placement import PlacementError
+from ..placement import select_victims
 
 
 #: List of supported container
@@ -186,6 +193,26 @@ class ContainerListResource(Resource):
         ]
 
 
+class ContainerStatsResource(Resource):
+    def get(self, container_id):
+        container = get_container(db, container_id)
+        if not container:
+            return {"status": 404, "message": "Container not found"}, 404
+
+        series = read_stats(current_app._get_current_object(),
+                            "containers", container.id)
+        if not series:
+            return {
+                "status": 404,
+                "message": "Container stats are unavailable",
+            }, 404
+        return {
+            "id": container.id,
+            "name": container.name,
+            "stats": series.as_dict(request.args.get("tier")),
+        }
+
+
 class NewContainerResource(Resource):
     helper_classes = {
         "oxauth": OxauthContainerHelper,
@@ -231,7 +258,13 @@ class NewContainerResource(Resource):
                 "message": "container deployment requires a cluster",
             }, 403
 
-        node = data["context"]["node"]
+        node = data["context"].get("node")
+        if not node:
+            # let placement engine decide the target node
+            try:
+                node = PlacementEngine(app).place(container_type)[0]
+            except PlacementError as exc:
+                return {"status": 403, "message": str(exc)}, 403
 
         # reject request if target node is unreachable
         if not target_node_reachable(node.name):
@@ -429,66 +462,15 @@ class ContainerLogListResource(Resource):
 
 
 class ScaleContainerResource(Resource):
-    SCALE_ENABLE_CONTAINERS = (
-        "oxauth",
-        # "oxidp",  # disabled for now
-    )
-
-    helper_classes = {
-        "oxauth": OxauthContainerHelper,
-        # "oxidp": OxidpContainerHelper,  # disabled for now
-    }
+    SCALE_ENABLE_CONTAINERS = tuple(SCALE_HELPER_CLASSES.keys())
 
-    container_classes = {
-        "oxauth": OxauthContainer,
-        # "oxidp": OxidpContainer,  # disabled for now
-    }
-
-    def get_running_nodes(self):
-        m = Machine()
-        running_nodes = m.list('running')
-
-        try:
-            dcv_node = Node.query.filter_by(type="discovery").first()
-            running_nodes.remove(dcv_node.name)
-        except IndexError:
-            pass
-        return running_nodes
-
-    def make_node_id_pool(self, nodes):
-        running_nodes = self.get_running_nodes()
-        running_nodes_ids = [node.id for node in nodes if node.name in running_nodes]
-        #make a circular id list of running nodes
-        return cycle(running_nodes_ids)
-
-    def setup_obj_generator(self, app, container_type, number, cluster_id, node_id_pool):
-        with app.app_context():
-            for i in xrange(number):
-                container_class = self.container_classes[container_type]
-                container = container_class(**{
-                    "cluster_id": cluster_id,
-                    "node_id": node_id_pool.next(),
-                    "state": STATE_IN_PROGRESS,
-                    # "container_attrs": {},
-                })
-                db.session.add(container)
-                db.session.flush()
-                container.name = "{}_{}".format(container.image, container.id)
-                db.session.commit()
-
-                # log related setup
-                container_log = ContainerLog.create_or_get(container)
-                container_log.state = STATE_SETUP_IN_PROGRESS
-                # TODO: update the row
-                db.session.add(container_log)
-                db.session.commit()
-                logpath = os.path.join(app.config["CONTAINER_LOG_DIR"],
-                                       container_log.setup_log)
-
-                # make the setup obj
-                helper_class = self.helper_classes[container_type]
-                helper = helper_class(container, app, logpath)
-                yield helper
+    def is_deployment_managed(self, container_type):
+        """Checks whether number of containers is maintained
+        by deployment reconciler.
+        """
+        return bool(Deployment.query.filter_by(
+            container_type=container_type,
+        ).count())
 
     @run_in_reactor
     def scaleosorus(self, setup_obj_generator):
@@ -502,6 +484,13 @@ class ScaleContainerResource(Resource):
         if container_type not in self.SCALE_ENABLE_CONTAINERS:
             abort(404)
 
+        if self.is_deployment_managed(container_type):
+            return {
+                "status": 403,
+                "message": "{0} containers are managed by deployment; "
+                           "use /deployments/{0} instead".format(container_type),
+            }, 403
+
         if number <= 0:
             return {
                 "status": 403,
@@ -523,10 +512,15 @@ class ScaleContainerResource(Resource):
                 "message": "container deployment requires nodes",
             }, 403
 
-        node_id_pool = self.make_node_id_pool(nodes)
+        # select target nodes based on their capacity and usage
+        try:
+            target_nodes = PlacementEngine(app).place(container_type, number)
+        except PlacementError as exc:
+            return {"status": 403, "message": str(exc)}, 403
+        node_id_pool = [node.id for node in target_nodes]
 
         #make a list of container setup object
-        sg = self.setup_obj_generator(app, container_type, number, cluster.id, node_id_pool)
+        sg = setup_helper_generator(app, container_type, cluster.id, node_id_pool)
 
         self.scaleosorus(sg)
 
@@ -541,22 +535,6 @@ class ScaleContainerResource(Resource):
             for delete_obj in delete_obj_generator:
                 executor.submit(delete_obj.mp_teardown)
 
-    def delete_obj_generator(self, app, containers):
-        with app.app_context():
-            for container in containers:
-                db.session.delete(container)
-                db.session.commit()
-                container_log = ContainerLog.create_or_get(container)
-                container_log.state = STATE_TEARDOWN_IN_PROGRESS
-                # TODO: update the row
-                db.session.add(container_log)
-                db.session.commit()
-                logpath = os.path.join(app.config["CONTAINER_LOG_DIR"],
-                                       container_log.teardown_log)
-                helper_class = self.helper_classes[container.type]
-                helper = helper_class(container, app, logpath)
-                yield helper
-
     def delete(self, container_type, number):
         app = current_app._get_current_object()
 
@@ -564,6 +542,13 @@ class ScaleContainerResource(Resource):
         if container_type not in self.SCALE_ENABLE_CONTAINERS:
             abort(404)
 
+        if self.is_deployment_managed(container_type):
+            return {
+                "status": 403,
+                "message": "{0} containers are managed by deployment; "
+                           "use /deployments/{0} instead".format(container_type),
+            }, 403
+
         #validate number
         if number <= 0:
             return {
@@ -586,22 +571,11 @@ class ScaleContainerResource(Resource):
             type=container_type, state=STATE_SUCCESS,
         ).all()
 
-        # select and arrange containers
-        nodes = Node.query.filter(Node.type.in_(["master", "worker"])).all()
-        node_id_pool = self.make_node_id_pool(nodes)
-
-        containers_reorder = []
-        while True:
-            nid = node_id_pool.next()
-            for con in containers:
-                if con.node_id == nid and con not in containers_reorder:
-                    containers_reorder.append(con)
-                    break
-            if len(containers_reorder) == number:
-                break
+        # select containers from the most loaded nodes first
+        containers_reorder = select_victims(containers, number)
 
         # get a genatator of delete_object
-        dg = self.delete_obj_generator(app, containers_reorder)
+        dg = teardown_helper_generator(app, containers_reorder)
         # start backgroung delete operation
         self.delscaleosorus(dg)
 
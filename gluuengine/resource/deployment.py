@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+from flask import abort
+from flask import current_app
+from flask import request
+from flask_restful import Resource
+
+from ..extensions import db
+from ..helper import SCALE_HELPER_CLASSES
+from ..model import Deployment
+from ..reqparser import DeploymentReq
+from ..task.autoscaler import read_status
+from ..task.reconciler import DeploymentReconciler
+
+
+def format_deployment(deployment):
+    """Adds number of containers (grouped by state) to deployment data.
+
+    :param deployment: Deployment object.
+    """
+    data = deployment.as_dict()
+    reconciler = DeploymentReconciler(current_app._get_current_object())
+    data["containers"] = reconciler.get_counts(deployment.container_type)
+    return data
+
+
+class DeploymentListResource(Resource):
+    def get(self):
+        return [format_deployment(deployment)
+                for deployment in Deployment.query.all()]
+
+
+class DeploymentResource(Resource):
+    def get(self, container_type):
+        deployment = Deployment.query.filter_by(
+            container_type=container_type,
+        ).first()
+        if not deployment:
+            return {"status": 404, "message": "Deployment not found"}, 404
+        return format_deployment(deployment)
+
+    def put(self, container_type):
+        if container_type not in SCALE_HELPER_CLASSES:
+            abort(404)
+
+        data, errors = DeploymentReq().load(
+            request.get_json(silent=True) or request.form
+        )
+        if errors:
+            return {
+                "status": 400,
+                "message": "Invalid data",
+                "params": errors,
+            }, 400
+
+        deployment = Deployment.query.filter_by(
+            container_type=container_type,
+        ).first()
+        if not deployment:
+            deployment = Deployment(container_type=container_type)
+        deployment.replicas = data["replicas"]
+
+        db.session.add(deployment)
+        db.session.commit()
+
+        # containers are deployed or removed by reconciler task
+        return format_deployment(deployment), 202
+
+    def delete(self, container_type):
+        # existing containers are kept as they are
+        deployment = Deployment.query.filter_by(
+            container_type=container_type,
+        ).first()
+        if not deployment:
+            return {"status": 404, "message": "Deployment not found"}, 404
+
+        db.session.delete(deployment)
+        db.session.commit()
+        return {}, 204
+
+
+class AutoscalerResource(Resource):
+    def get(self):
+        status = read_status(current_app._get_current_object())
+        if not status:
+            return {
+                "status": 404,
+                "message": "autoscaler status is unavailable",
+            }, 404
+        return status
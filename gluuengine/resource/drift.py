@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+from flask import current_app
+from flask import request
+from flask_restful import Resource
+
+from ..task.drift import DriftReconciler
+from ..task.drift import read_status
+from ..utils import as_boolean
+
+
+class DriftResource(Resource):
+    def get(self):
+        report = read_status(current_app._get_current_object())
+        if not report:
+            return {
+                "status": 404,
+                "message": "drift report is unavailable",
+            }, 404
+        return report
+
+    def post(self):
+        app = current_app._get_current_object()
+        autofix = request.args.get("fix")
+        if autofix is not None:
+            autofix = as_boolean(autofix)
+        return DriftReconciler(app).check(autofix=autofix)
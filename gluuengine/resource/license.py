@@ -12,9 +12,8 @@ from flask_restful import Resource
 from ..extensions import db
 from ..model import LicenseKey
 from ..reqparser import LicenseKeyReq
-from ..model import STATE_DISABLED
-from ..model import STATE_SUCCESS
-from ..machine import Machine
+from ..helper import ContainerLifecycleHelper
+from ..task.licensewatcher import read_status
 from ..utils import retrieve_current_date
 from ..utils import populate_license
 
@@ -150,19 +149,19 @@ class LicenseKeyResource(Resource):
 
     @run_in_reactor
     def _enable_containers(self, license_key, app):
-        mc = Machine()
-
         with app.app_context():
-            for worker_node in license_key.get_workers():
-                containers = worker_node.get_containers(
-                    type_="oxauth", state=STATE_DISABLED,
-                )
-
-                for container in containers:
-                    container.state = STATE_SUCCESS
-                    db.session.add(container)
-                    db.session.commit()
-                    mc.ssh(
-                        worker_node.name,
-                        "docker restart {}".format(container.cid),
-                    )
+            worker_nodes = license_key.get_workers()
+
+        helper = ContainerLifecycleHelper(app)
+        helper.enable_containers(worker_nodes, "oxauth")
+
+
+class LicenseWatcherResource(Resource):
+    def get(self):
+        status = read_status(current_app._get_current_object())
+        if not status:
+            return {
+                "status": 404,
+                "message": "license watcher status is unavailable",
+            }, 404
+        return status
@@ -20,6 +20,9 @@ from ..node import DeployMasterNode
 from ..node import DeployWorkerNode
 from ..node import DeployMsgconNode
 from ..machine import Machine
+from ..metrics import read_stats
+from ..dockerclient import Docker
+from ..placement import CpusetAllocator
 from ..extensions import db
 from ..utils import as_boolean
 
@@ -253,3 +256,44 @@ class NodeResource(Resource):
             "Location": url_for("node", node_name=node.name),
         }
         return node.as_dict(), 202, headers
+
+
+class NodeStatsResource(Resource):
+    def get(self, node_name):
+        node = Node.query.filter_by(name=node_name).first()
+        if not node:
+            return {"status": 404, "message": "node not found"}, 404
+
+        series = read_stats(current_app._get_current_object(),
+                            "nodes", node.name)
+        if not series:
+            return {
+                "status": 404,
+                "message": "node stats are unavailable",
+            }, 404
+        return {
+            "name": node.name,
+            "stats": series.as_dict(request.args.get("tier")),
+        }
+
+
+class NodeCpusetResource(Resource):
+    def get(self, node_name):
+        node = Node.query.filter_by(name=node_name).first()
+        if not node:
+            return {"status": 404, "message": "node not found"}, 404
+
+        try:
+            docker = Docker(Machine().config(node.name), {})
+            cpus = docker.get_info().get("NCPU", 0)
+        except Exception:
+            return {
+                "status": 503,
+                "message": "unable to get CPUs of the node",
+            }, 503
+
+        allocator = CpusetAllocator(current_app._get_current_object())
+        data = allocator.get_allocation_map(node.id, cpus, docker)
+        data["name"] = node.name
+        data["enabled"] = as_boolean(current_app.config["CPU_PINNING_ENABLED"])
+        return data
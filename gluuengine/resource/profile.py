@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+from flask import request
+from flask_restful import Resource
+
+from ..extensions import db
+from ..model import ResourceProfile
+from ..reqparser import ResourceProfileReq
+
+
+class ResourceProfileListResource(Resource):
+    def get(self):
+        return [profile.as_dict() for profile in ResourceProfile.query.all()]
+
+    def post(self):
+        data, errors = ResourceProfileReq().load(
+            request.get_json(silent=True) or request.form
+        )
+        if errors:
+            return {
+                "status": 400,
+                "message": "Invalid data",
+                "params": errors,
+            }, 400
+
+        profile = ResourceProfile(**data)
+        db.session.add(profile)
+        db.session.commit()
+
+        # limits are applied to containers deployed afterwards
+        return profile.as_dict(), 201
+
+
+class ResourceProfileResource(Resource):
+    def get(self, profile_id):
+        profile = ResourceProfile.query.get(profile_id)
+        if not profile:
+            return {"status": 404, "message": "Resource profile not found"}, 404
+        return profile.as_dict()
+
+    def put(self, profile_id):
+        profile = ResourceProfile.query.get(profile_id)
+        if not profile:
+            return {"status": 404, "message": "Resource profile not found"}, 404
+
+        data, errors = ResourceProfileReq(
+            context={"profile_id": profile.id},
+        ).load(request.get_json(silent=True) or request.form)
+        if errors:
+            return {
+                "status": 400,
+                "message": "Invalid data",
+                "params": errors,
+            }, 400
+
+        for k, v in data.iteritems():
+            setattr(profile, k, v)
+        db.session.add(profile)
+        db.session.commit()
+        return profile.as_dict()
+
+    def delete(self, profile_id):
+        profile = ResourceProfile.query.get(profile_id)
+        if not profile:
+            return {"status": 404, "message": "Resource profile not found"}, 404
+
+        db.session.delete(profile)
+        db.session.commit()
+        return {}, 204
@@ -3,12 +3,16 @@
 #
 # All rights reserved.
 
+from blinker import signal
+from flask import current_app
 from flask import request
 from flask_restful import Resource
 
 from ..extensions import db
 from ..model import LdapSetting
+from ..model import NginxSetting
 from ..reqparser import LdapSettingReq
+from ..reqparser import NginxSettingReq
 
 
 class LdapSettingResource(Resource):
@@ -30,6 +34,7 @@ class LdapSettingResource(Resource):
 
         db.session.add(ldap_setting)
         db.session.commit()
+        signal("ldap_setting_changed").send(ldap_setting)
         return ldap_setting.as_dict()
 
     def get(self):
@@ -43,4 +48,46 @@ class LdapSettingResource(Resource):
         if ldap_setting:
             db.session.delete(ldap_setting)
             db.session.commit()
+            signal("ldap_setting_changed").send(ldap_setting)
+        return {}, 204
+
+
+class NginxSettingResource(Resource):
+    def put(self):
+        data, errors = NginxSettingReq().load(
+            request.get_json(silent=True) or request.form
+        )
+        if errors:
+            return {
+                "status": 400,
+                "message": "Invalid data",
+                "params": errors,
+            }, 400
+
+        nginx_setting = NginxSetting.query.first()
+        if not nginx_setting:
+            nginx_setting = NginxSetting(**data)
+        else:
+            for k, v in data.iteritems():
+                setattr(nginx_setting, k, v)
+
+        db.session.add(nginx_setting)
+        db.session.commit()
+
+        # nginx containers are reconfigured by the signal receiver
+        signal("nginx_setting_changed").send(current_app._get_current_object())
+        return nginx_setting.as_dict()
+
+    def get(self):
+        nginx_setting = NginxSetting.query.first()
+        if nginx_setting:
+            return nginx_setting.as_dict()
+        return {}
+
+    def delete(self):
+        nginx_setting = NginxSetting.query.first()
+        if nginx_setting:
+            db.session.delete(nginx_setting)
+            db.session.commit()
+            signal("nginx_setting_changed").send(current_app._get_current_object())
         return {}, 204
@@ -28,6 +28,7 @@ class Config(object):
     # )
 
     TEMPLATES_DIR = os.path.join(APP_DIR, "templates")
+    JINJA_BYTECODE_CACHE_DIR = os.path.join(DATA_DIR, "jinja_cache")
     LOG_DIR = os.environ.get("LOG_DIR", "/var/log/gluuengine")
     CONTAINER_LOG_DIR = os.path.join(LOG_DIR, "containers")
     INSTANCE_DIR = os.path.join(DATA_DIR, "instance")
@@ -43,6 +44,86 @@ class Config(object):
     OXIDP_LOGS_VOLUME_DIR = os.path.join(LOG_DIR, "oxidp")
     OXTRUST_LOGS_VOLUME_DIR = os.path.join(LOG_DIR, "oxtrust")
 
+    # base of cluster-wide Java truststore
+    JDK_CACERTS_FILE = os.environ.get(
+        "JDK_CACERTS_FILE",
+        "/usr/lib/jvm/default-java/jre/lib/security/cacerts",
+    )
+
+    # strategy to select node for new container (spread, binpack, or least-loaded)
+    PLACEMENT_STRATEGY = os.environ.get("PLACEMENT_STRATEGY", "spread")
+
+    # estimated memory (in bytes) used by new container
+    PLACEMENT_CONTAINER_MEM = int(os.environ.get("PLACEMENT_CONTAINER_MEM", 1024 ** 3))
+
+    # pre-generated key material
+    KEYPOOL_DIR = os.path.join(DATA_DIR, "keypool")
+    KEYPOOL_SIZE = int(os.environ.get("KEYPOOL_SIZE", 10))
+
+    # cluster-wide TLS session ticket keys of nginx; key is rotated
+    # after its lifetime (in seconds) and kept for another lifetime
+    # to resume sessions issued before the rotation
+    TICKET_KEY_DIR = os.path.join(DATA_DIR, "ticket_keys")
+    TICKET_KEY_LIFETIME = int(os.environ.get("TICKET_KEY_LIFETIME", 60 * 60 * 12))
+
+    # container and node stats saved by stats collector
+    STATS_DIR = os.path.join(DATA_DIR, "stats")
+
+    # maximum number of containers created or removed per reconciliation
+    DEPLOYMENT_BATCH_SIZE = int(os.environ.get("DEPLOYMENT_BATCH_SIZE", 5))
+
+    # maximum number of container setups running concurrently
+    SETUP_MAX_WORKERS = int(os.environ.get("SETUP_MAX_WORKERS", 10))
+
+    # time (in seconds) after which container still in IN_PROGRESS state
+    # (e.g. its setup is interrupted by engine restart) is considered failed
+    DEPLOYMENT_SETUP_TIMEOUT = int(os.environ.get("DEPLOYMENT_SETUP_TIMEOUT", 1800))
+
+    # whether to fix drift between database and Docker automatically
+    DRIFT_AUTOFIX = os.environ.get("DRIFT_AUTOFIX", False)
+
+    # oxAuth autoscaler; targets are average CPU (in number of CPUs) and
+    # memory (fraction of limit) per container, and requests per second
+    # per replica (0 disables the metric)
+    AUTOSCALER_ENABLED = os.environ.get("AUTOSCALER_ENABLED", False)
+    AUTOSCALER_MIN_REPLICAS = int(os.environ.get("AUTOSCALER_MIN_REPLICAS", 1))
+    AUTOSCALER_MAX_REPLICAS = int(os.environ.get("AUTOSCALER_MAX_REPLICAS", 10))
+    AUTOSCALER_TARGET_CPU = float(os.environ.get("AUTOSCALER_TARGET_CPU", 0.7))
+    AUTOSCALER_TARGET_MEM = float(os.environ.get("AUTOSCALER_TARGET_MEM", 0.8))
+    AUTOSCALER_TARGET_RPS = float(os.environ.get("AUTOSCALER_TARGET_RPS", 50))
+    AUTOSCALER_SCALE_OUT_COOLDOWN = int(os.environ.get("AUTOSCALER_SCALE_OUT_COOLDOWN", 180))
+    AUTOSCALER_SCALE_IN_COOLDOWN = int(os.environ.get("AUTOSCALER_SCALE_IN_COOLDOWN", 600))
+
+    # JVM options of oxAuth and oxTrust computed from node capacity and
+    # number of JVM containers in the node; ratio is the fraction of
+    # node's memory shared by JVM containers without memory limit
+    JVM_AUTO_SIZING = os.environ.get("JVM_AUTO_SIZING", True)
+    JVM_NODE_MEM_RATIO = float(os.environ.get("JVM_NODE_MEM_RATIO", 0.75))
+
+    # pin oxAuth and nginx containers to dedicated cores; cores are
+    # allocated per container (unless CPU quota is set in resource profile)
+    # and the lowest cores are reserved for system and unpinned containers
+    CPU_PINNING_ENABLED = os.environ.get("CPU_PINNING_ENABLED", False)
+    CPU_PINNING_CORES = int(os.environ.get("CPU_PINNING_CORES", 2))
+    CPU_PINNING_RESERVED = int(os.environ.get("CPU_PINNING_RESERVED", 1))
+
+    # whether Docker engine of new master and worker nodes runs docker-proxy
+    # for published ports; disabling it leaves nginx's 80 and 443 to
+    # kernel NAT (host networking is not an option, as nginx must join
+    # the overlay network to reach its upstreams)
+    DOCKER_USERLAND_PROXY = os.environ.get("DOCKER_USERLAND_PROXY", True)
+
+    # overlay networks created when deploying master node; backend network
+    # (gluunet) is shared by all containers, unless edge subnet is set, in
+    # which case nginx and its upstreams are attached to separate edge
+    # network; driver options are comma-separated, e.g. ``key=value,key``
+    NETWORK_DRIVER = os.environ.get("NETWORK_DRIVER", "overlay")
+    NETWORK_SUBNET = os.environ.get("NETWORK_SUBNET", "10.0.8.0/21")
+    NETWORK_EDGE_SUBNET = os.environ.get("NETWORK_EDGE_SUBNET", "")
+    NETWORK_MTU = int(os.environ.get("NETWORK_MTU", 0))
+    NETWORK_ENCRYPTED = os.environ.get("NETWORK_ENCRYPTED", False)
+    NETWORK_DRIVER_OPTS = os.environ.get("NETWORK_DRIVER_OPTS", "")
+
     GLUU_IMAGE_TAG = os.environ.get("GLUU_IMAGE_TAG", "gluu-engine")
     ENABLE_LICENSE = True
 
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import hashlib
+import io
+import json
+import tarfile
+import threading
+from collections import OrderedDict
+
+# Maximum number of bundles kept in cache
+ARTIFACT_CACHE_SIZE = 64
+
+
+def make_bundle(files, mode=0o644, modes=None):
+    """Creates tar archive of in-memory files.
+
+    Archive members have fixed owner and modification time, hence
+    the same files always produce the same archive.
+
+    :param files: A ``dict`` of file name and its content.
+    :param mode: Permission of each file.
+    :param modes: A ``dict`` of file name and its permission, overriding
+                  ``mode`` for specific files.
+    :returns: Bytes of tar archive.
+    """
+    buf = io.BytesIO()
+    with tarfile.open(mode="w", fileobj=buf) as tf:
+        for name in sorted(files):
+            content = files[name]
+            if isinstance(content, unicode):
+                content = content.encode("utf-8")
+
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            info.mode = (modes or {}).get(name, mode)
+            tf.addfile(info, io.BytesIO(content))
+    return buf.getvalue()
+
+
+def get_artifact_key(name, ctx):
+    """Gets cache key of rendered artifact.
+
+    :param name: Name of the artifact (e.g. template name).
+    :param ctx: Context used to render the artifact.
+    """
+    digest = hashlib.sha256(json.dumps(ctx, sort_keys=True)).hexdigest()
+    return "{}:{}".format(name, digest)
+
+
+class ArtifactCache(object):
+    """Cache of rendered artifacts, stored as tar bundles ready for
+    ``put_archive``.
+
+    Bundles are addressed by artifact name and hash of its context,
+    so containers sharing the same config (e.g. oxAuth replicas)
+    share the same bundle, while changes to the context (e.g. LDAP
+    setting) always produce a new bundle.
+
+    :param size: Maximum number of bundles kept in cache.
+    """
+    def __init__(self, size=ARTIFACT_CACHE_SIZE):
+        self.size = size
+        self._bundles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_bundle(self, name, ctx, render):
+        """Gets tar bundle of rendered artifact, rendering it
+        if necessary.
+
+        :param name: Name of the artifact.
+        :param ctx: Context used to render the artifact.
+        :param render: Callable which receives ``ctx`` and returns
+                       a ``dict`` of file name and its content.
+        :returns: Bytes of tar archive.
+        """
+        key = get_artifact_key(name, ctx)
+
+        with self._lock:
+            bundle = self._bundles.pop(key, None)
+            if bundle is not None:
+                # mark as recently used
+                self._bundles[key] = bundle
+                return bundle
+
+        bundle = make_bundle(render(ctx))
+
+        with self._lock:
+            self._bundles[key] = bundle
+            while len(self._bundles) > self.size:
+                self._bundles.popitem(last=False)
+        return bundle
+
+    def clear(self, *args, **kwargs):
+        """Removes all bundles from cache.
+
+        Accepts arbitrary arguments, so it can be used as signal receiver.
+        """
+        with self._lock:
+            self._bundles.clear()
+
+    def __len__(self):
+        return len(self._bundles)
+
+
+#: Process-wide artifact cache
+artifact_cache = ArtifactCache()
@@ -8,16 +8,21 @@ import os.path
 import shutil
 import tempfile
 import time
-import uuid
-
-from jinja2 import Environment
-from jinja2 import PackageLoader
 
 from ..log import create_file_logger
 from ..machine import Machine
 from ..dockerclient import Docker
+from ..errors import DockerExecError
 from ..model import Node
 from ..model import LdapSetting
+from ..placement.jvm import merge_jvm_options
+from .artifacts import artifact_cache
+from .artifacts import make_bundle
+from .certgen import generate_cert
+from .certgen import generate_keystore
+from .keypool import KeyPool
+from .templates import get_template_registry
+from .truststore import TruststoreManager
 
 
 class BaseSetup(object):
@@ -33,9 +38,8 @@ class BaseSetup(object):
             self.node = Node.query.get(self.container.node_id)
 
             self.cluster = cluster
-            self.jinja_env = Environment(
-                loader=PackageLoader("gluuengine", "templates")
-            )
+            self.templates = get_template_registry(self.app)
+            self.jinja_env = self.templates.jinja_env
             self.template_dir = self.app.config["TEMPLATES_DIR"]
             self.machine = Machine()
             master_node = Node.query.filter_by(type="master").first()
@@ -45,6 +49,9 @@ class BaseSetup(object):
             )
             self.ldap_setting = LdapSetting.query.first()
 
+        # content of certificate files generated by this setup object
+        self._cert_files = {}
+
     def setup(self):  # pragma: no cover
         """Runs the actual setup. Must be overriden by subclass.
         """
@@ -75,8 +82,7 @@ class BaseSetup(object):
         file_basename = os.path.basename(src)
         local = os.path.join(self.build_dir, file_basename)
 
-        with codecs.open(src, "r", encoding="utf-8") as fp:
-            rendered_content = fp.read() % ctx
+        rendered_content = self.templates.render_text(src, ctx)
 
         with codecs.open(local, "w", encoding="utf-8") as fp:
             fp.write(rendered_content)
@@ -87,82 +93,82 @@ class BaseSetup(object):
     def gen_cert(self, suffix, password, user, group, hostname):
         """Generates certificates.
 
+        Certificates are generated by the engine and uploaded to the container as a single archive.
+
         :param suffix: Basename of certificate name (minus the file extension).
         :param password: Password used for signing the certificate.
         :param user: User who owns the certificate.
         :param group: Group who owns the certificate.
         :param hostname: Hostname used for CN (Common Name) value.
+        :returns: A ``dict`` of generated file path and its content.
         """
         self.logger.debug("generating certificates for {}".format(suffix))
+        subject = "/C=%s/ST=%s/L=%s/O=%s/CN=%s/emailAddress=%s" % (
+            self.cluster.country_code,
+            self.cluster.state,
+            self.cluster.city,
+            self.cluster.org_name,
+            hostname,
+            self.cluster.admin_email,
+        )
+
+        # use pre-generated key (if any) to skip the costly key generation
+        key = KeyPool.from_app(self.app).claim_key()
+
+        files = {
+            os.path.join(self.container.cert_folder, name): content
+            for name, content in generate_cert(
+                suffix, password, subject, key,
+            ).iteritems()
+        }
+
+        self.logger.debug("changing access to {} certificates".format(suffix))
         key_with_password = "{}/{}.key.orig".format(self.container.cert_folder, suffix)
         key = "{}/{}.key".format(self.container.cert_folder, suffix)
-        csr = "{}/{}.csr".format(self.container.cert_folder, suffix)
-        crt = "{}/{}.crt".format(self.container.cert_folder, suffix)
-
-        # command to create key with password file
-        keypass_cmd = " ".join([
-            "openssl", "genrsa", "-des3",
-            "-out", key_with_password,
-            "-passout", "pass:'{}'".format(password), "2048",
-        ])
-        keypass_cmd = '''sh -c "{}"'''.format(keypass_cmd)
-        self.docker.exec_cmd(self.container.cid, keypass_cmd)
-
-        # command to create key file
-        key_cmd = " ".join([
-            "openssl", "rsa",
-            "-in", key_with_password, "-passin",
-            "pass:'{}'".format(password),
-            "-out", key,
-        ])
-        key_cmd = '''sh -c "{}"'''.format(key_cmd)
-        self.docker.exec_cmd(self.container.cid, key_cmd)
-
-        # command to create csr file
-        csr_cmd = " ".join([
-            "openssl", "req", "-new",
-            "-key", key,
-            "-out", csr,
-            "-subj", "/C='%s'/ST='%s'/L='%s'/O='%s'/CN='%s'/emailAddress='%s'" % (
-                self.cluster.country_code,
-                self.cluster.state,
-                self.cluster.city,
-                self.cluster.org_name,
-                hostname,
-                self.cluster.admin_email,
+        self.upload_cert_files(files, user, group, [key_with_password, key])
+        return files
+
+    def upload_cert_files(self, files, user="", group="", private_files=None):
+        """Uploads certificate files to container as a single archive.
+
+        :param files: A ``dict`` of absolute path and its content.
+        :param user: User who owns the private files.
+        :param group: Group who owns the private files.
+        :param private_files: A list of path to files that only accessible
+                              by ``user``.
+        """
+        private_files = private_files or []
+
+        # private files are never readable by others, even before
+        # their ownership is changed
+        bundle = make_bundle({
+            path.lstrip("/"): content for path, content in files.iteritems()
+        }, modes={path.lstrip("/"): 0o600 for path in private_files})
+        self.docker.put_bundle(self.container.cid, "/", bundle,
+                               create_dir=False)
+        self._cert_files.update(files)
+
+        if private_files:
+            private_files = " ".join(private_files)
+            access_cmd = "chown {}:{} {} && chmod 700 {}".format(
+                user, group, private_files, private_files,
             )
-        ])
-        csr_cmd = '''sh -c "{}"'''.format(csr_cmd)
-        self.docker.exec_cmd(self.container.cid, csr_cmd)
-
-        # command to create crt file
-        crt_cmd = " ".join([
-            "openssl", "x509", "-req",
-            "-days", "365",
-            "-in", csr,
-            "-signkey", key,
-            "-out", crt,
-        ])
-        crt_cmd = '''sh -c "{}"'''.format(crt_cmd)
-        self.docker.exec_cmd(self.container.cid, crt_cmd)
+            access_cmd = '''sh -c "{}"'''.format(access_cmd)
+            self.docker.exec_cmd(self.container.cid, access_cmd)
 
-        self.logger.debug("changing access to {} certificates".format(suffix))
-        self.docker.exec_cmd(
-            self.container.cid,
-            "chown {}:{} {}".format(user, group, key_with_password),
-        )
-        self.docker.exec_cmd(
-            self.container.cid,
-            "chmod 700 {}".format(key_with_password),
-        )
-        self.docker.exec_cmd(
-            self.container.cid,
-            "chown {}:{} {}".format(user, group, key),
-        )
-        self.docker.exec_cmd(
-            self.container.cid,
-            "chmod 700 {}".format(key),
-        )
+    def get_cert_file(self, path):
+        """Gets content of certificate file.
+
+        :param path: Absolute path to certificate file in the container.
+        :returns: Content of the file.
+        """
+        if path not in self._cert_files:
+            # file is not generated nor uploaded by this setup object
+            local = os.path.join(self.build_dir, os.path.basename(path))
+            self.docker.copy_from_container(self.container.cid, path, local)
+            with open(local, "rb") as fp:
+                self._cert_files[path] = fp.read()
+        return self._cert_files[path]
 
     def change_cert_access(self, user, group):
         """Modifies ownership of certificates located under predefined path.
@@ -271,16 +277,21 @@ class BaseSetup(object):
 
         if os.path.exists(ssl_cert) and os.path.exists(ssl_key):
             # copy cert and key
-            self.logger.debug("copying existing SSL cert")
-            self.docker.copy_to_container(self.container.cid, ssl_cert, "/etc/certs/nginx.crt")
-            self.logger.debug("copying existing SSL key")
-            self.docker.copy_to_container(self.container.cid, ssl_key, "/etc/certs/nginx.key")
+            self.logger.debug("copying existing SSL cert and key")
+            files = {}
+            for src, dest in [(ssl_cert, "/etc/certs/nginx.crt"),
+                              (ssl_key, "/etc/certs/nginx.key")]:
+                with open(src, "rb") as fp:
+                    files[dest] = fp.read()
+            self.upload_cert_files(files)
         else:
-            self.gen_cert("nginx", self.cluster.decrypted_admin_pw,
-                          "www-data", "www-data", hostname)
+            files = self.gen_cert("nginx", self.cluster.decrypted_admin_pw,
+                                  "www-data", "www-data", hostname)
+
             # save certs locally, so we can reuse and distribute them
-            self.docker.copy_from_container(self.container.cid, "/etc/certs/nginx.crt", ssl_cert)
-            self.docker.copy_from_container(self.container.cid, "/etc/certs/nginx.key", ssl_key)
+            for src, dest in [("nginx.crt", ssl_cert), ("nginx.key", ssl_key)]:
+                with open(dest, "wb") as fp:
+                    fp.write(files[os.path.join(self.container.cert_folder, src)])
 
     def add_auto_startup_entry(self):
         """Adds supervisor program for auto-startup.
@@ -288,18 +299,69 @@ class BaseSetup(object):
 
 
 class OxSetup(BaseSetup):
+    #: Supervisor config of Jetty, which runs the JVM
+    jetty_supervisor_conf = "/etc/supervisor/conf.d/jetty.conf"
+
     def write_salt_file(self):
         """Copies salt file.
         """
         self.logger.debug("writing salt file")
 
-        salt = self.encoded_salt
-        local_dest = os.path.join(self.build_dir, "salt")
-        with codecs.open(local_dest, "w", encoding="utf-8") as fp:
-            fp.write("encodeSalt = {}".format(salt))
+        ctx = {"salt": self.encoded_salt}
+        bundle = artifact_cache.get_bundle(
+            "salt", ctx,
+            lambda ctx: {"salt": u"encodeSalt = {}".format(ctx["salt"])},
+        )
+        self.docker.put_bundle(self.container.cid,
+                               self.container.container_attrs["conf_dir"],
+                               bundle)
+
+    def write_jvm_options(self, options, previous=None):
+        """Merges JVM options into the command of Jetty's supervisor
+        program, so they take effect when supervisord reloads its
+        configuration.
+
+        :param options: A list of JVM options.
+        :param previous: A list of JVM options previously written
+                         by the engine.
+        """
+        self.logger.debug("writing JVM options")
+
+        conf = self.docker.exec_cmd(
+            self.container.cid, "cat {}".format(self.jetty_supervisor_conf),
+        ).retval
+
+        lines = []
+        section = ""
+        for line in conf.splitlines():
+            if line.startswith("["):
+                section = line.strip()
+            elif section == "[program:jetty]" and line.startswith("command="):
+                line = "command=" + merge_jvm_options(line[len("command="):],
+                                                      options, previous)
+            lines.append(line)
+
+        bundle = make_bundle({
+            os.path.basename(self.jetty_supervisor_conf): "\n".join(lines) + "\n",
+        })
+        self.docker.put_bundle(self.container.cid,
+                               os.path.dirname(self.jetty_supervisor_conf),
+                               bundle, create_dir=False)
+
+    def apply_jvm_options(self):
+        """Writes JVM options computed for the container (if any).
+
+        Must be called before supervisord is reloaded.
+        """
+        options = (self.container.container_attrs or {}).get("jvm_options")
+        if not options:
+            return
 
-        remote_dest = os.path.join(self.container.container_attrs["conf_dir"], "salt")
-        self.docker.copy_to_container(self.container.cid, local_dest, remote_dest)
+        try:
+            self.write_jvm_options(options)
+        except (DockerExecError, ValueError) as exc:
+            self.logger.warn("unable to write JVM options; "
+                             "reason={}".format(exc))
 
     def gen_keystore(self, suffix, keystore_fn, keystore_pw, in_key,
                      in_cert, user, group, hostname):
@@ -316,48 +378,27 @@ class OxSetup(BaseSetup):
         """
         self.logger.debug("Creating keystore %s" % suffix)
 
-        # Convert key to pkcs12
+        generated = generate_keystore(
+            suffix, os.path.basename(keystore_fn), keystore_pw,
+            self.get_cert_file(in_key), self.get_cert_file(in_cert),
+            hostname,
+        )
+
         pkcs_fn = '%s/%s.pkcs12' % (self.container.cert_folder, suffix)
-        export_cmd = " ".join([
-            'openssl', 'pkcs12', '-export',
-            '-inkey', in_key,
-            '-in', in_cert,
-            '-out', pkcs_fn,
-            '-name', hostname,
-            '-passout', 'pass:%s' % keystore_pw,
-        ])
-        self.docker.exec_cmd(self.container.cid, export_cmd)
-
-        # Import p12 to keystore
-        import_cmd = " ".join([
-            'keytool', '-importkeystore',
-            '-srckeystore', '%s/%s.pkcs12' % (self.container.cert_folder, suffix),
-            '-srcstorepass', keystore_pw,
-            '-srcstoretype', 'PKCS12',
-            '-destkeystore', keystore_fn,
-            '-deststorepass', keystore_pw,
-            '-deststoretype', 'JKS',
-            '-keyalg', 'RSA',
-            '-noprompt',
-        ])
-        self.docker.exec_cmd(self.container.cid, import_cmd)
+        files = {
+            pkcs_fn: generated[os.path.basename(pkcs_fn)],
+            keystore_fn: generated[os.path.basename(keystore_fn)],
+        }
 
         self.logger.debug("changing access to keystore file")
-        self.docker.exec_cmd(
-            self.container.cid, "chown {}:{} {}".format(user, group, pkcs_fn)
-        )
-        self.docker.exec_cmd(self.container.cid, "chmod 700 {}".format(pkcs_fn))
-        self.docker.exec_cmd(
-            self.container.cid, "chown {}:{} {}".format(user, group, keystore_fn)
-        )
-        self.docker.exec_cmd(self.container.cid, "chmod 700 {}".format(keystore_fn))
+        self.upload_cert_files(files, user, group, [pkcs_fn, keystore_fn])
 
     def render_ldap_props_template(self):
         """Copies rendered jinja template for LDAP connection.
         """
 
         src = "_shared/ox-ldap.properties"
-        dest = os.path.join(self.container.container_attrs["conf_dir"], os.path.basename(src))
+        self.logger.debug("rendering {}".format(os.path.basename(src)))
 
         ctx = {
             "ldap_binddn": self.ldap_binddn,
@@ -366,28 +407,32 @@ class OxSetup(BaseSetup):
             "inum_appliance": self.inum_appliance,
             "cert_folder": self.container.cert_folder,
         }
-        self.copy_rendered_jinja_template(src, dest, ctx)
 
-    def import_nginx_cert(self):
-        """Imports SSL certificate (.der format) into keystore.
+        # rendered once and shared by containers having the same context
+        bundle = artifact_cache.get_bundle(
+            src, ctx,
+            lambda ctx: {os.path.basename(src): self.templates.render(src, ctx)},
+        )
+        self.docker.put_bundle(self.container.cid,
+                               self.container.container_attrs["conf_dir"],
+                               bundle)
+
+    def update_truststore(self):
+        """Pushes cluster truststore to Java containers, including
+        current container.
         """
-        self.logger.debug("importing nginx cert to {}".format(self.container.name))
-        der_cmd = "openssl x509 -outform der -in /etc/certs/nginx.crt -out /etc/certs/nginx.der"
-        self.docker.exec_cmd(self.container.cid, der_cmd)
-
-        import_cmd = " ".join([
-            "keytool -importcert -trustcacerts",
-            "-alias '{}'".format(uuid.uuid4()),
-            "-file /etc/certs/nginx.der",
-            "-keystore {}".format(self.container.truststore_fn),
-            "-storepass changeit -noprompt",
-        ])
-        import_cmd = '''sh -c "{}"'''.format(import_cmd)
-        self.docker.exec_cmd(self.container.cid, import_cmd)
+        self.logger.debug("updating truststore of {}".format(self.container.name))
+        manager = TruststoreManager(self.app)
+        containers = [
+            container for container in manager.get_containers()
+            if container.id != self.container.id
+        ]
+        containers.append(self.container)
+        manager.distribute(containers)
 
     def discover_nginx(self):
         """Discovers nginx node.
         """
         self.logger.debug("discovering available nginx container")
         if self.cluster.count_containers(type_="nginx"):
-            self.import_nginx_cert()
+            self.update_truststore()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import os
+import shutil
+import tempfile
+from subprocess import Popen
+from subprocess import PIPE
+
+# Validity (in days) of generated certificates
+CERT_VALIDITY_DAYS = 365
+
+
+def run_command(cmd, env=None):
+    """Runs command and raises ``RuntimeError`` on failure.
+
+    Unlike ``gluuengine.utils.po_run``, the command is passed as a list,
+    hence arguments may contain whitespaces.
+    """
+    try:
+        p = Popen(cmd, stdin=PIPE, stdout=PIPE, stderr=PIPE, env=env)
+        _, stderr = p.communicate()
+    except OSError as exc:
+        raise RuntimeError("return code {}: {}".format(exc.errno, exc.strerror))
+
+    if p.returncode:
+        raise RuntimeError("return code {}: {}".format(p.returncode, stderr.strip()))
+
+
+def _read_files(workdir):
+    files = {}
+    for name in os.listdir(workdir):
+        with open(os.path.join(workdir, name), "rb") as fp:
+            files[name] = fp.read()
+    return files
+
+
+def generate_cert(suffix, password, subject, key=None):
+    """Generates private key, CSR and self-signed certificate.
+
+    :param suffix: Basename of certificate name (minus the file extension).
+    :param password: Password used for signing the certificate.
+    :param subject: Subject of the certificate, e.g. ``/C=US/CN=localhost``.
+    :param key: Unencrypted private key (in PEM format) to use; if omitted,
+                new key is generated.
+    :returns: A ``dict`` of file name and its content, i.e. ``<suffix>.key.orig``,
+              ``<suffix>.key``, ``<suffix>.csr``, and ``<suffix>.crt``.
+    """
+    workdir = tempfile.mkdtemp()
+
+    # password is passed via environment, so it's not visible in process list
+    env = dict(os.environ, CERTGEN_PASS=password)
+
+    key_orig = os.path.join(workdir, "{}.key.orig".format(suffix))
+    key_fn = os.path.join(workdir, "{}.key".format(suffix))
+    csr_fn = os.path.join(workdir, "{}.csr".format(suffix))
+    crt_fn = os.path.join(workdir, "{}.crt".format(suffix))
+
+    try:
+        if key:
+            with open(key_fn, "wb") as fp:
+                fp.write(key)
+            run_command(["openssl", "rsa", "-des3", "-in", key_fn,
+                         "-passout", "env:CERTGEN_PASS", "-out", key_orig], env)
+        else:
+            run_command(["openssl", "genrsa", "-des3", "-out", key_orig,
+                         "-passout", "env:CERTGEN_PASS", "2048"], env)
+            run_command(["openssl", "rsa", "-in", key_orig,
+                         "-passin", "env:CERTGEN_PASS", "-out", key_fn], env)
+
+        run_command(["openssl", "req", "-new", "-key", key_fn, "-out", csr_fn,
+                     "-subj", subject], env)
+        run_command(["openssl", "x509", "-req", "-days", str(CERT_VALIDITY_DAYS),
+                     "-in", csr_fn, "-signkey", key_fn, "-out", crt_fn], env)
+        return _read_files(workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def generate_keystore(suffix, keystore_name, keystore_pw, key, cert, hostname):
+    """Generates PKCS12 file and JKS keystore from private key and certificate.
+
+    :param suffix: Basename of PKCS12 file (minus the file extension).
+    :param keystore_name: Basename of keystore file.
+    :param keystore_pw: Password for keystore.
+    :param key: Private key in PEM format.
+    :param cert: Certificate in PEM format.
+    :param hostname: Name of the certificate.
+    :returns: A ``dict`` of file name and its content, i.e. ``<suffix>.pkcs12``
+              and keystore file.
+    """
+    workdir = tempfile.mkdtemp()
+    env = dict(os.environ, CERTGEN_PASS=keystore_pw)
+
+    key_fn = os.path.join(workdir, "in.key")
+    crt_fn = os.path.join(workdir, "in.crt")
+    pkcs_fn = os.path.join(workdir, "{}.pkcs12".format(suffix))
+    jks_fn = os.path.join(workdir, keystore_name)
+
+    try:
+        with open(key_fn, "wb") as fp:
+            fp.write(key)
+        with open(crt_fn, "wb") as fp:
+            fp.write(cert)
+
+        run_command(["openssl", "pkcs12", "-export", "-inkey", key_fn, "-in", crt_fn,
+                     "-out", pkcs_fn, "-name", hostname,
+                     "-passout", "env:CERTGEN_PASS"], env)
+        run_command(["keytool", "-importkeystore",
+                     "-srckeystore", pkcs_fn, "-srcstorepass:env", "CERTGEN_PASS",
+                     "-srcstoretype", "PKCS12",
+                     "-destkeystore", jks_fn, "-deststorepass:env", "CERTGEN_PASS",
+                     "-deststoretype", "JKS", "-noprompt"], env)
+
+        os.unlink(key_fn)
+        os.unlink(crt_fn)
+        return _read_files(workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
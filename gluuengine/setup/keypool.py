@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import logging
+import os
+import uuid
+
+from .certgen import run_command
+
+# Interval (in seconds) to refill the pool
+TASK_INTERVAL = 60
+
+# Size (in bits) of pre-generated RSA keys
+RSA_KEY_BITS = 2048
+
+# Size (in bits) of DH parameters
+DHPARAM_BITS = 2048
+
+
+class KeyPool(object):
+    """Stock of pre-generated key material stored in a directory.
+
+    RSA keys are claimed by renaming the key file, hence a key is handed
+    out to exactly one process even if the pool directory is shared by
+    multiple processes (e.g. gunicorn workers). DH parameters are shared
+    by all containers in the cluster.
+
+    Key material is generated with the lowest CPU priority, so refilling
+    the pool doesn't slow down the other tasks running in engine host.
+
+    :param pool_dir: Path to pool directory.
+    :param size: Number of RSA keys to keep in the pool.
+    """
+    def __init__(self, pool_dir, size):
+        self.logger = logging.getLogger(
+            __name__ + "." + self.__class__.__name__,
+        )
+        self.pool_dir = pool_dir
+        self.size = size
+        self.keys_dir = os.path.join(pool_dir, "rsa")
+        self.dhparams_fn = os.path.join(pool_dir, "dhparams.pem")
+
+    @classmethod
+    def from_app(cls, app):
+        """Creates pool based on app config.
+
+        :param app: An instance of :class:`flask.Flask`.
+        """
+        return cls(app.config["KEYPOOL_DIR"], app.config["KEYPOOL_SIZE"])
+
+    def _list_keys(self):
+        try:
+            return [fn for fn in os.listdir(self.keys_dir)
+                    if fn.endswith(".pem")]
+        except OSError:
+            return []
+
+    def count(self):
+        """Counts available RSA keys.
+        """
+        return len(self._list_keys())
+
+    def claim_key(self):
+        """Takes RSA key out of the pool.
+
+        :returns: Private key in PEM format, or ``None`` if pool is empty.
+        """
+        for fn in self._list_keys():
+            path = os.path.join(self.keys_dir, fn)
+            claimed = "{}.{}.claimed".format(path, os.getpid())
+
+            try:
+                # rename is atomic, hence only one process wins the key
+                os.rename(path, claimed)
+            except OSError:
+                # claimed by other process
+                continue
+
+            try:
+                with open(claimed, "rb") as fp:
+                    return fp.read()
+            finally:
+                os.unlink(claimed)
+        return None
+
+    def get_dhparams(self):
+        """Gets DH parameters.
+
+        :returns: DH parameters in PEM format, or ``None`` if unavailable.
+        """
+        try:
+            with open(self.dhparams_fn, "rb") as fp:
+                return fp.read()
+        except IOError:
+            return None
+
+    def refill(self):
+        """Generates missing key material.
+
+        This method does blocking I/O and must not be executed
+        in reactor thread.
+        """
+        if not os.path.exists(self.keys_dir):
+            try:
+                os.makedirs(self.keys_dir)
+            except OSError:
+                # created by other process
+                pass
+
+        if not os.path.exists(self.dhparams_fn):
+            self.logger.info("generating DH parameters")
+            self._generate(["openssl", "dhparam", "-out", "{tmp}",
+                            str(DHPARAM_BITS)], self.dhparams_fn)
+
+        missing = self.size - self.count()
+        if missing > 0:
+            self.logger.info("generating {} RSA keys".format(missing))
+
+        for _ in range(missing):
+            dest = os.path.join(self.keys_dir, "{}.pem".format(uuid.uuid4().hex))
+            self._generate(["openssl", "genrsa", "-out", "{tmp}",
+                            str(RSA_KEY_BITS)], dest)
+
+    def _generate(self, cmd, dest):
+        """Runs command with lowest CPU priority and moves its output
+        to destination path.
+
+        :param cmd: Command to run; ``{tmp}`` is replaced by temporary path.
+        :param dest: Destination path.
+        """
+        tmp = "{}.tmp".format(dest)
+        try:
+            run_command(["nice", "-n", "19"] + [arg.format(tmp=tmp) for arg in cmd])
+            os.rename(tmp, dest)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
@@ -3,9 +3,94 @@
 #
 # All rights reserved.
 
+import math
+
 from blinker import signal
 
+from ..model import NginxSetting
+from ..placement.cpuset import CPU_PERIOD
+from ..placement.cpuset import parse_cpuset
+from .artifacts import make_bundle
 from .base import BaseSetup
+from .keypool import KeyPool
+from .ticketkeys import TicketKeyStore
+
+#: Path to oxAuth static resources inside nginx container
+OXAUTH_STATIC_ROOT = "/var/www/gluu"
+
+#: Paths to current and previous TLS session ticket keys
+TICKET_KEY_FILES = ("/etc/certs/ticket_current.key",
+                    "/etc/certs/ticket_previous.key",)
+
+#: TLS and worker settings used if nginx setting is unavailable
+TLS_DEFAULTS = {
+    "http2": True,
+    "ssl_session_cache": 10,
+    "ssl_session_timeout": 14400,
+    "ocsp_stapling": False,
+    "worker_connections": 4096,
+}
+
+
+def get_tls_ctx(nginx_setting):
+    """Gets TLS and worker settings.
+
+    :param nginx_setting: Nginx setting object (or ``None``).
+    """
+    ctx = {}
+    for key, default in TLS_DEFAULTS.iteritems():
+        value = getattr(nginx_setting, key, None)
+        # columns added after the setting was saved are empty
+        ctx[key] = default if value is None else value
+    return ctx
+
+
+def get_worker_processes(cpus, container_attrs=None):
+    """Gets number of nginx workers, i.e. number of CPUs usable
+    by the container.
+
+    :param cpus: Number of CPUs in the node.
+    :param container_attrs: Attributes of nginx container.
+    """
+    container_attrs = container_attrs or {}
+
+    cpuset = container_attrs.get("cpuset")
+    if cpuset:
+        return len(parse_cpuset(cpuset))
+
+    cpu_quota = container_attrs.get("resources", {}).get("cpu_quota")
+    if cpu_quota:
+        cpus = min(cpus, int(math.ceil(float(cpu_quota) / CPU_PERIOD)))
+    return max(cpus, 1)
+
+
+def get_nginx_setting_ctx(nginx_setting):
+    """Gets template context of nginx setting.
+
+    Caching and static serving are disabled if nginx setting is
+    not available.
+
+    :param nginx_setting: Nginx setting object (or ``None``).
+    """
+    if not nginx_setting:
+        return {"proxy_cache": None, "serve_static": False}
+
+    proxy_cache = None
+    if nginx_setting.proxy_cache:
+        proxy_cache = {
+            "ttl": nginx_setting.cache_ttl,
+            "inactive": nginx_setting.cache_inactive,
+            "max_size": nginx_setting.cache_max_size,
+            "keys_zone": nginx_setting.cache_keys_zone,
+            "stale_while_revalidate": nginx_setting.stale_while_revalidate,
+        }
+
+    return {
+        "proxy_cache": proxy_cache,
+        "serve_static": nginx_setting.serve_static,
+        "static_root": OXAUTH_STATIC_ROOT,
+        "static_ttl": nginx_setting.static_ttl,
+    }
 
 
 class NginxSetup(BaseSetup):
@@ -30,6 +115,12 @@ class NginxSetup(BaseSetup):
             # "oxasimba_containers": oxasimba_containers,
         }
 
+        with self.app.app_context():
+            nginx_setting = NginxSetting.query.first()
+        ctx.update(get_nginx_setting_ctx(nginx_setting))
+        ctx["tls"] = get_tls_ctx(nginx_setting)
+        ctx["tls"]["ticket_keys"] = TICKET_KEY_FILES
+
         src = "nginx/gluu_https.conf"
         dest = "/etc/nginx/sites-available/gluu_https.conf"
         self.copy_rendered_jinja_template(src, dest, ctx)
@@ -44,6 +135,59 @@ class NginxSetup(BaseSetup):
                       "/etc/nginx/sites-enabled/gluu_https.conf"
         self.docker.exec_cmd(self.container.cid, symlink_cmd)
 
+    def copy_dhparams(self):
+        """Copies cluster-wide DH parameters (if available).
+        """
+        dhparams = KeyPool.from_app(self.app).get_dhparams()
+        if not dhparams:
+            # DH parameters shipped with the image are used instead
+            self.logger.warn("DH parameters are not available yet")
+            return
+
+        self.logger.debug("copying DH parameters")
+        self.upload_cert_files({"/etc/certs/dhparams.pem": dhparams})
+
+    def copy_ticket_keys(self, keys=None):
+        """Copies cluster-wide TLS session ticket keys.
+
+        :param keys: A list of current and previous key; if omitted,
+                     keys are taken from key store.
+        """
+        self.logger.debug("copying TLS session ticket keys")
+        keys = keys or TicketKeyStore.from_app(self.app).get_keys()
+
+        # keys are only readable by nginx master process (root)
+        bundle = make_bundle({
+            path.lstrip("/"): key for path, key in zip(TICKET_KEY_FILES, keys)
+        }, mode=0o600)
+        self.docker.put_bundle(self.container.cid, "/", bundle,
+                               create_dir=False)
+
+    def configure_workers(self):
+        """Sizes nginx workers based on CPUs usable by the container.
+        """
+        with self.app.app_context():
+            tls = get_tls_ctx(NginxSetting.query.first())
+
+        cpus = self.docker.get_info().get("NCPU", 1)
+        workers = get_worker_processes(cpus, self.container.container_attrs)
+        self.logger.debug("configuring {} nginx workers".format(workers))
+
+        for directive, value in [("worker_processes", workers),
+                                 ("worker_connections",
+                                  tls["worker_connections"])]:
+            self.docker.exec_cmd(
+                self.container.cid,
+                "sed -i 's/^\\(\\s*\\){0} .*;/\\1{0} {1};/' "
+                "/etc/nginx/nginx.conf".format(directive, value),
+            )
+
+    def reload_nginx(self):
+        """Reloads nginx configuration gracefully.
+        """
+        self.logger.debug("reloading nginx")
+        self.docker.exec_cmd(self.container.cid, "nginx -s reload")
+
     def restart_nginx(self):
         """Restarts nginx via supervisorctl.
         """
@@ -55,7 +199,10 @@ class NginxSetup(BaseSetup):
         """Runs the actual setup.
         """
         self.get_web_cert()
+        self.copy_dhparams()
         self.change_cert_access("www-data", "www-data")
+        self.copy_ticket_keys()
+        self.configure_workers()
         self.render_https_conf()
         self.configure_vhost()
         self.add_auto_startup_entry()
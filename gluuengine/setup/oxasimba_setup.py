@@ -111,7 +111,7 @@ class OxasimbaSetup(OxSetup):  # pragma: no cover
         """
         self.logger.debug("discovering available nginx container")
         if self.cluster.count_containers(type_="nginx"):
-            self.import_nginx_cert()
+            self.update_truststore()
 
     def after_setup(self):
         """Post-setup callback.
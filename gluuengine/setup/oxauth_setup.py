@@ -12,6 +12,7 @@ class OxauthSetup(OxSetup):
     def setup(self):
         self.render_ldap_props_template()
         self.write_salt_file()
+        self.apply_jvm_options()
         self.add_auto_startup_entry()
         self.reload_supervisor()
         return True
@@ -10,7 +10,6 @@ import tempfile
 from blinker import signal
 
 from .base import OxSetup
-from ..errors import DockerExecError
 
 
 class OxidpSetup(OxSetup):
@@ -39,7 +38,7 @@ class OxidpSetup(OxSetup):
             hostname,
         )
 
-        self.import_ldap_certs()
+        self.update_truststore()
         self.pull_shib_config()
         self.pull_shib_certkey()
 
@@ -68,35 +67,6 @@ class OxidpSetup(OxSetup):
         complete_sgn = signal("ox_setup_completed")
         complete_sgn.send(self)
 
-    def import_ldap_certs(self):
-        """Imports all LDAP certificates.
-        """
-        def import_certs(host, port):
-            self.logger.debug("importing ldap cert from {}".format(host))
-
-            cert_cmd = "echo -n | openssl s_client -connect {0}:{1} | " \
-                       "sed -ne '/-BEGIN CERTIFICATE-/,/-END CERTIFICATE-/p' " \
-                       "> /etc/certs/{0}.crt".format(host, port)
-            cert_cmd = '''sh -c "{}"'''.format(cert_cmd)
-            self.docker.exec_cmd(self.container.cid, cert_cmd)
-
-            import_cmd = " ".join([
-                "keytool -importcert -trustcacerts",
-                "-alias '{}'".format(host),
-                "-file /etc/certs/{}.crt".format(host),
-                "-keystore {}".format(self.container.truststore_fn),
-                "-storepass changeit -noprompt",
-            ])
-            import_cmd = '''sh -c "{}"'''.format(import_cmd)
-
-            try:
-                self.docker.exec_cmd(self.container.cid, import_cmd)
-            except DockerExecError as exc:
-                if exc.exit_code == 1:
-                    pass
-
-        import_certs(self.ldap_host, self.ldap_port)
-
     # def render_nutcracker_conf(self):
     #     """Copies twemproxy configuration into the container.
     #     """
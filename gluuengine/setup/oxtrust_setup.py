@@ -46,6 +46,7 @@ class OxtrustSetup(OxSetup):
         # web SSL cert and key
         self.get_web_cert()
 
+        self.apply_jvm_options()
         self.add_auto_startup_entry()
         self.reload_supervisor()
         return True
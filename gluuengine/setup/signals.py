@@ -3,10 +3,19 @@
 #
 # All rights reserved.
 
+import logging
 import time
 
 from blinker import signal
 
+from ..extensions import db
+from ..model import Cluster
+from ..placement.jvm import JVM_CONTAINER_TYPES
+from ..placement.jvm import JvmSizer
+from ..placement.jvm import get_jvm_containers
+from ..utils import as_boolean
+from .artifacts import artifact_cache
+from .base import OxSetup
 from .oxtrust_setup import OxtrustSetup
 from .oxidp_setup import OxidpSetup
 from .nginx_setup import NginxSetup
@@ -36,14 +45,89 @@ def notify_oxidp(ngx):
             setup_obj.discover_nginx()
 
 
+def reconfigure_nginx(app, cluster, logger):
+    """Re-renders virtual host of all nginx containers and restarts
+    the process.
+    """
+    for nginx in cluster.get_containers(type_="nginx"):
+        setup_obj = NginxSetup(nginx, cluster, app, logger)
+        # rendered config refers to ticket keys, which are missing
+        # in containers deployed before keys were introduced
+        setup_obj.copy_ticket_keys()
+        setup_obj.render_https_conf()
+        setup_obj.restart_nginx()
+
+
 def notify_nginx(ox):
     """Notifies nginx to re-render virtual host and restart the process.
     """
     with ox.app.app_context():
-        for nginx in ox.cluster.get_containers(type_="nginx"):
-            setup_obj = NginxSetup(nginx, ox.cluster, ox.app, ox.logger)
-            setup_obj.render_https_conf()
-            setup_obj.restart_nginx()
+        reconfigure_nginx(ox.app, ox.cluster, ox.logger)
+
+
+def notify_nginx_topology(app):
+    """Notifies nginx when containers are changed outside of the engine
+    (e.g. died or restarted), or nginx setting is changed.
+    """
+    with app.app_context():
+        cluster = Cluster.query.first()
+        if cluster:
+            reconfigure_nginx(app, cluster, logging.getLogger(__name__))
+
+
+def resize_jvm(ox, exclude=None):
+    """Recomputes JVM options of containers in the node of given
+    container, as the number of JVM containers in the node has changed.
+
+    Options are applied once supervisord in each container reloads its
+    configuration (e.g. the container is restarted), hence running JVMs
+    are not disrupted.
+
+    :param ox: Setup object of container being deployed or removed.
+    :param exclude: ID of container being removed.
+    """
+    if (ox.container.type not in JVM_CONTAINER_TYPES
+            or not as_boolean(ox.app.config["JVM_AUTO_SIZING"])):
+        return
+
+    with ox.app.app_context():
+        containers = get_jvm_containers(ox.node.id, exclude=exclude)
+        sizer = JvmSizer(ox.app, ox.docker)
+
+        for container in containers:
+            # new container is already sized
+            if container.id == ox.container.id:
+                continue
+
+            options = sizer.get_options(container, len(containers))
+            container_attrs = dict(container.container_attrs or {})
+            if options == container_attrs.get("jvm_options"):
+                continue
+
+            setup_obj = OxSetup(container, ox.cluster, ox.app, ox.logger)
+            try:
+                setup_obj.write_jvm_options(
+                    options, previous=container_attrs.get("jvm_options"),
+                )
+            except Exception as exc:
+                ox.logger.warn("unable to update JVM options of {}; "
+                               "reason={}".format(container.name, exc))
+                continue
+            finally:
+                setup_obj.remove_build_dir()
+
+            container_attrs["jvm_options"] = options
+            container.container_attrs = container_attrs
+            db.session.add(container)
+        db.session.commit()
+
+
+def resize_jvm_on_setup(ox):
+    resize_jvm(ox)
+
+
+def resize_jvm_on_teardown(ox):
+    resize_jvm(ox, exclude=ox.container.id)
 
 
 def connect_setup_signals():
@@ -53,6 +137,15 @@ def connect_setup_signals():
 
     ox_setup_subscriber = signal("ox_setup_completed")
     ox_setup_subscriber.connect(notify_nginx)
+    ox_setup_subscriber.connect(resize_jvm_on_setup)
+
+    signal("topology_changed").connect(notify_nginx_topology)
+    signal("nginx_setting_changed").connect(notify_nginx_topology)
+
+    # rendered artifacts are addressed by their context, hence stale
+    # artifacts are never used; clearing the cache only frees the memory
+    signal("ldap_setting_changed").connect(artifact_cache.clear)
+    signal("cluster_changed").connect(artifact_cache.clear)
 
 
 def connect_teardown_signals():
@@ -62,3 +155,4 @@ def connect_teardown_signals():
 
     ox_teardown_subscriber = signal("ox_teardown_completed")
     ox_teardown_subscriber.connect(notify_nginx)
+    ox_teardown_subscriber.connect(resize_jvm_on_teardown)
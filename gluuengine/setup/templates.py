@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import codecs
+import logging
+import os
+import tempfile
+import threading
+
+from jinja2 import Environment
+from jinja2 import FileSystemBytecodeCache
+from jinja2 import FileSystemLoader
+from jinja2 import TemplateSyntaxError
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+class AtomicBytecodeCache(FileSystemBytecodeCache):
+    """Bytecode cache which is safe to share between processes.
+
+    Bytecode is written to temporary file and renamed afterwards,
+    so other processes (e.g. gunicorn workers) never load partially-written
+    bytecode.
+    """
+    def dump_bytecode(self, bucket):
+        filename = self._get_cache_filename(bucket)
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                bucket.write_bytecode(fp)
+            os.rename(tmp, filename)
+        except (IOError, OSError):
+            # failing to write the cache must not break rendering
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+class TemplateRegistry(object):
+    """Process-wide registry of compiled templates.
+
+    Jinja templates are compiled once per process (and once per bytecode
+    cache directory, if any), while ``%``-style templates are read once
+    and kept in memory.
+
+    :param template_dir: Path to templates directory.
+    :param cache_dir: Path to bytecode cache directory; if omitted,
+                      bytecode cache is disabled.
+    """
+    def __init__(self, template_dir, cache_dir=None):
+        self.logger = logging.getLogger(
+            __name__ + "." + self.__class__.__name__,
+        )
+        self.template_dir = template_dir
+
+        bytecode_cache = None
+        if cache_dir:
+            if not os.path.exists(cache_dir):
+                try:
+                    os.makedirs(cache_dir)
+                except OSError:
+                    # created by other process
+                    pass
+            bytecode_cache = AtomicBytecodeCache(cache_dir)
+
+        self.jinja_env = Environment(
+            loader=FileSystemLoader(template_dir),
+            bytecode_cache=bytecode_cache,
+            # templates are shipped with the package and never modified
+            # at runtime, hence no need to check their modification time
+            auto_reload=False,
+            cache_size=-1,
+        )
+        self._text_templates = {}
+        self._text_lock = threading.Lock()
+
+    def precompile(self):
+        """Compiles all templates under templates directory.
+
+        Jinja and ``%``-style templates share the same directory, hence
+        each template is loaded as both; templates which are not valid
+        jinja templates are only loaded as ``%``-style templates.
+        """
+        for name in self.jinja_env.list_templates():
+            try:
+                self.get_text_template(os.path.join(self.template_dir, name))
+            except UnicodeDecodeError:
+                self.logger.debug("skipping non-text template {}".format(name))
+                continue
+
+            try:
+                self.jinja_env.get_template(name)
+            except TemplateSyntaxError:
+                pass
+
+    def get_template(self, name):
+        """Gets compiled jinja template.
+
+        :param name: Path to template relative to templates directory.
+        """
+        return self.jinja_env.get_template(name)
+
+    def render(self, name, ctx=None):
+        """Renders jinja template.
+
+        :param name: Path to template relative to templates directory.
+        :param ctx: Context that will be populated into template.
+        :returns: String of rendered template.
+        """
+        return self.get_template(name).render(**(ctx or {}))
+
+    def get_text_template(self, path):
+        """Gets content of ``%``-style template.
+
+        :param path: Path to template.
+        :returns: Unicode string of template.
+        """
+        path = os.path.abspath(path)
+        try:
+            return self._text_templates[path]
+        except KeyError:
+            pass
+
+        with self._text_lock:
+            if path not in self._text_templates:
+                with codecs.open(path, "r", encoding="utf-8") as fp:
+                    self._text_templates[path] = fp.read()
+            return self._text_templates[path]
+
+    def render_text(self, path, ctx=None):
+        """Renders ``%``-style template.
+
+        :param path: Path to template.
+        :param ctx: Context that will be populated into template.
+        :returns: String of rendered template.
+        """
+        return self.get_text_template(path) % (ctx or {})
+
+
+def get_template_registry(app):
+    """Gets process-wide template registry for given app config.
+
+    The registry is created and precompiled on first call.
+
+    :param app: An instance of :class:`flask.Flask`.
+    """
+    template_dir = app.config["TEMPLATES_DIR"]
+    cache_dir = app.config.get("JINJA_BYTECODE_CACHE_DIR")
+    key = (template_dir, cache_dir)
+
+    try:
+        return _registries[key]
+    except KeyError:
+        pass
+
+    with _registries_lock:
+        if key not in _registries:
+            registry = TemplateRegistry(template_dir, cache_dir)
+            registry.precompile()
+            _registries[key] = registry
+        return _registries[key]
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import logging
+import os
+import time
+
+# Interval (in seconds) to check whether the key must be rotated
+TASK_INTERVAL = 60 * 10
+
+# Size (in bytes) of TLS session ticket key understood by nginx
+TICKET_KEY_SIZE = 48
+
+
+class TicketKeyStore(object):
+    """Cluster-wide TLS session ticket keys stored in a directory.
+
+    The current key encrypts new tickets, while the previous key
+    is kept to decrypt tickets issued before the last rotation, so
+    clients are able to resume their sessions across rotation and
+    across nginx containers.
+
+    Keys are replaced by renaming the file, hence readers never see
+    partially-written key even if the directory is shared by multiple
+    processes (e.g. gunicorn workers).
+
+    :param key_dir: Path to keys directory.
+    """
+    def __init__(self, key_dir):
+        self.logger = logging.getLogger(
+            __name__ + "." + self.__class__.__name__,
+        )
+        self.key_dir = key_dir
+        self.current_fn = os.path.join(key_dir, "current.key")
+        self.previous_fn = os.path.join(key_dir, "previous.key")
+
+    @classmethod
+    def from_app(cls, app):
+        """Creates store based on app config.
+
+        :param app: An instance of :class:`flask.Flask`.
+        """
+        return cls(app.config["TICKET_KEY_DIR"])
+
+    def _read(self, path):
+        try:
+            with open(path, "rb") as fp:
+                return fp.read()
+        except IOError:
+            return None
+
+    def _write(self, path, content):
+        tmp = "{}.{}.tmp".format(path, os.getpid())
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(content)
+        return tmp
+
+    def _ensure_dir(self):
+        if not os.path.exists(self.key_dir):
+            try:
+                os.makedirs(self.key_dir, 0o700)
+            except OSError:
+                # created by other process
+                pass
+
+    def get_keys(self):
+        """Gets current and previous keys, generating the current key
+        if it doesn't exist yet.
+
+        :returns: A list of current and previous key; previous key is
+                  the same as current key if the key has never been
+                  rotated.
+        """
+        current = self._read(self.current_fn)
+        if current is None:
+            self._ensure_dir()
+            tmp = self._write(self.current_fn, os.urandom(TICKET_KEY_SIZE))
+            try:
+                # link fails if the key has been created by other process
+                os.link(tmp, self.current_fn)
+            except OSError:
+                pass
+            finally:
+                os.unlink(tmp)
+            current = self._read(self.current_fn)
+
+        previous = self._read(self.previous_fn) or current
+        return [current, previous]
+
+    def get_age(self):
+        """Gets age (in seconds) of the current key.
+
+        :returns: Age of the key, or ``None`` if the key doesn't exist.
+        """
+        try:
+            return time.time() - os.path.getmtime(self.current_fn)
+        except OSError:
+            return None
+
+    def rotate(self):
+        """Replaces current key with new one and keeps the replaced key
+        as previous key.
+
+        :returns: A list of current and previous key.
+        """
+        self._ensure_dir()
+        current = self._read(self.current_fn)
+        if current is not None:
+            os.rename(self._write(self.previous_fn, current), self.previous_fn)
+
+        os.rename(self._write(self.current_fn, os.urandom(TICKET_KEY_SIZE)),
+                  self.current_fn)
+        self.logger.info("TLS session ticket key has been rotated")
+        return self.get_keys()
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+
+import concurrent.futures
+
+from ..extensions import db
+from ..model import STATE_SUCCESS
+from ..model import Container
+from ..model import LdapSetting
+from ..model import Node
+from .artifacts import make_bundle
+from .certgen import run_command
+
+# Types of container having Java truststore
+JAVA_CONTAINER_TYPES = ("oxauth", "oxtrust", "oxidp", "oxasimba",)
+
+# Password of the truststore (JDK default)
+TRUSTSTORE_PASSWORD = "changeit"
+
+# Maximum number of containers processed concurrently
+PUSH_MAX_WORKERS = 10
+
+# Timeout (in seconds) for retrieving LDAP certificate
+LDAP_CERT_TIMEOUT = 10
+
+
+def get_truststore_digest(base, certs):
+    """Computes version of truststore based on its content.
+
+    :param base: Content of base truststore.
+    :param certs: A ``dict`` of alias and certificate (in PEM format).
+    """
+    sha = hashlib.sha256(base)
+    for alias in sorted(certs):
+        sha.update(alias)
+        sha.update(certs[alias])
+    return sha.hexdigest()
+
+
+def build_truststore(base_fn, certs, dest):
+    """Creates truststore from base truststore and certificates.
+
+    :param base_fn: Path to base truststore.
+    :param certs: A ``dict`` of alias and certificate (in PEM format).
+    :param dest: Path to truststore.
+    """
+    # build next to the destination, so renaming it is atomic
+    # (and never crosses filesystems)
+    workdir = tempfile.mkdtemp(dir=os.path.dirname(dest))
+    tmp = os.path.join(workdir, "cacerts")
+
+    try:
+        shutil.copyfile(base_fn, tmp)
+
+        for alias, cert in certs.iteritems():
+            cert_fn = os.path.join(workdir, "{}.crt".format(alias))
+            with open(cert_fn, "wb") as fp:
+                fp.write(cert)
+
+            run_command([
+                "keytool", "-importcert", "-trustcacerts", "-noprompt",
+                "-alias", alias, "-file", cert_fn, "-keystore", tmp,
+                "-storepass", TRUSTSTORE_PASSWORD,
+            ])
+
+        # the truststore may be built by other process at the same time
+        os.rename(tmp, dest)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+class TruststoreManager(object):
+    """Maintains cluster-wide Java truststore.
+
+    The truststore is built by the engine from JDK default truststore,
+    nginx certificate, and LDAP certificate (each certificate has a stable
+    alias, so re-importing a certificate replaces the old one).
+    Each build is versioned by a digest of its content and distributed
+    to containers which don't have the same version yet.
+
+    :param app: An instance of :class:`flask.Flask`.
+    :param max_workers: Maximum number of containers processed concurrently.
+    """
+    def __init__(self, app, max_workers=PUSH_MAX_WORKERS):
+        self.logger = logging.getLogger(
+            __name__ + "." + self.__class__.__name__,
+        )
+        self.app = app
+        self.max_workers = max_workers
+        self.store_dir = os.path.join(app.config["DATA_DIR"], "truststore")
+
+        # avoid circular import
+        from ..helper.lifecycle_helper import ContainerLifecycleHelper
+        self.lifecycle = ContainerLifecycleHelper(app)
+
+    def get_containers(self):
+        """Gets running Java containers.
+        """
+        with self.app.app_context():
+            return Container.query.filter(
+                Container.type.in_(JAVA_CONTAINER_TYPES),
+                Container.state == STATE_SUCCESS,
+            ).all()
+
+    def get_docker(self, container):
+        """Gets Docker client of the node where container is deployed.
+
+        :param container: Container object.
+        """
+        with self.app.app_context():
+            node = Node.query.get(container.node_id)
+        return self.lifecycle.get_docker(node.name)
+
+    def get_ldap_cert(self, container, host, port):
+        """Retrieves LDAP certificate from inside a container.
+
+        The certificate is retrieved by the container, as LDAP may not be
+        reachable from the engine. Last retrieved certificate is kept and
+        used whenever LDAP can't be reached.
+
+        :param container: Container object used to reach LDAP.
+        :param host: Hostname of LDAP server.
+        :param port: Port of LDAP server.
+        :returns: Certificate in PEM format.
+        """
+        saved = os.path.join(self.store_dir, "ldap-{}.crt".format(host))
+        cert = ""
+
+        cert_cmd = "echo -n | timeout {2} openssl s_client -connect {0}:{1} " \
+                   "2>/dev/null | " \
+                   "sed -ne '/-BEGIN CERTIFICATE-/,/-END CERTIFICATE-/p'".format(
+                       host, port, LDAP_CERT_TIMEOUT)
+        cert_cmd = '''sh -c "{}"'''.format(cert_cmd)
+        try:
+            cert = self.get_docker(container).exec_cmd(
+                container.cid, cert_cmd,
+            ).retval
+        except Exception as exc:
+            self.logger.warn("unable to get LDAP certificate from {}; "
+                             "reason={}".format(host, exc))
+
+        if cert:
+            if not os.path.exists(self.store_dir):
+                os.makedirs(self.store_dir)
+            with open(saved, "wb") as fp:
+                fp.write(cert + "\n")
+            return cert + "\n"
+
+        if os.path.exists(saved):
+            self.logger.warn("using last retrieved LDAP certificate "
+                             "of {}".format(host))
+            with open(saved, "rb") as fp:
+                return fp.read()
+
+        # building truststore without LDAP certificate would remove
+        # the certificate from containers
+        raise RuntimeError("unable to get LDAP certificate from {}".format(host))
+
+    def get_certs(self, container):
+        """Collects certificates included in the truststore.
+
+        :param container: Container object used to reach LDAP.
+        :returns: A ``dict`` of alias and certificate (in PEM format).
+        """
+        certs = OrderedDict()
+
+        ssl_cert = os.path.join(self.app.config["SSL_CERT_DIR"], "nginx.crt")
+        if os.path.exists(ssl_cert):
+            with open(ssl_cert, "rb") as fp:
+                certs["gluu-nginx"] = fp.read()
+
+        with self.app.app_context():
+            ldap_setting = LdapSetting.query.first()
+
+        if ldap_setting and ldap_setting.host:
+            certs["gluu-ldap-{}".format(ldap_setting.host)] = \
+                self.get_ldap_cert(container, ldap_setting.host,
+                                   ldap_setting.port)
+        return certs
+
+    def build(self, container):
+        """Builds the truststore (if not built yet).
+
+        :param container: Container object used to reach LDAP.
+        :returns: A tuple of truststore digest and path.
+        """
+        with open(self.app.config["JDK_CACERTS_FILE"], "rb") as fp:
+            base = fp.read()
+
+        certs = self.get_certs(container)
+        digest = get_truststore_digest(base, certs)
+        path = os.path.join(self.store_dir, "{}.jks".format(digest))
+
+        if not os.path.exists(path):
+            if not os.path.exists(self.store_dir):
+                os.makedirs(self.store_dir)
+
+            self.logger.info("building truststore {}".format(digest))
+            build_truststore(self.app.config["JDK_CACERTS_FILE"], certs, path)
+        return digest, path
+
+    def distribute(self, containers=None):
+        """Builds and pushes the truststore to containers.
+
+        :param containers: A list of container objects; if omitted,
+                           all running Java containers are used.
+        :returns: A report of affected containers.
+        """
+        start = time.time()
+        report = {
+            "digest": "",
+            "pushed": [],
+            "skipped": [],
+            "failed": [],
+            "elapsed": 0,
+        }
+
+        if containers is None:
+            containers = self.get_containers()
+
+        if not containers:
+            return report
+
+        try:
+            digest, path = self.build(containers[0])
+        except RuntimeError as exc:
+            self.logger.warn("unable to build truststore; "
+                             "reason={}".format(exc))
+            report["failed"] = [{"name": container.name, "error": str(exc)}
+                                for container in containers]
+            return report
+        report["digest"] = digest
+
+        outdated = []
+        for container in containers:
+            attrs = container.container_attrs or {}
+            if attrs.get("truststore_hash") == digest:
+                report["skipped"].append(container.name)
+            else:
+                outdated.append(container)
+
+        if not outdated:
+            return report
+
+        with open(path, "rb") as fp:
+            truststore = fp.read()
+
+        pushed = []
+        max_workers = min(self.max_workers, len(outdated))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.push, container, digest, truststore): container
+                for container in outdated
+            }
+
+            for future in concurrent.futures.as_completed(futures):
+                container = futures[future]
+                try:
+                    future.result()
+                    pushed.append(container)
+                except Exception as exc:
+                    self.logger.warn("unable to push truststore to {}; "
+                                     "reason={}".format(container.name, exc))
+                    report["failed"].append({"name": container.name,
+                                             "error": str(exc)})
+
+        with self.app.app_context():
+            for container in pushed:
+                # JSON column requires new object to detect changes
+                container.container_attrs = dict(container.container_attrs or {},
+                                                 truststore_hash=digest)
+                report["pushed"].append(container.name)
+
+                # only update the attributes of current row, as other
+                # columns (e.g. state) may be changed meanwhile
+                current = Container.query.get(container.id)
+                if current:
+                    current.container_attrs = dict(current.container_attrs or {},
+                                                   truststore_hash=digest)
+                    db.session.add(current)
+            db.session.commit()
+
+        report["elapsed"] = time.time() - start
+        self.logger.info(
+            "truststore {} pushed to {} container(s); {} skipped; "
+            "{} failed ({} seconds)".format(
+                digest, len(report["pushed"]), len(report["skipped"]),
+                len(report["failed"]), report["elapsed"],
+            )
+        )
+        return report
+
+    def push(self, container, digest, truststore):
+        """Replaces the truststore in container atomically.
+
+        :param container: Container object.
+        :param digest: Digest of the truststore.
+        :param truststore: Content of the truststore.
+        """
+        dest = container.truststore_fn
+        tmp_name = ".cacerts.{}".format(digest)
+        bundle = make_bundle({tmp_name: truststore})
+        docker = self.get_docker(container)
+
+        # upload next to the truststore, so renaming it is atomic
+        docker.put_bundle(container.cid, os.path.dirname(dest), bundle,
+                          create_dir=False)
+        docker.exec_cmd(container.cid, "mv -f {} {}".format(
+            os.path.join(os.path.dirname(dest), tmp_name), dest,
+        ))
@@ -3,4 +3,11 @@
 #
 # All rights reserved.
 
+from .autoscaler import Autoscaler  # noqa
+from .drift import DriftReconciler  # noqa
+from .eventwatcher import DockerEventWatcher  # noqa
 from .licensewatcher import LicenseWatcherTask  # noqa
+from .leader import LeaderLock  # noqa
+from .scheduler import TaskScheduler  # noqa
+from .reconciler import DeploymentReconciler  # noqa
+from .ticketkeys import TicketKeyRotator  # noqa
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+
+import concurrent.futures
+
+from ..extensions import db
+from ..helper import ContainerLifecycleHelper
+from ..model import STATE_IN_PROGRESS
+from ..model import STATE_SUCCESS
+from ..model import Container
+from ..model import Deployment
+from ..model import Node
+from ..placement.stats import get_cpu_used
+from ..placement.stats import get_mem_used
+
+# Default interval (in seconds) between each evaluation
+TASK_INTERVAL = 30
+
+# Relative deviation from target which is ignored, to avoid flapping
+TOLERANCE = 0.1
+
+# Maximum number of containers sampled concurrently
+SAMPLE_MAX_WORKERS = 10
+
+# Command to fetch nginx stub_status (served on loopback interface,
+# see nginx/gluu_https.conf template)
+NGINX_STATUS_CMD = "curl -s http://127.0.0.1:8090/nginx_status"
+
+_STUB_STATUS_RE = re.compile(
+    r"Active connections:\s+(?P<active>\d+).*?"
+    r"(?P<accepts>\d+)\s+(?P<handled>\d+)\s+(?P<requests>\d+).*?"
+    r"Reading:\s+(?P<reading>\d+)\s+Writing:\s+(?P<writing>\d+)\s+"
+    r"Waiting:\s+(?P<waiting>\d+)",
+    re.DOTALL,
+)
+
+
+def parse_stub_status(text):
+    """Parses output of nginx ``stub_status`` module.
+
+    :param text: Output of ``stub_status`` page.
+    :returns: A ``dict`` of counters, or empty ``dict`` if text
+              cannot be parsed.
+    """
+    match = _STUB_STATUS_RE.search(text or "")
+    if not match:
+        return {}
+    return {k: int(v) for k, v in match.groupdict().iteritems()}
+
+
+def get_desired_replicas(current, metrics, targets, min_replicas,
+                         max_replicas, tolerance=TOLERANCE):
+    """Computes desired replicas using target tracking.
+
+    Each metric proposes ``ceil(current * value / target)`` replicas
+    (unless the value is within tolerance of its target); the highest
+    proposal wins, bounded by ``min_replicas`` and ``max_replicas``.
+
+    :param current: Current number of replicas.
+    :param metrics: Metric values keyed by name; ``None`` value is ignored.
+    :param targets: Target values keyed by metric name; zero target
+                    disables the metric.
+    :param min_replicas: Lower bound of replicas.
+    :param max_replicas: Upper bound of replicas.
+    :param tolerance: Ignored relative deviation from target.
+    :returns: A tuple of desired replicas and proposals keyed by metric name.
+    """
+    proposals = {}
+    for name, value in metrics.iteritems():
+        target = targets.get(name)
+        if not target or value is None:
+            continue
+
+        ratio = float(value) / target
+        if abs(ratio - 1) <= tolerance:
+            proposals[name] = current
+        else:
+            proposals[name] = int(math.ceil(current * ratio))
+
+    desired = max(proposals.values()) if proposals else current
+    return max(min_replicas, min(desired, max_replicas)), proposals
+
+
+def get_status_file(app):
+    """Gets path to file where autoscaler status is saved.
+
+    :param app: An instance of :class:`flask.Flask`.
+    """
+    return os.path.join(app.config["DATA_DIR"], "autoscaler.status")
+
+
+def read_status(app):
+    """Reads latest autoscaler status.
+
+    :param app: An instance of :class:`flask.Flask`.
+    :returns: A ``dict`` of autoscaler status (if any).
+    """
+    try:
+        with open(get_status_file(app)) as fd:
+            return json.loads(fd.read())
+    except (IOError, ValueError):
+        return {}
+
+
+class Autoscaler(object):
+    """Adjusts desired replicas of oxAuth deployment based on
+    CPU and memory usage of oxAuth containers and request rate
+    of nginx containers.
+
+    Replicas are changed through the deployment, hence the containers
+    are deployed or removed by the deployment reconciler.
+
+    :param app: An instance of :class:`flask.Flask`.
+    """
+    container_type = "oxauth"
+
+    def __init__(self, app):
+        self.logger = logging.getLogger(
+            __name__ + "." + self.__class__.__name__,
+        )
+        self.app = app
+        self.min_replicas = app.config["AUTOSCALER_MIN_REPLICAS"]
+        self.max_replicas = app.config["AUTOSCALER_MAX_REPLICAS"]
+        self.targets = {
+            "cpu": app.config["AUTOSCALER_TARGET_CPU"],
+            "memory": app.config["AUTOSCALER_TARGET_MEM"],
+            "rps": app.config["AUTOSCALER_TARGET_RPS"],
+        }
+        self.scale_out_cooldown = app.config["AUTOSCALER_SCALE_OUT_COOLDOWN"]
+        self.scale_in_cooldown = app.config["AUTOSCALER_SCALE_IN_COOLDOWN"]
+        self.lifecycle = ContainerLifecycleHelper(app)
+
+        self.status = {"last_scale_out_at": 0, "last_scale_in_at": 0}
+        self._status_lock = threading.Lock()
+
+        # previous nginx requests counter, keyed by container ID
+        self._requests = {}
+
+        # node names keyed by node ID; refreshed on each evaluation,
+        # as sampling threads have no access to database session
+        self._node_names = {}
+
+    def restore_status(self):
+        """Restores cooldown timestamps saved by any process.
+
+        Status is re-read on each evaluation, as the task may be taken
+        over by another process after this object is created.
+        """
+        saved = read_status(self.app)
+        with self._status_lock:
+            for key in ("last_scale_out_at", "last_scale_in_at"):
+                self.status[key] = max(self.status.get(key, 0),
+                                       saved.get(key, 0))
+
+    def update_status(self, **kwargs):
+        """Updates and saves autoscaler status.
+        """
+        with self._status_lock:
+            self.status.update(kwargs)
+            status_file = get_status_file(self.app)
+
+            try:
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(status_file))
+                with os.fdopen(fd, "w") as fp:
+                    fp.write(json.dumps(self.status))
+                os.rename(tmp, status_file)
+            except (IOError, OSError) as exc:
+                self.logger.warn("unable to save autoscaler status; "
+                                 "reason={}".format(exc))
+
+    def get_docker(self, container):
+        return self.lifecycle.get_docker(self._node_names[container.node_id])
+
+    def sample_container(self, container):
+        """Gets CPU (in number of CPUs) and memory usage (relative to
+        memory limit) of the container.
+
+        :param container: Container object.
+        """
+        stats = self.get_docker(container).get_stats(container.cid)
+        mem_limit = stats.get("memory_stats", {}).get("limit") or 0
+        mem_ratio = float(get_mem_used(stats)) / mem_limit if mem_limit else 0.0
+        return get_cpu_used(stats), mem_ratio
+
+    def sample_nginx(self, container):
+        """Gets total requests handled by nginx container.
+
+        :param container: Container object.
+        """
+        result = self.get_docker(container).exec_cmd(container.cid, NGINX_STATUS_CMD)
+        return parse_stub_status(result.retval).get("requests")
+
+    def _sample_all(self, func, containers):
+        results = {}
+        if not containers:
+            return results
+
+        max_workers = min(SAMPLE_MAX_WORKERS, len(containers))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(func, container): container
+                       for container in containers}
+
+            for future in concurrent.futures.as_completed(futures):
+                container = futures[future]
+                try:
+                    results[container.id] = future.result()
+                except Exception as exc:
+                    self.logger.warn("unable to sample {} container; "
+                                     "reason={}".format(container.name, exc))
+        return results
+
+    def collect_metrics(self, replicas):
+        """Collects metrics of the deployment.
+
+        Must be called within app context.
+
+        :param replicas: Current number of replicas.
+        :returns: A ``dict`` of average CPU and memory usage per container,
+                  and request rate per replica.
+        """
+        metrics = {"cpu": None, "memory": None, "rps": None}
+        self._node_names = {node.id: node.name for node in Node.query.all()}
+
+        containers = Container.query.filter_by(
+            type=self.container_type, state=STATE_SUCCESS,
+        ).all()
+        samples = self._sample_all(self.sample_container, containers).values()
+        if samples:
+            metrics["cpu"] = sum(cpu for cpu, _ in samples) / len(samples)
+            metrics["memory"] = sum(mem for _, mem in samples) / len(samples)
+
+        nginx_containers = Container.query.filter_by(
+            type="nginx", state=STATE_SUCCESS,
+        ).all()
+        now = time.time()
+        counters = self._sample_all(self.sample_nginx, nginx_containers)
+
+        rate = 0.0
+        has_rate = False
+        for container_id, requests in counters.iteritems():
+            if requests is None:
+                continue
+
+            prev = self._requests.get(container_id)
+            self._requests[container_id] = (requests, now)
+
+            # counter is reset when nginx is restarted
+            if prev and requests >= prev[0] and now > prev[1]:
+                rate += (requests - prev[0]) / (now - prev[1])
+                has_rate = True
+
+        if has_rate and replicas:
+            metrics["rps"] = rate / replicas
+        return metrics
+
+    def get_deployment(self):
+        """Gets (or creates) deployment of the container type.
+
+        Must be called within app context.
+        """
+        deployment = Deployment.query.filter_by(
+            container_type=self.container_type,
+        ).first()
+
+        if not deployment:
+            # start from currently deployed containers
+            replicas = Container.query.filter(
+                Container.type == self.container_type,
+                Container.state.in_([STATE_SUCCESS, STATE_IN_PROGRESS]),
+            ).count()
+            deployment = Deployment(container_type=self.container_type,
+                                    replicas=replicas)
+        return deployment
+
+    def scale(self):
+        """Evaluates metrics and adjusts desired replicas.
+
+        This method does blocking I/O and must not be executed
+        in reactor thread.
+        """
+        self.restore_status()
+
+        with self.app.app_context():
+            deployment = self.get_deployment()
+            current = deployment.replicas
+            metrics = self.collect_metrics(current)
+            desired, proposals = get_desired_replicas(
+                current, metrics, self.targets,
+                self.min_replicas, self.max_replicas,
+            )
+
+            now = int(time.time())
+            decision = "none"
+
+            if desired > current:
+                if now - self.status["last_scale_out_at"] < self.scale_out_cooldown:
+                    decision = "scale_out_cooldown"
+                else:
+                    decision = "scale_out"
+            elif desired < current:
+                last_scaled_at = max(self.status["last_scale_out_at"],
+                                     self.status["last_scale_in_at"])
+                if now - last_scaled_at < self.scale_in_cooldown:
+                    decision = "scale_in_cooldown"
+                else:
+                    decision = "scale_in"
+
+            if decision in ("scale_out", "scale_in"):
+                self.logger.info("scaling {} deployment from {} to {} "
+                                 "replicas; metrics={}".format(
+                                     self.container_type, current,
+                                     desired, metrics))
+                deployment.replicas = desired
+                db.session.add(deployment)
+                db.session.commit()
+                self.status["last_{}_at".format(decision)] = now
+
+        self.update_status(
+            last_run_at=now,
+            container_type=self.container_type,
+            current_replicas=current,
+            desired_replicas=desired,
+            decision=decision,
+            metrics=metrics,
+            targets=self.targets,
+            proposals=proposals,
+            min_replicas=self.min_replicas,
+            max_replicas=self.max_replicas,
+        )
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import json
+import logging
+import os
+import tempfile
+import time
+
+import concurrent.futures
+
+from ..extensions import db
+from ..helper import ContainerLifecycleHelper
+from ..machine import Machine
+from ..model import STATE_DISABLED
+from ..model import STATE_FAILED
+from ..model import STATE_STOPPED
+from ..model import STATE_SUCCESS
+from ..model import Container
+from ..model import Node
+from ..utils import as_boolean
+
+# Default interval (in seconds) between each drift check
+TASK_INTERVAL = 60 * 5
+
+# Maximum number of nodes listed concurrently
+LIST_MAX_WORKERS = 10
+
+# Prefix of images deployed by engine
+IMAGE_PREFIX = "gluufederation/"
+
+#: Container exists in database, but not in Docker
+DRIFT_MISSING = "missing"
+
+#: Container deployed by engine exists in Docker, but not in database
+DRIFT_ORPHANED = "orphaned"
+
+#: Container is expected to run, but it's not running
+DRIFT_STOPPED = "stopped"
+
+#: Container runs an image other than the configured one
+DRIFT_IMAGE_MISMATCH = "image_mismatch"
+
+# States of container which is expected to exist in Docker
+_EXPECTED_STATES = (STATE_SUCCESS, STATE_STOPPED, STATE_DISABLED,)
+
+
+def is_running(docker_container):
+    """Checks whether container from Docker listing is running.
+
+    :param docker_container: An item of Docker containers listing.
+    """
+    state = docker_container.get("State")
+    if state:
+        return state == "running"
+    # older API only has human-readable status
+    return docker_container.get("Status", "").startswith("Up")
+
+
+def classify_drift(containers, docker_containers, image_tag):
+    """Compares containers in database with containers in Docker.
+
+    :param containers: A list of container objects.
+    :param docker_containers: Docker containers listings, keyed by
+                              node's ID; unreachable node must be omitted.
+    :param image_tag: Expected tag of images.
+    :returns: A ``dict`` of drifted entries, keyed by drift type.
+    """
+    drift = {
+        DRIFT_MISSING: [],
+        DRIFT_ORPHANED: [],
+        DRIFT_STOPPED: [],
+        DRIFT_IMAGE_MISMATCH: [],
+    }
+
+    # index Docker containers by short ID and name
+    by_cid = {}
+    by_name = {}
+    for node_id, listing in docker_containers.iteritems():
+        for ctr in listing:
+            by_cid[ctr["Id"][:12]] = (node_id, ctr)
+            for name in ctr.get("Names") or []:
+                by_name[name.split("/")[-1]] = (node_id, ctr)
+
+    matched = set()
+    for container in containers:
+        if container.node_id not in docker_containers:
+            # node is unreachable; nothing to compare with
+            continue
+
+        found = by_cid.get(container.cid or "") or by_name.get(container.name or "")
+        if found:
+            matched.add(found[1]["Id"])
+
+        if container.state not in _EXPECTED_STATES:
+            continue
+
+        entry = {
+            "id": container.id,
+            "name": container.name,
+            "type": container.type,
+            "node_id": container.node_id,
+            "state": container.state,
+        }
+
+        if not found:
+            drift[DRIFT_MISSING].append(entry)
+            continue
+
+        _, ctr = found
+        entry["cid"] = ctr["Id"][:12]
+
+        if container.state == STATE_SUCCESS and not is_running(ctr):
+            entry["status"] = ctr.get("Status", "")
+            drift[DRIFT_STOPPED].append(entry)
+
+        expected_image = "{}{}:{}".format(IMAGE_PREFIX, container.image, image_tag)
+        if ctr.get("Image") != expected_image:
+            entry = dict(entry, image=ctr.get("Image"), expected_image=expected_image)
+            drift[DRIFT_IMAGE_MISMATCH].append(entry)
+
+    for node_id, listing in docker_containers.iteritems():
+        for ctr in listing:
+            if ctr["Id"] in matched or not ctr.get("Image", "").startswith(IMAGE_PREFIX):
+                continue
+            drift[DRIFT_ORPHANED].append({
+                "cid": ctr["Id"][:12],
+                "name": (ctr.get("Names") or [""])[0].split("/")[-1],
+                "node_id": node_id,
+                "image": ctr.get("Image"),
+                "status": ctr.get("Status", ""),
+            })
+    return drift
+
+
+def get_status_file(app):
+    """Gets path to file where latest drift report is saved.
+
+    :param app: An instance of :class:`flask.Flask`.
+    """
+    return os.path.join(app.config["DATA_DIR"], "drift.status")
+
+
+def read_status(app):
+    """Reads latest drift report.
+
+    :param app: An instance of :class:`flask.Flask`.
+    :returns: A ``dict`` of drift report (if any).
+    """
+    try:
+        with open(get_status_file(app)) as fd:
+            return json.loads(fd.read())
+    except (IOError, ValueError):
+        return {}
+
+
+class DriftReconciler(object):
+    """Detects (and optionally fixes) drift between ``containers`` table
+    and containers in Docker, using a single listing per node.
+
+    Fixes applied when ``autofix`` is enabled:
+
+    1. Missing containers are marked as ``FAILED``, hence replaced by
+       deployment reconciler.
+    2. Orphaned containers are removed.
+    3. Stopped containers are restarted.
+
+    Containers with mismatched image are only reported.
+
+    :param app: An instance of :class:`flask.Flask`.
+    """
+    def __init__(self, app):
+        self.logger = logging.getLogger(
+            __name__ + "." + self.__class__.__name__,
+        )
+        self.app = app
+        self.machine = Machine()
+        self.lifecycle = ContainerLifecycleHelper(app)
+
+    def list_docker_containers(self, nodes):
+        """Lists containers of each node concurrently.
+
+        :param nodes: A list of node objects.
+        :returns: A tuple of listings keyed by node's ID, and a list of
+                  unreachable node names.
+        """
+        listings = {}
+        unreachable = []
+        if not nodes:
+            return listings, unreachable
+
+        max_workers = min(LIST_MAX_WORKERS, len(nodes))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # resolving node's client may fail as well (e.g. node is
+            # stopped), hence it's done inside the future
+            futures = {
+                executor.submit(
+                    lambda name=node.name: self.lifecycle.get_docker(name).list_containers(True),
+                ): node
+                for node in nodes
+            }
+
+            for future in concurrent.futures.as_completed(futures):
+                node = futures[future]
+                try:
+                    listings[node.id] = future.result()
+                except Exception as exc:
+                    self.logger.warn("unable to list containers of {} node; "
+                                     "reason={}".format(node.name, exc))
+                    unreachable.append(node.name)
+        return listings, unreachable
+
+    def check(self, autofix=None):
+        """Runs drift check.
+
+        :param autofix: Whether to fix the drift; defaults to
+                        ``DRIFT_AUTOFIX`` config.
+        :returns: A ``dict`` of drift report.
+        """
+        if autofix is None:
+            autofix = as_boolean(self.app.config["DRIFT_AUTOFIX"])
+
+        start = time.time()
+        with self.app.app_context():
+            nodes = Node.query.filter(Node.type.in_(["master", "worker"])).all()
+            node_names = {node.id: node.name for node in nodes}
+            # read database first; container deployed in the meantime
+            # shows up in listing (hence never classified as missing)
+            containers = Container.query.all()
+            listings, unreachable = self.list_docker_containers(nodes)
+
+            drift = classify_drift(containers, listings,
+                                   self.app.config["GLUU_IMAGE_TAG"])
+
+            fixed = []
+            if autofix:
+                fixed = self.fix(drift, node_names)
+
+        report = {
+            "checked_at": int(start),
+            "elapsed": time.time() - start,
+            "nodes": len(listings),
+            "unreachable_nodes": unreachable,
+            "containers": len(containers),
+            "drift": drift,
+            "autofix": bool(autofix),
+            "fixed": fixed,
+        }
+        self.save_report(report)
+
+        drifted = sum(len(entries) for entries in drift.itervalues())
+        if drifted:
+            self.logger.warn("{} drifted container(s) found".format(drifted))
+        return report
+
+    def fix(self, drift, node_names):
+        """Fixes the drift.
+
+        Must be called within app context.
+
+        :param drift: Drifted entries as returned by :func:`classify_drift`.
+        :param node_names: Node names keyed by node's ID.
+        :returns: A list of fixed entries.
+        """
+        fixed = []
+
+        missing_ids = [entry["id"] for entry in drift[DRIFT_MISSING]]
+        if missing_ids:
+            Container.query.filter(
+                Container.id.in_(missing_ids),
+                Container.state.in_(_EXPECTED_STATES),
+            ).update({"state": STATE_FAILED}, synchronize_session=False)
+            db.session.commit()
+            fixed.extend({"name": entry["name"], "action": "mark_failed"}
+                         for entry in drift[DRIFT_MISSING])
+
+        for drift_type, action in [(DRIFT_ORPHANED, "remove"),
+                                   (DRIFT_STOPPED, "restart")]:
+            for entry in drift[drift_type]:
+                if action == "remove" and self.is_registered(entry):
+                    # container is saved after database was read,
+                    # e.g. it's being deployed
+                    continue
+
+                try:
+                    docker = self.lifecycle.get_docker(node_names[entry["node_id"]])
+                    if action == "remove":
+                        docker.remove_container(entry["cid"])
+                    else:
+                        docker.restart_container(entry["cid"])
+                    fixed.append({"name": entry["name"], "action": action})
+                except Exception as exc:
+                    self.logger.warn("unable to {} {} container; "
+                                     "reason={}".format(action, entry["name"], exc))
+        return fixed
+
+    def is_registered(self, entry):
+        """Checks whether drifted Docker container exists in database.
+
+        Must be called within app context.
+
+        :param entry: Drifted entry having ``cid`` and ``name``.
+        """
+        return Container.query.filter(
+            (Container.cid == entry["cid"])
+            | (Container.name == entry["name"])
+        ).count() > 0
+
+    def save_report(self, report):
+        status_file = get_status_file(self.app)
+        try:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(status_file))
+            with os.fdopen(fd, "w") as fp:
+                fp.write(json.dumps(report))
+            os.rename(tmp, status_file)
+        except (IOError, OSError) as exc:
+            self.logger.warn("unable to save drift report; "
+                             "reason={}".format(exc))
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import logging
+import os
+import threading
+import time
+
+from blinker import signal
+
+from ..dockerclient import Docker
+from ..extensions import db
+from ..machine import Machine
+from ..model import STATE_FAILED
+from ..model import STATE_STOPPED
+from ..model import STATE_SUCCESS
+from ..model import Container
+from ..model import Node
+
+# Default interval (in seconds) to reconnect to the events stream
+TASK_INTERVAL = 5
+
+# Delay (in seconds) to coalesce topology changes before notifying nginx
+TOPOLOGY_DELAY = 5
+
+#: Container states changed by Docker events, keyed by event action
+#: and current state
+STATE_TRANSITIONS = {
+    ("die", STATE_SUCCESS): STATE_STOPPED,
+    ("start", STATE_STOPPED): STATE_SUCCESS,
+    ("destroy", STATE_SUCCESS): STATE_FAILED,
+    ("destroy", STATE_STOPPED): STATE_FAILED,
+}
+
+#: Container health keyed by event action
+HEALTH_STATUSES = {
+    "health_status: healthy": "healthy",
+    "health_status: unhealthy": "unhealthy",
+}
+
+#: Actions of events which may change the container
+ACTIONS = set(
+    [action for action, _ in STATE_TRANSITIONS] + HEALTH_STATUSES.keys()
+)
+
+#: Types of container proxied by nginx
+PROXIED_TYPES = ("oxauth", "oxtrust",)
+
+
+def get_state_transition(action, state):
+    """Gets new state of container after an event.
+
+    :param action: Action of the event, e.g. ``die``.
+    :param state: Current state of the container.
+    :returns: New state, or ``None`` if state is unchanged.
+    """
+    return STATE_TRANSITIONS.get((action, state))
+
+
+def get_cursor_file(app):
+    """Gets path to file where timestamp of the latest event is saved,
+    so the stream is resumed from that point.
+
+    :param app: An instance of :class:`flask.Flask`.
+    """
+    return os.path.join(app.config["DATA_DIR"], "docker_events.cursor")
+
+
+class DockerEventWatcher(object):
+    """Follows container events from swarm and updates state and health
+    of the containers.
+
+    The stream is resumed from timestamp of the latest processed event
+    whenever it's reconnected, hence no event is lost between sessions.
+
+    :param app: An instance of :class:`flask.Flask`.
+    """
+    def __init__(self, app):
+        self.logger = logging.getLogger(
+            __name__ + "." + self.__class__.__name__,
+        )
+        self.app = app
+        self.machine = Machine()
+        self.cursor_file = get_cursor_file(app)
+        self.cursor = self.read_cursor()
+
+        # events processed within the cursor's second; they're replayed
+        # as ``since`` parameter has 1-second resolution
+        self._seen = set()
+
+        self._topology_timer = None
+        self._topology_lock = threading.Lock()
+
+    def read_cursor(self):
+        try:
+            with open(self.cursor_file) as fd:
+                return int(fd.read().strip())
+        except (IOError, ValueError):
+            return None
+
+    def save_cursor(self, cursor):
+        if cursor == self.cursor:
+            return
+
+        self.cursor = cursor
+        try:
+            with open(self.cursor_file, "w") as fd:
+                fd.write(str(cursor))
+        except IOError as exc:
+            self.logger.warn("unable to save events cursor; "
+                             "reason={}".format(exc))
+
+    def get_docker(self):
+        with self.app.app_context():
+            master_node = Node.query.filter_by(type="master").first()
+        if not master_node:
+            return None
+        return Docker({}, self.machine.swarm_config(master_node.name))
+
+    def watch(self):
+        """Consumes events stream until it's disconnected.
+
+        This method does blocking I/O and must not be executed
+        in reactor thread.
+        """
+        docker = self.get_docker()
+        if not docker:
+            return
+
+        # start from current time when running for the first time
+        since = self.cursor or int(time.time())
+
+        try:
+            for event in docker.events(since=since, filters={"type": "container"}):
+                self.handle_event(event)
+        except Exception as exc:
+            self.logger.warn("events stream is disconnected; "
+                             "reason={}".format(exc))
+
+    def handle_event(self, event):
+        """Updates container based on event.
+
+        :param event: An event as returned by Docker API.
+        """
+        key = (event.get("id"), event.get("Action"), event.get("timeNano"))
+        event_time = event.get("time") or int(time.time())
+
+        if event_time != self.cursor:
+            self._seen.clear()
+        if key in self._seen:
+            return
+        self._seen.add(key)
+
+        action = event.get("Action") or event.get("status") or ""
+        if action in ACTIONS:
+            name = event.get("Actor", {}).get("Attributes", {}).get("name", "")
+            self.update_container(event.get("id", ""), name, action, event_time)
+
+        self.save_cursor(event_time)
+
+    def update_container(self, docker_id, name, action, event_time):
+        """Applies event to container in database.
+
+        :param docker_id: ID of the container in Docker.
+        :param name: Name of the container.
+        :param action: Action of the event.
+        :param event_time: Unix timestamp of the event.
+        """
+        with self.app.app_context():
+            # containers are named by engine, but swarm may prefix
+            # the name with node name
+            container = Container.query.filter(
+                (Container.name == name.split("/")[-1])
+                | (Container.cid == docker_id[:12])
+            ).first()
+            if not container:
+                return
+
+            changed = False
+            attrs = dict(container.container_attrs or {})
+
+            state = get_state_transition(action, container.state)
+            if state:
+                self.logger.info("{} container is {}; state changed from "
+                                 "{} to {}".format(container.name, action,
+                                                   container.state, state))
+                container.state = state
+                changed = True
+
+            health = HEALTH_STATUSES.get(action)
+            if health and attrs.get("health") != health:
+                attrs["health"] = health
+                changed = True
+
+            if not changed:
+                return
+
+            attrs["last_event"] = action
+            attrs["last_event_at"] = event_time
+            # a new dict is assigned, so the change is detected
+            container.container_attrs = attrs
+            db.session.add(container)
+            db.session.commit()
+
+            if state and container.type in PROXIED_TYPES:
+                self.schedule_topology_change()
+
+    def schedule_topology_change(self):
+        """Publishes topology change after a short delay, so burst of
+        events only triggers a single nginx reconfiguration.
+        """
+        with self._topology_lock:
+            if self._topology_timer is not None:
+                return
+            self._topology_timer = threading.Timer(
+                TOPOLOGY_DELAY, self.publish_topology_change,
+            )
+            self._topology_timer.daemon = True
+            self._topology_timer.start()
+
+    def publish_topology_change(self):
+        with self._topology_lock:
+            self._topology_timer = None
+
+        try:
+            signal("topology_changed").send(self.app)
+        except Exception as exc:
+            self.logger.warn("unable to reconfigure nginx; "
+                             "reason={}".format(exc))
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import errno
+import fcntl
+import os
+
+
+class LeaderLock(object):
+    """Advisory file lock used to elect a leader among processes
+    (e.g. gunicorn workers) sharing the same filesystem.
+
+    The lock is held until it is released or the owner process dies;
+    in the latter case the OS releases the lock, hence other process
+    is able to claim it.
+
+    :param path: Path to lock file.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    @property
+    def acquired(self):
+        """Checks whether the lock is held by current process.
+        """
+        return self._fd is not None
+
+    def acquire(self):
+        """Tries to acquire the lock without blocking.
+
+        :returns: ``True`` if lock is acquired, otherwise ``False``.
+        """
+        if self._fd is not None:
+            return True
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except (IOError, OSError) as exc:
+            os.close(fd)
+            if exc.errno in (errno.EAGAIN, errno.EACCES,):
+                return False
+            raise
+
+        # save the owner's PID for troubleshooting purpose
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()))
+        self._fd = fd
+        return True
+
+    def release(self):
+        """Releases the lock (if acquired).
+        """
+        if self._fd is None:
+            return
+
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
@@ -3,18 +3,21 @@
 #
 # All rights reserved.
 
+import json
 import logging
+import os
+import random
+import tempfile
+import threading
 import time
 
-from crochet import run_in_reactor
-from requests.exceptions import ConnectionError
-from twisted.internet.task import LoopingCall
+from requests.exceptions import RequestException
+from twisted.internet import reactor
+from twisted.internet.threads import deferToThread
 
 from ..extensions import db
-from ..model import STATE_DISABLED
-from ..model import STATE_SUCCESS
+from ..helper import ContainerLifecycleHelper
 from ..model import LicenseKey
-from ..machine import Machine
 from ..utils import populate_license
 from ..utils import retrieve_current_date
 
@@ -24,12 +27,65 @@ TASK_INTERVAL = 60 * 60 * 24
 # Default interval (in milliseconds) to check neccessary update
 UPDATE_INTERVAL_MILLIS = 60 * 60 * 24 * 1000
 
-# Retry interval for updating license (if previous attempt is failed)
-RETRY_INTERVAL = 60 * 60 * 3
+# Base interval for retrying license update (if previous attempt is failed);
+# the interval is doubled on each attempt
+RETRY_INTERVAL = 60 * 5
+
+# Upper bound of retry interval
+RETRY_MAX_INTERVAL = 60 * 60 * 3
 
 # Maximum retries for updating license
 RETRY_LIMIT = 3
 
+#: Task is waiting for next run
+STATUS_IDLE = "IDLE"
+
+#: Task is checking the license
+STATUS_RUNNING = "RUNNING"
+
+#: Task is waiting for next retry
+STATUS_RETRYING = "RETRYING"
+
+#: Task has failed to update the license
+STATUS_FAILED = "FAILED"
+
+
+def get_retry_delay(attempt, base=RETRY_INTERVAL, cap=RETRY_MAX_INTERVAL):
+    """Gets delay (in seconds) before next retry using exponential backoff
+    with jitter.
+
+    :param attempt: Number of previous attempts (starts from 0).
+    :param base: Base interval in seconds.
+    :param cap: Maximum interval in seconds.
+    :returns: Randomized delay between half and full backoff interval.
+    """
+    delay = min(cap, base * (2 ** attempt))
+    return random.uniform(delay / 2.0, delay)
+
+
+def get_status_file(app):
+    """Gets path to file where task status is saved.
+
+    Status is saved into a file, so every worker is able to read the status
+    regardless of which worker is running the task.
+
+    :param app: An instance of :class:`flask.Flask`.
+    """
+    return os.path.join(app.config["DATA_DIR"], "lwatcher.status")
+
+
+def read_status(app):
+    """Reads latest task status.
+
+    :param app: An instance of :class:`flask.Flask`.
+    :returns: A ``dict`` of task status (if any).
+    """
+    try:
+        with open(get_status_file(app)) as fd:
+            return json.loads(fd.read())
+    except (IOError, ValueError):
+        return {}
+
 
 class LicenseWatcherTask(object):
     def __init__(self, app):
@@ -37,21 +93,121 @@ class LicenseWatcherTask(object):
             __name__ + "." + self.__class__.__name__,
         )
         self.app = app
-        self.machine = Machine()
-
-    @run_in_reactor
-    def perform_job(self):
-        """An entrypoint of this task class.
+        self.status = {
+            "state": STATUS_IDLE,
+            "last_run_at": None,
+            "next_run_at": None,
+            "next_retry_at": None,
+            "retry_attempt": 0,
+            "last_error": "",
+        }
+        self._status_lock = threading.Lock()
+        self._retry_call = None
+
+    def on_error(self, failure):
+        """Callback to handle error.
         """
-        # callback to handle error
-        def on_error(failure):
-            self.logger.error(failure.getTraceback())
+        self.logger.error(failure.getTraceback())
+        self.update_status(state=STATUS_FAILED,
+                           last_error=failure.getErrorMessage())
 
-        lc = LoopingCall(self.monitor_license)
-        deferred = lc.start(TASK_INTERVAL, now=True)
-        deferred.addErrback(on_error)
+    def update_status(self, **kwargs):
+        """Updates and saves task status.
+        """
+        with self._status_lock:
+            self.status.update(kwargs)
+            status_file = get_status_file(self.app)
+
+            try:
+                # write to temporary file first and rename it afterwards,
+                # so readers never see partially-written file
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(status_file))
+                with os.fdopen(fd, "w") as fp:
+                    fp.write(json.dumps(self.status))
+                os.rename(tmp, status_file)
+            except (IOError, OSError) as exc:
+                self.logger.warn("unable to save task status; "
+                                 "reason={}".format(exc))
 
     def monitor_license(self):
+        """An entrypoint of this task class; scheduled every
+        ``TASK_INTERVAL`` by :class:`~gluuengine.task.TaskScheduler`.
+
+        Checks the license in a thread, hence the reactor is never blocked
+        by requests to license server.
+        """
+        # the pending retry is superseded by this run
+        self.cancel_retry()
+
+        now = int(time.time())
+        self.update_status(
+            state=STATUS_RUNNING,
+            last_run_at=now,
+            next_run_at=now + TASK_INTERVAL,
+            next_retry_at=None,
+            retry_attempt=0,
+        )
+
+        deferred = deferToThread(self.check_license)
+        deferred.addErrback(self.on_error)
+        return deferred
+
+    def cancel_retry(self):
+        """Cancels pending retry (if any).
+        """
+        if self._retry_call and self._retry_call.active():
+            self._retry_call.cancel()
+        self._retry_call = None
+
+    def schedule_retry(self, license_key, attempt, err):
+        """Schedules next attempt to update the license without blocking
+        the reactor.
+
+        Must be called from reactor thread.
+
+        :param license_key: License key object.
+        :param attempt: Number of previous attempts.
+        :param err: Error message of previous attempt.
+        """
+        if attempt >= RETRY_LIMIT:
+            self.logger.warn("failed to update license after few retries")
+            self.update_status(state=STATUS_FAILED, last_error=err,
+                               next_retry_at=None)
+
+            deferred = deferToThread(self.enforce_license, license_key)
+            deferred.addErrback(self.on_error)
+            return
+
+        delay = get_retry_delay(attempt)
+        self.logger.info("auto-retry in {} seconds".format(int(delay)))
+        self.update_status(
+            state=STATUS_RETRYING,
+            retry_attempt=attempt + 1,
+            next_retry_at=int(time.time() + delay),
+            last_error=err,
+        )
+        self._retry_call = reactor.callLater(delay, self.retry, attempt + 1)
+
+    def retry(self, attempt):
+        """Retries license check.
+
+        :param attempt: Number of previous attempts.
+        """
+        self._retry_call = None
+        self.update_status(state=STATUS_RUNNING, next_retry_at=None)
+
+        deferred = deferToThread(self.check_license, attempt)
+        deferred.addErrback(self.on_error)
+        return deferred
+
+    def check_license(self, attempt=0):
+        """Checks and updates the license (if necessary).
+
+        This method does blocking I/O and must not be executed
+        in reactor thread.
+
+        :param attempt: Number of previous attempts.
+        """
         license_key = self.get_license_key()
         err = ""
 
@@ -59,10 +215,12 @@ class LicenseWatcherTask(object):
 
         if not license_key:
             self.logger.info("license key is currently unavailable")
+            self.update_status(state=STATUS_IDLE)
             return
 
         if not license_key.auto_update:
             self.logger.info("auto-update feature for license is disabled")
+            self.update_status(state=STATUS_IDLE)
             return
 
         self.logger.info("auto-updating license")
@@ -70,105 +228,65 @@ class LicenseWatcherTask(object):
         try:
             # get current datetime from license server
             current_date = retrieve_current_date()
-        except ConnectionError:
-            self.logger.warn("unable to get current date from license server")
-            return
 
-        # if license has been already updated within 24 hours,
-        # no need to re-populate the license
-        if (current_date - license_key.populated_at) < UPDATE_INTERVAL_MILLIS:
-            self.logger.info("license key is up-to-date")
-            return
-
-        # do retries (max. 3 times)
-        retry_attempt = 0
+            # if license has been already updated within 24 hours,
+            # no need to re-populate the license
+            if (current_date - license_key.populated_at) < UPDATE_INTERVAL_MILLIS:
+                self.logger.info("license key is up-to-date")
+                self.update_status(state=STATUS_IDLE, last_error="")
+                return
 
-        while True:
             # re-populate the license; this will also send MAC address
             self.logger.info("downloading signed license")
             license_key, err = populate_license(license_key)
 
-            if err:
-                self.logger.warn(err)
-
-                if retry_attempt == RETRY_LIMIT:
-                    self.logger.warn("failed to update license after "
-                                     "few retries")
-                    break
-
-                self.logger.info(
-                    "auto-retry in {} seconds".format(RETRY_INTERVAL)
-                )
-                time.sleep(RETRY_INTERVAL)
-                retry_attempt += 1
-            else:
+            if not err:
                 # mark the latest update time
                 license_key.populated_at = retrieve_current_date()
-                with self.app.app_context():
-                    db.session.add(license_key)
-                    db.session.commit()
-                self.logger.info("license key has been updated")
-                break
-
-        with self.app.app_context():
-            worker_nodes = license_key.get_workers()
-
-        # cache the expiration state
-        license_expired = license_key.expired
-
-        for node in worker_nodes:
-            if license_expired:
-                # disable specific containers
-                self.disable_containers(node, "oxauth")
-            else:
-                # if we have specific containers being disabled in node,
-                # try to re-enable the containers
-                self.enable_containers(node, "oxauth")
+        except RequestException as exc:
+            err = "unable to connect to license server; " \
+                  "reason={}".format(exc)
+
+        if err:
+            self.logger.warn(err)
+            reactor.callFromThread(
+                self.schedule_retry, license_key, attempt, err,
+            )
+            return
 
-    def get_license_key(self):
         with self.app.app_context():
-            return LicenseKey.query.first()
+            db.session.add(license_key)
+            db.session.commit()
+        self.logger.info("license key has been updated")
 
-    def disable_containers(self, node, type_):
-        """Disables containers having specific type.
+        self.enforce_license(license_key)
+        self.update_status(state=STATUS_IDLE, last_error="")
 
-        Disabled container will be stopped and excluded from cluster's network.
+    def enforce_license(self, license_key):
+        """Disables or enables containers based on license state.
 
-        :param node: Node object.
-        :param type_: Type of the container.
+        :param license_key: License key object.
         """
         with self.app.app_context():
-            containers = node.get_containers(type_=type_)
-
-            for container in containers:
-                container.state = STATE_DISABLED
-                db.session.add(container)
-                db.session.commit()
+            worker_nodes = license_key.get_workers()
 
-                self.machine.ssh(
-                    node.name, "sudo docker stop {}".format(container.cid),
-                )
-                self.logger.info("{} container {} has been "
-                                 "disabled".format(type_, container.name))
+        helper = ContainerLifecycleHelper(self.app)
 
-    def enable_containers(self, node, type_):
-        """Enables containers having specific type.
+        if license_key.expired:
+            # disable specific containers
+            report = helper.disable_containers(worker_nodes, "oxauth")
+        else:
+            # if we have specific containers being disabled in node,
+            # try to re-enable the containers
+            report = helper.enable_containers(worker_nodes, "oxauth")
 
-        Enabled container will be restarted and included into cluster's network.
+        self.update_status(last_enforcement={
+            "state": report["state"],
+            "changed": len(report["changed"]),
+            "failed": len(report["failed"]),
+        })
+        return report
 
-        :param node: Node object.
-        :param type_: Type of the container.
-        """
+    def get_license_key(self):
         with self.app.app_context():
-            containers = node.get_containers(type_=type_, state=STATE_DISABLED)
-
-            for container in containers:
-                container.state = STATE_SUCCESS
-                db.session.add(container)
-                db.session.commit()
-
-                self.machine.ssh(
-                    node.name, "sudo docker restart {}".format(container.cid),
-                )
-                self.logger.info("{} container {} has been "
-                                 "enabled".format(type_, container.id))
+            return LicenseKey.query.first()
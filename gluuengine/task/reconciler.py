@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import logging
+from datetime import datetime
+from datetime import timedelta
+
+import concurrent.futures
+from sqlalchemy import func
+
+from ..extensions import db
+from ..helper import setup_helper_generator
+from ..helper import teardown_helper_generator
+from ..model import STATE_FAILED
+from ..model import STATE_IN_PROGRESS
+from ..model import STATE_STOPPED
+from ..model import STATE_SUCCESS
+from ..model import Cluster
+from ..model import Container
+from ..model import Deployment
+from ..placement import PlacementEngine
+from ..placement import PlacementError
+from ..placement import select_victims
+
+# Default interval (in seconds) between each reconciliation
+TASK_INTERVAL = 30
+
+
+def compute_diff(replicas, counts, batch_size):
+    """Computes the minimal changes to reach desired number of replicas.
+
+    ``FAILED`` containers are always removed; they are replaced by new
+    containers as they no longer count as live replicas. Containers
+    which are still ``IN_PROGRESS`` are never removed (unless their setup
+    is timed out; see :meth:`DeploymentReconciler.fail_stale_containers`).
+    ``STOPPED``
+    containers count as live replicas, as Docker restarts them
+    (see restart policy of the container).
+
+    :param replicas: Desired number of replicas.
+    :param counts: Number of containers keyed by their state.
+    :param batch_size: Maximum number of containers to add or remove.
+    :returns: A ``dict`` of ``remove_failed``, ``scale_out``, and
+              ``scale_in`` number of containers.
+    """
+    live = (counts.get(STATE_SUCCESS, 0) + counts.get(STATE_IN_PROGRESS, 0)
+            + counts.get(STATE_STOPPED, 0))
+    diff = replicas - live
+
+    return {
+        "remove_failed": min(counts.get(STATE_FAILED, 0), batch_size),
+        "scale_out": min(max(diff, 0), batch_size),
+        "scale_in": min(max(-diff, 0), counts.get(STATE_SUCCESS, 0), batch_size),
+    }
+
+
+class DeploymentReconciler(object):
+    """Drives number of containers towards desired replicas
+    of each deployment.
+
+    :param app: An instance of :class:`flask.Flask`.
+    """
+    def __init__(self, app):
+        self.logger = logging.getLogger(
+            __name__ + "." + self.__class__.__name__,
+        )
+        self.app = app
+        self.batch_size = app.config["DEPLOYMENT_BATCH_SIZE"]
+        self.setup_timeout = app.config["DEPLOYMENT_SETUP_TIMEOUT"]
+
+    def get_counts(self, container_type):
+        """Counts containers of given type, grouped by their state.
+
+        :param container_type: Type of the container.
+        """
+        rows = db.session.query(
+            Container.state, func.count(Container.id),
+        ).filter(
+            Container.type == container_type,
+        ).group_by(Container.state).all()
+        return dict(rows)
+
+    def fail_stale_containers(self, container_type):
+        """Marks containers whose setup is timed out as ``FAILED``.
+
+        Setup may never finish, e.g. when it's interrupted by engine
+        restart; such containers would otherwise count as live replicas
+        forever.
+
+        Must be called within app context.
+
+        :param container_type: Type of the container.
+        :returns: Number of affected containers.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.setup_timeout)
+        count = Container.query.filter(
+            Container.type == container_type,
+            Container.state == STATE_IN_PROGRESS,
+            Container.created_at < cutoff,
+        ).update({"state": STATE_FAILED}, synchronize_session=False)
+        db.session.commit()
+
+        if count:
+            self.logger.warn("{} {} container(s) in IN_PROGRESS state for more "
+                             "than {} seconds are marked as FAILED".format(
+                                 count, container_type, self.setup_timeout))
+        return count
+
+    def reconcile(self):
+        """Reconciles all deployments.
+
+        This method blocks until containers of current batch are
+        deployed or removed, hence it must be executed in thread.
+        """
+        with self.app.app_context():
+            deployments = Deployment.query.all()
+
+            for deployment in deployments:
+                try:
+                    self.reconcile_deployment(deployment)
+                except Exception as exc:
+                    self.logger.warn(
+                        "unable to reconcile {} deployment; reason={}".format(
+                            deployment.container_type, exc,
+                        ))
+
+    def reconcile_deployment(self, deployment):
+        """Reconciles a deployment.
+
+        Must be called within app context.
+
+        :param deployment: Deployment object.
+        """
+        container_type = deployment.container_type
+        self.fail_stale_containers(container_type)
+        counts = self.get_counts(container_type)
+        diff = compute_diff(deployment.replicas, counts, self.batch_size)
+
+        if not any(diff.values()):
+            return
+
+        self.logger.info("reconciling {} deployment (replicas={}, "
+                         "counts={}, diff={})".format(
+                             container_type, deployment.replicas,
+                             counts, diff))
+
+        if diff["remove_failed"]:
+            failed = Container.query.filter_by(
+                type=container_type, state=STATE_FAILED,
+            ).limit(diff["remove_failed"]).all()
+            self.run_helpers(
+                teardown_helper_generator(self.app, failed), "mp_teardown",
+            )
+
+        if diff["scale_in"]:
+            containers = Container.query.filter_by(
+                type=container_type, state=STATE_SUCCESS,
+            ).all()
+            victims = select_victims(containers, diff["scale_in"])
+            self.run_helpers(
+                teardown_helper_generator(self.app, victims), "mp_teardown",
+            )
+
+        if diff["scale_out"]:
+            self.scale_out(container_type, diff["scale_out"])
+
+    def scale_out(self, container_type, number):
+        """Deploys new containers.
+
+        Must be called within app context.
+
+        :param container_type: Type of the container.
+        :param number: Number of containers.
+        """
+        cluster = Cluster.query.first()
+        if not cluster:
+            self.logger.warn("container deployment requires a cluster")
+            return
+
+        try:
+            nodes = PlacementEngine(self.app).place(container_type, number)
+        except PlacementError as exc:
+            self.logger.warn(exc)
+            return
+
+        self.run_helpers(
+            setup_helper_generator(self.app, container_type, cluster.id,
+                                   [node.id for node in nodes]),
+            "mp_setup",
+        )
+
+    def run_helpers(self, helpers, method):
+        """Runs container helpers concurrently and waits for them.
+
+        :param helpers: An iterable of container helper objects.
+        :param method: Name of helper's method to run.
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.batch_size) as executor:
+            futures = [executor.submit(getattr(helper, method))
+                       for helper in helpers]
+            concurrent.futures.wait(futures)
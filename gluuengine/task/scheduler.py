@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import logging
+import os
+
+from crochet import run_in_reactor
+from twisted.internet.defer import maybeDeferred
+from twisted.internet.task import LoopingCall
+from twisted.internet.threads import deferToThread
+
+from .leader import LeaderLock
+
+# Interval (in seconds) for non-leader process to claim the lock
+ELECTION_INTERVAL = 10
+
+
+class TaskScheduler(object):
+    """Runs periodic tasks, where each task is executed by exactly one
+    process.
+
+    Every process (e.g. gunicorn worker) competes for each task's lock;
+    the process that holds the lock runs the task, while other processes
+    keep trying to claim the lock every ``ELECTION_INTERVAL`` seconds,
+    so they can take over the task when the leader process dies.
+
+    :param app: An instance of :class:`flask.Flask`.
+    """
+    def __init__(self, app):
+        self.logger = logging.getLogger(
+            __name__ + "." + self.__class__.__name__,
+        )
+        self.app = app
+        self.lock_dir = os.path.join(app.config["DATA_DIR"], "locks")
+        self.tasks = {}
+        self._election = None
+
+    def add_task(self, name, func, interval, now=True, in_thread=False):
+        """Registers periodic task.
+
+        :param name: Unique name of the task.
+        :param func: Callable to run; may return a ``Deferred``.
+        :param interval: Interval (in seconds) between each run.
+        :param now: Whether to run the task immediately after elected.
+        :param in_thread: Whether to run blocking ``func`` in thread pool
+                          instead of reactor thread.
+        """
+        self.tasks[name] = {
+            "func": func,
+            "interval": interval,
+            "now": now,
+            "in_thread": in_thread,
+            "lock": LeaderLock(os.path.join(self.lock_dir, "{}.lock".format(name))),
+            "loop": None,
+        }
+
+    @run_in_reactor
+    def start(self):
+        """Starts the election loop.
+        """
+        if not os.path.exists(self.lock_dir):
+            try:
+                os.makedirs(self.lock_dir)
+            except OSError:
+                # created by other process
+                pass
+
+        self._election = LoopingCall(self.elect)
+        deferred = self._election.start(ELECTION_INTERVAL, now=True)
+        deferred.addErrback(self.on_error)
+
+    def elect(self):
+        """Claims lock of tasks which are not running in current process.
+        """
+        for name, task in self.tasks.iteritems():
+            if task["loop"] is not None:
+                continue
+
+            if not task["lock"].acquire():
+                continue
+
+            self.logger.info("process {} is elected to run {} "
+                             "task".format(os.getpid(), name))
+            task["loop"] = LoopingCall(self.run_task, name)
+            deferred = task["loop"].start(task["interval"], now=task["now"])
+            deferred.addErrback(self.on_error)
+
+    def run_task(self, name):
+        """Runs the task.
+
+        :param name: Name of the task.
+        """
+        task = self.tasks[name]
+
+        if task["in_thread"]:
+            deferred = deferToThread(task["func"])
+        else:
+            deferred = maybeDeferred(task["func"])
+
+        # error in a single run must not stop the loop
+        deferred.addErrback(self.on_error)
+        return deferred
+
+    def is_leader(self, name):
+        """Checks whether current process runs the task.
+
+        :param name: Name of the task.
+        """
+        task = self.tasks.get(name)
+        return bool(task and task["lock"].acquired)
+
+    def on_error(self, failure):
+        self.logger.error(failure.getTraceback())
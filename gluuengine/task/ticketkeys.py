@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2017 Gluu
+#
+# All rights reserved.
+
+import logging
+
+from ..model import Cluster
+from ..setup import NginxSetup
+from ..setup.ticketkeys import TASK_INTERVAL  # noqa
+from ..setup.ticketkeys import TicketKeyStore
+
+
+class TicketKeyRotator(object):
+    """Rotates cluster-wide TLS session ticket key and distributes it
+    to all nginx containers.
+
+    :param app: An instance of :class:`flask.Flask`.
+    """
+    def __init__(self, app):
+        self.logger = logging.getLogger(
+            __name__ + "." + self.__class__.__name__,
+        )
+        self.app = app
+        self.store = TicketKeyStore.from_app(app)
+
+    def rotate(self):
+        """Rotates the key once it reaches its lifetime.
+        """
+        age = self.store.get_age()
+        if age is not None and age < self.app.config["TICKET_KEY_LIFETIME"]:
+            return
+        self.distribute(self.store.rotate())
+
+    def distribute(self, keys):
+        """Copies keys to all nginx containers and reloads them.
+
+        Reload is graceful, hence established connections are kept.
+
+        :param keys: A list of current and previous key.
+        """
+        with self.app.app_context():
+            cluster = Cluster.query.first()
+            if not cluster:
+                return
+            containers = cluster.get_containers(type_="nginx")
+
+            for nginx in containers:
+                setup_obj = NginxSetup(nginx, cluster, self.app, self.logger)
+                try:
+                    setup_obj.copy_ticket_keys(keys)
+                    setup_obj.reload_nginx()
+                except Exception as exc:
+                    self.logger.warn("unable to distribute TLS session ticket "
+                                     "key to {}; reason={}".format(nginx.name, exc))
+                finally:
+                    setup_obj.remove_build_dir()
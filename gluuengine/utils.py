@@ -12,13 +12,27 @@ import string
 import sys
 import tarfile
 import tempfile
+import threading
+import time
 import traceback
 import uuid
 from subprocess import Popen
 from subprocess import PIPE
 
 import requests
-from M2Crypto.EVP import Cipher
+
+# Timeout (in seconds) for requests to license server
+LICENSE_SERVER_TIMEOUT = 30
+
+# Interval (in seconds) to re-synchronize clock with license server
+CLOCK_SYNC_INTERVAL = 60 * 60
+
+# Interval (in seconds) to retry failed clock re-synchronization
+CLOCK_SYNC_RETRY_INTERVAL = 60 * 5
+
+# Offset (in milliseconds) between local clock and license server clock
+_license_clock = {"offset": None, "synced_at": 0}
+_license_clock_lock = threading.Lock()
 
 # Default charset
 _DEFAULT_CHARS = "".join([string.ascii_uppercase,
@@ -54,6 +68,8 @@ def generate_passkey():
 
 
 def encrypt_text(text, key):
+    from M2Crypto.EVP import Cipher
+
     # Porting from pyDes-based encryption (see http://git.io/htxa)
     # to use M2Crypto instead (see https://gist.github.com/mrluanma/917014)
     cipher = Cipher(alg="des_ede3_ecb", key=b"{}".format(key), op=1, iv="\0" * 16)
@@ -63,6 +79,8 @@ def encrypt_text(text, key):
 
 
 def decrypt_text(encrypted_text, key):
+    from M2Crypto.EVP import Cipher
+
     # Porting from pyDes-based encryption (see http://git.io/htpk)
     # to use M2Crypto instead (see https://gist.github.com/mrluanma/917014)
     cipher = Cipher(alg="des_ede3_ecb", key=b"{}".format(key), op=0, iv="\0" * 16)
@@ -97,7 +115,7 @@ def decode_signed_license(signed_license, public_key,
     )
 
     product = "de"
-    current_date = retrieve_current_date()
+    current_date = get_current_date()
     stdout, _, _ = po_run("java -jar {} {} {} {} {} {} {}".format(
         validator,
         signed_license,
@@ -134,6 +152,7 @@ def retrieve_signed_license(code):
             "macAddress": mac_addr,
         },
         verify=False,
+        timeout=LICENSE_SERVER_TIMEOUT,
     )
     return resp
 
@@ -211,11 +230,54 @@ def retrieve_current_date():
     """Retrieves current date from license server.
     """
     req = requests.get(
-        "https://license.gluu.org/oxLicense/rest/currentMilliseconds"
+        "https://license.gluu.org/oxLicense/rest/currentMilliseconds",
+        timeout=LICENSE_SERVER_TIMEOUT,
     )
     return req.json()
 
 
+def get_current_date():
+    """Gets current date (in milliseconds) according to license server clock.
+
+    Unlike :func:`retrieve_current_date`, the offset between local clock
+    and license server clock is cached and only re-synchronized every
+    ``CLOCK_SYNC_INTERVAL`` seconds by a single caller; other callers keep
+    using the previous offset in the meantime. If re-synchronization fails,
+    the previous offset is used and re-synchronization is retried after
+    ``CLOCK_SYNC_RETRY_INTERVAL`` seconds.
+    """
+    now = time.time()
+
+    with _license_clock_lock:
+        offset = _license_clock["offset"]
+        due = now - _license_clock["synced_at"] > CLOCK_SYNC_INTERVAL
+        if offset is not None and not due:
+            return int(now * 1000) + offset
+        if offset is not None:
+            # claim the re-synchronization, so concurrent callers
+            # won't hit the license server
+            _license_clock["synced_at"] = now
+
+    try:
+        server_date = retrieve_current_date()
+    except (requests.exceptions.RequestException, ValueError):
+        # never synchronized before
+        if offset is None:
+            raise
+        with _license_clock_lock:
+            _license_clock["synced_at"] = (
+                now - CLOCK_SYNC_INTERVAL + CLOCK_SYNC_RETRY_INTERVAL
+            )
+        return int(now * 1000) + offset
+
+    now = time.time()
+    offset = server_date - int(now * 1000)
+    with _license_clock_lock:
+        _license_clock["offset"] = offset
+        _license_clock["synced_at"] = now
+    return int(now * 1000) + offset
+
+
 def get_mac_addr():
     """Gets MAC address according to standard IEEE EUI-48 format.
     """
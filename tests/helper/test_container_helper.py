@@ -0,0 +1,10 @@
+def test_get_setup_pool(monkeypatch):
+    from gluuengine.helper import container_helper
+
+    monkeypatch.setattr(container_helper, "_setup_pool", None)
+    pool = container_helper.get_setup_pool(3)
+    try:
+        assert pool.max == 3
+        assert container_helper.get_setup_pool(3) is pool
+    finally:
+        pool.stop()
@@ -0,0 +1,83 @@
+class FakeDocker(object):
+    def __init__(self, broken=()):
+        self.broken = broken
+        self.calls = []
+
+    def stop_container(self, cid):
+        if cid in self.broken:
+            raise RuntimeError("unable to stop")
+        self.calls.append(("stop", cid))
+
+    def restart_container(self, cid):
+        if cid in self.broken:
+            raise RuntimeError("unable to restart")
+        self.calls.append(("restart", cid))
+
+
+def test_apply_action_report(app):
+    from gluuengine.helper import ContainerLifecycleHelper
+    from gluuengine.model import OxauthContainer
+
+    helper = ContainerLifecycleHelper(app)
+    fake = FakeDocker(broken=("bbb",))
+    helper._dockers["worker-node"] = fake
+    helper._swarm_config = {}
+
+    container = OxauthContainer()
+    container.name = "oxauth_a"
+    container.cid = "aaa"
+    broken = OxauthContainer()
+    broken.name = "oxauth_b"
+    broken.cid = "bbb"
+
+    changed, failed = helper._apply_action(
+        "worker-node", [container, broken], "stop",
+    )
+    assert fake.calls == [("stop", "aaa")]
+    assert [item["name"] for item in changed] == ["oxauth_a"]
+    assert [item["name"] for item in failed] == ["oxauth_b"]
+
+
+def test_disable_containers_rollback(app):
+    from gluuengine.extensions import db
+    from gluuengine.helper import ContainerLifecycleHelper
+    from gluuengine.model import Container
+    from gluuengine.model import OxauthContainer
+    from gluuengine.model import WorkerNode
+
+    with app.app_context():
+        db.create_all()
+        node = WorkerNode()
+        node.id = u"node-1"
+        node.name = "worker-node"
+        db.session.add(node)
+        for name, cid, state in [("oxauth_a", "aaa", "SUCCESS"),
+                                 ("oxauth_b", "bbb", "STOPPED"),
+                                 ("oxauth_c", "ccc", "IN_PROGRESS")]:
+            container = OxauthContainer()
+            container.name = name
+            container.cid = cid
+            container.state = state
+            container.node_id = u"node-1"
+            db.session.add(container)
+        db.session.commit()
+
+    helper = ContainerLifecycleHelper(app)
+    fake = FakeDocker(broken=("bbb",))
+    helper._dockers["worker-node"] = fake
+    helper._swarm_config = {}
+
+    try:
+        report = helper.disable_containers([node], "oxauth")
+        assert len(report["changed"]) == 2
+        assert [item["name"] for item in report["failed"]] == ["oxauth_b"]
+
+        with app.app_context():
+            states = {container.name: container.state
+                      for container in Container.query.all()}
+        assert states == {"oxauth_a": "DISABLED",
+                          "oxauth_b": "STOPPED",
+                          "oxauth_c": "DISABLED"}
+    finally:
+        with app.app_context():
+            db.drop_all()
@@ -0,0 +1,66 @@
+def test_ring_buffer_average():
+    from gluuengine.metrics import RingBuffer
+
+    buf = RingBuffer(size=5, step=60)
+    buf.add(120, 1.0)
+    buf.add(150, 3.0)
+    buf.add(180, 5.0)
+    assert buf.items() == [[120, 2.0], [180, 5.0]]
+
+
+def test_ring_buffer_wraps():
+    from gluuengine.metrics import RingBuffer
+
+    buf = RingBuffer(size=3, step=1)
+    for ts in range(10):
+        buf.add(ts, ts)
+
+    # only the latest points are kept; old values are discarded
+    assert buf.items() == [[7, 7.0], [8, 8.0], [9, 9.0]]
+    buf.add(2, 2.0)
+    assert len(buf.items()) == 3
+
+    # skipped slots are cleared
+    buf.add(11, 11.0)
+    assert buf.items() == [[9, 9.0], [11, 11.0]]
+
+
+def test_stats_series_save_load(tmpdir):
+    from gluuengine.metrics import StatsSeries
+
+    series = StatsSeries(("cpu", "memory"))
+    series.add(3600, cpu=0.5, memory=1024)
+    series.add(3601, cpu=1.5, memory=2048)
+
+    path = str(tmpdir.join("stats"))
+    series.save(path)
+    loaded = StatsSeries.load(path, ("cpu", "memory"))
+
+    assert loaded.as_dict() == series.as_dict()
+    assert loaded.as_dict("1m") == {
+        "1m": {"cpu": [[3600, 1.0]], "memory": [[3600, 1536.0]]},
+    }
+
+
+def test_collector_restores_series(app, monkeypatch, tmpdir):
+    import os
+    from gluuengine.metrics import StatsCollector
+    from gluuengine.metrics import StatsSeries
+    from gluuengine.metrics.collector import METRICS
+
+    monkeypatch.setitem(app.config, "STATS_DIR", str(tmpdir))
+    os.makedirs(os.path.join(str(tmpdir), "containers"))
+
+    series = StatsSeries(METRICS)
+    series.add(3600, cpu=1.0, memory=100)
+    series.save(os.path.join(str(tmpdir), "containers", "ctr-1"))
+
+    collector = StatsCollector(app)
+    monkeypatch.setattr(collector, "consume", lambda *args: None)
+    collector.start_stream("ctr-1", "abc", "node-1")
+
+    # history saved by previous collector is kept
+    assert collector._series["ctr-1"].as_dict("1h")["1h"]["cpu"] == [[3600, 1.0]]
+
+    # missing file starts a new series
+    assert collector.load_series("containers", "ctr-2").as_dict("1h")["1h"]["cpu"] == []
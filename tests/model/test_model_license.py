@@ -19,7 +19,7 @@ def test_non_expired_license(monkeypatch, license_key):
             return now
 
     tomorrow = now + (60 * 60 * 24 * 2 * 1000)
-    monkeypatch.setattr("requests.get", lambda url: Response())
+    monkeypatch.setattr("requests.get", lambda url, **kwargs: Response())
     license_key.metadata["expiration_date"] = tomorrow
     assert license_key.expired is False
 
@@ -35,7 +35,7 @@ def test_expired_license(monkeypatch, license_key):
             return now
 
     yesterday = now - (60 * 60 * 24 * 2 * 1000)
-    monkeypatch.setattr("requests.get", lambda url: Response())
+    monkeypatch.setattr("requests.get", lambda url, **kwargs: Response())
     license_key.metadata["expiration_date"] = yesterday
     assert license_key.expired is True
 
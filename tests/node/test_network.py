@@ -0,0 +1,78 @@
+import pytest
+
+
+def make_config(**kwargs):
+    config = {
+        "NETWORK_DRIVER": "overlay",
+        "NETWORK_SUBNET": "10.0.8.0/21",
+        "NETWORK_EDGE_SUBNET": "",
+        "NETWORK_MTU": 0,
+        "NETWORK_ENCRYPTED": False,
+        "NETWORK_DRIVER_OPTS": "",
+    }
+    config.update(kwargs)
+    return config
+
+
+def test_network_create_cmd():
+    from gluuengine.node.network import get_network_create_cmd
+
+    cmd = get_network_create_cmd(make_config(), "gluunet", "10.0.8.0/21")
+    assert cmd == ("sudo docker network inspect gluunet >/dev/null 2>&1 || "
+                   "sudo docker network create --driver=overlay "
+                   "--subnet=10.0.8.0/21 gluunet")
+
+
+def test_network_create_cmd_opts():
+    from gluuengine.node.network import get_network_create_cmd
+
+    config = make_config(NETWORK_MTU=1400, NETWORK_ENCRYPTED="true",
+                         NETWORK_DRIVER_OPTS="foo=bar, baz")
+    cmd = get_network_create_cmd(config, "gluunet", "10.0.8.0/21")
+    assert cmd.endswith("--subnet=10.0.8.0/21 --opt=encrypted "
+                        "--opt=com.docker.network.driver.mtu=1400 "
+                        "--opt=foo=bar --opt=baz gluunet")
+
+
+def test_get_networks():
+    from gluuengine.node.network import get_networks
+
+    assert get_networks(make_config()) == [("gluunet", "10.0.8.0/21")]
+    assert get_networks(make_config(NETWORK_EDGE_SUBNET="10.0.16.0/22")) == [
+        ("gluunet", "10.0.8.0/21"),
+        ("gluunet-edge", "10.0.16.0/22"),
+    ]
+
+
+@pytest.mark.parametrize("container_type, edge_subnet, networks", [
+    ("nginx", "", ["gluunet"]),
+    ("oxauth", "", ["gluunet"]),
+    ("nginx", "10.0.16.0/22", ["gluunet-edge"]),
+    ("oxauth", "10.0.16.0/22", ["gluunet-edge", "gluunet"]),
+    ("oxeleven", "10.0.16.0/22", ["gluunet"]),
+])
+def test_get_container_networks(container_type, edge_subnet, networks):
+    from gluuengine.node.network import get_container_networks
+
+    config = make_config(NETWORK_EDGE_SUBNET=edge_subnet)
+    assert get_container_networks(config, container_type) == networks
+
+
+def test_ensure_container_networks():
+    from gluuengine.node.network import ensure_container_networks
+
+    class FakeDocker(object):
+        def __init__(self):
+            self.networks = {"gluunet": "10.0.8.0/21"}
+
+        def ensure_network(self, name, driver, subnet, options=None):
+            if name in self.networks:
+                return False
+            self.networks[name] = subnet
+            return True
+
+    docker = FakeDocker()
+    config = make_config(NETWORK_EDGE_SUBNET="10.0.16.0/22")
+    assert ensure_container_networks(docker, config, "nginx") == ["gluunet-edge"]
+    assert docker.networks == {"gluunet": "10.0.8.0/21",
+                               "gluunet-edge": "10.0.16.0/22"}
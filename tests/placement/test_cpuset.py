@@ -0,0 +1,89 @@
+import pytest
+
+
+@pytest.mark.parametrize("value, cores", [
+    ("", []),
+    ("3", [3]),
+    ("0-2,5", [0, 1, 2, 5]),
+    ("4-5,1", [1, 4, 5]),
+])
+def test_parse_cpuset(value, cores):
+    from gluuengine.placement.cpuset import parse_cpuset
+    assert parse_cpuset(value) == cores
+
+
+@pytest.mark.parametrize("cores, value", [
+    ([], ""),
+    ([3], "3"),
+    ([5, 0, 1, 2], "0-2,5"),
+    ([1, 3, 4, 6], "1,3-4,6"),
+])
+def test_format_cpuset(cores, value):
+    from gluuengine.placement.cpuset import format_cpuset
+    assert format_cpuset(cores) == value
+
+
+def test_allocate_cores_contiguous():
+    from gluuengine.placement.cpuset import allocate_cores
+
+    # core 0 is reserved; 2 and 5 are used
+    assert allocate_cores(8, [2, 5], 2) == [3, 4]
+    assert allocate_cores(8, [2, 5], 3) == [1, 3, 4]
+    assert allocate_cores(8, [], 2, reserved=2) == [2, 3]
+
+
+def test_allocate_cores_exhausted():
+    from gluuengine.placement.cpuset import allocate_cores
+
+    assert allocate_cores(4, [1, 2], 2) == []
+    assert allocate_cores(4, [1, 2], 1) == [3]
+
+
+def test_get_allocations(app):
+    from gluuengine.extensions import db
+    from gluuengine.model import OxauthContainer
+    from gluuengine.placement.cpuset import CpusetAllocator
+
+    class FakeDocker(object):
+        def list_containers(self, all_=False):
+            return [{"Id": "aaaaaaaaaaaa" + "0" * 52}]
+
+    with app.app_context():
+        db.create_all()
+        for name, state, cid, cpuset in [
+            ("oxauth_disabled", "DISABLED", u"bbbbbbbbbbbb", "1"),
+            ("oxauth_failed", "FAILED", u"aaaaaaaaaaaa", "2"),
+            ("oxauth_removed", "FAILED", u"cccccccccccc", "3"),
+            ("oxauth_never_created", "FAILED", None, "4"),
+        ]:
+            container = OxauthContainer()
+            container.name = name
+            container.node_id = u"node-1"
+            container.state = state
+            container.cid = cid
+            container.container_attrs = {"cpuset": cpuset}
+            db.session.add(container)
+        db.session.commit()
+
+    try:
+        with app.app_context():
+            allocator = CpusetAllocator(app)
+            assert allocator.get_allocations(u"node-1", FakeDocker()) == {
+                "oxauth_disabled": [1],
+                "oxauth_failed": [2],
+            }
+            # without Docker, created containers keep their cores
+            assert sorted(allocator.get_allocations(u"node-1")) == [
+                "oxauth_disabled", "oxauth_failed", "oxauth_removed",
+            ]
+    finally:
+        with app.app_context():
+            db.drop_all()
+
+
+def test_count_cores(app):
+    from gluuengine.placement.cpuset import CpusetAllocator
+
+    allocator = CpusetAllocator(app)
+    assert allocator.count_cores({"cpu_quota": 150000}) == 2
+    assert allocator.count_cores({}) == app.config["CPU_PINNING_CORES"]
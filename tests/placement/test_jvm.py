@@ -0,0 +1,71 @@
+MB = 1024 ** 2
+
+
+def _option(options, prefix):
+    return [opt for opt in options if opt.startswith(prefix)][0]
+
+
+def test_jvm_options_shared_node_memory():
+    from gluuengine.placement.jvm import get_jvm_options
+
+    # 16GB node shared by 4 JVMs; 3GB budget each
+    options = get_jvm_options(16384 * MB, 8, 4)
+    assert _option(options, "-Xmx") == "-Xmx1996m"
+    assert _option(options, "-Xms") == "-Xms1996m"
+    assert "-XX:+UseParallelGC" in options
+    assert "-XX:ParallelGCThreads=2" in options
+
+
+def test_jvm_options_density_change():
+    from gluuengine.placement.jvm import get_jvm_options
+
+    single = get_jvm_options(16384 * MB, 8, 1)
+    assert _option(single, "-Xmx") == "-Xmx7987m"
+    assert "-XX:+UseG1GC" in single
+    assert "-XX:ParallelGCThreads=8" in single
+    assert single != get_jvm_options(16384 * MB, 8, 2)
+
+
+def test_jvm_options_mem_limit():
+    from gluuengine.placement.jvm import get_jvm_options
+
+    options = get_jvm_options(16384 * MB, 1, 2, mem_limit=512 * MB)
+    assert _option(options, "-Xmx") == "-Xmx332m"
+    assert _option(options, "-XX:MaxMetaspaceSize") == "-XX:MaxMetaspaceSize=128m"
+    assert "-Xss256k" in options
+    assert "-XX:+UseSerialGC" in options
+
+
+def test_jvm_options_min_heap():
+    from gluuengine.placement.jvm import get_jvm_options
+
+    options = get_jvm_options(1024 * MB, 2, 10)
+    assert _option(options, "-Xmx") == "-Xmx256m"
+
+
+def test_merge_jvm_options():
+    from gluuengine.placement.jvm import merge_jvm_options
+
+    command = ("java -jar /opt/jetty/start.jar -server -Xms256m -Xmx1024m "
+               "-XX:+UseG1GC -Dgluu.base=/etc/gluu")
+    merged = merge_jvm_options(command, ["-Xms512m", "-Xmx512m",
+                                         "-XX:+UseSerialGC"])
+    assert merged == ("java -Xms512m -Xmx512m -XX:+UseSerialGC -jar "
+                      "/opt/jetty/start.jar -server -Dgluu.base=/etc/gluu")
+
+
+def test_merge_jvm_options_previous():
+    from gluuengine.placement.jvm import merge_jvm_options
+
+    previous = ["-Xmx512m", "-XX:MaxGCPauseMillis=200"]
+    command = "/usr/bin/java -Xmx512m -XX:MaxGCPauseMillis=200 -Dfoo=bar -jar start.jar"
+    merged = merge_jvm_options(command, ["-Xmx1024m"], previous)
+    assert merged == "/usr/bin/java -Xmx1024m -Dfoo=bar -jar start.jar"
+
+
+def test_merge_jvm_options_no_java():
+    import pytest
+    from gluuengine.placement.jvm import merge_jvm_options
+
+    with pytest.raises(ValueError):
+        merge_jvm_options("/opt/jetty/bin/jetty.sh run", ["-Xmx512m"])
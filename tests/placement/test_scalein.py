@@ -0,0 +1,45 @@
+from datetime import datetime
+from datetime import timedelta
+
+
+class FakeContainer(object):
+    def __init__(self, name, node_id, age, health=""):
+        self.name = name
+        self.node_id = node_id
+        self.created_at = datetime(2017, 1, 1) - timedelta(minutes=age)
+        self.container_attrs = {"health": health} if health else {}
+
+
+def test_select_victims_most_loaded_first():
+    from gluuengine.placement import select_victims
+
+    containers = [
+        FakeContainer("a1", "a", 3),
+        FakeContainer("a2", "a", 2),
+        FakeContainer("a3", "a", 1),
+        FakeContainer("b1", "b", 2),
+        FakeContainer("b2", "b", 1),
+        FakeContainer("c1", "c", 1),
+    ]
+    victims = select_victims(containers, 4)
+    assert [c.name for c in victims] == ["a3", "a2", "b2", "a1"]
+
+
+def test_select_victims_unhealthy_first():
+    from gluuengine.placement import select_victims
+
+    containers = [
+        FakeContainer("a1", "a", 2),
+        FakeContainer("a2", "a", 1),
+        FakeContainer("b1", "b", 2, health="unhealthy"),
+    ]
+    victims = select_victims(containers, 2)
+    assert [c.name for c in victims] == ["b1", "a2"]
+
+
+def test_select_victims_more_than_available():
+    from gluuengine.placement import select_victims
+
+    containers = [FakeContainer("a1", "a", 1)]
+    assert len(select_victims(containers, 5)) == 1
+    assert select_victims([], 1) == []
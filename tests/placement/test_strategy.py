@@ -0,0 +1,119 @@
+import pytest
+
+
+class FakeNode(object):
+    def __init__(self, name):
+        self.name = name
+
+
+def make_stats(name, cpus, mem_total, mem_used=0, cpu_used=0.0, containers=0):
+    from gluuengine.placement import NodeStats
+
+    return NodeStats(FakeNode(name), cpus=cpus, mem_total=mem_total,
+                     mem_used=mem_used, cpu_used=cpu_used,
+                     containers=containers)
+
+
+def select(app, strategy, stats_list, count, mem=1):
+    from gluuengine.placement import PlacementEngine
+
+    engine = PlacementEngine(app, strategy=strategy)
+    engine.container_mem = mem
+    return [node.name for node in engine.select(stats_list, count)]
+
+
+def test_spread_strategy(app):
+    stats_list = [
+        make_stats("small", 2, 4, containers=1),
+        make_stats("big", 8, 16, containers=1),
+    ]
+    selected = select(app, "spread", stats_list, 4)
+    assert selected == ["big", "small", "big", "small"]
+
+
+def test_binpack_strategy(app):
+    stats_list = [
+        make_stats("small", 2, 4, mem_used=2),
+        make_stats("big", 8, 16),
+    ]
+    selected = select(app, "binpack", stats_list, 3)
+
+    # small node is filled up before using the big one
+    assert selected == ["small", "small", "big"]
+
+
+def test_least_loaded_strategy(app):
+    stats_list = [
+        make_stats("busy", 2, 16, cpu_used=1.8),
+        make_stats("idle", 8, 16, cpu_used=0.8),
+    ]
+    assert select(app, "least-loaded", stats_list, 1) == ["idle"]
+
+
+def test_select_overcommit(app):
+    stats_list = [
+        make_stats("small", 2, 4, mem_used=4),
+        make_stats("big", 8, 16, mem_used=16),
+    ]
+
+    # none has enough memory, yet containers are still placed
+    selected = select(app, "spread", stats_list, 2)
+    assert selected == ["small", "big"]
+
+
+def test_select_no_nodes(app):
+    assert select(app, "spread", [], 2) == []
+
+
+def test_collected_usage(app, monkeypatch, tmpdir):
+    import os
+    import time
+    from gluuengine.metrics import StatsSeries
+    from gluuengine.metrics.collector import METRICS
+    from gluuengine.placement import PlacementEngine
+
+    monkeypatch.setitem(app.config, "STATS_DIR", str(tmpdir))
+    os.makedirs(os.path.join(str(tmpdir), "nodes"))
+    engine = PlacementEngine(app, strategy="spread")
+
+    # stats are unavailable
+    assert engine.get_collected_usage(FakeNode("node-1")) is None
+
+    series = StatsSeries(METRICS)
+    series.add(time.time(), cpu=1.5, memory=1024)
+    series.save(os.path.join(str(tmpdir), "nodes", "node-1"))
+    assert engine.get_collected_usage(FakeNode("node-1")) == (1.5, 1024)
+
+    # stats are outdated
+    series = StatsSeries(METRICS)
+    series.add(time.time() - 120, cpu=1.5, memory=1024)
+    series.save(os.path.join(str(tmpdir), "nodes", "node-1"))
+    assert engine.get_collected_usage(FakeNode("node-1")) is None
+
+
+def test_get_strategy():
+    from gluuengine.placement import get_strategy
+    from gluuengine.placement import SpreadStrategy
+
+    assert isinstance(get_strategy("spread"), SpreadStrategy)
+    with pytest.raises(ValueError):
+        get_strategy("random")
+
+
+def test_stats_usage():
+    from gluuengine.placement.stats import get_cpu_used
+    from gluuengine.placement.stats import get_mem_used
+
+    stats = {
+        "cpu_stats": {
+            "cpu_usage": {"total_usage": 300, "percpu_usage": [1, 1]},
+            "system_cpu_usage": 1000,
+        },
+        "precpu_stats": {
+            "cpu_usage": {"total_usage": 100},
+            "system_cpu_usage": 600,
+        },
+        "memory_stats": {"usage": 500, "stats": {"cache": 100}},
+    }
+    assert get_cpu_used(stats) == 1.0
+    assert get_mem_used(stats) == 400
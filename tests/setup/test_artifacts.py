@@ -0,0 +1,54 @@
+def test_make_bundle():
+    import io
+    import tarfile
+    from gluuengine.setup.artifacts import make_bundle
+
+    bundle = make_bundle({"salt": u"encodeSalt = abc"})
+    with tarfile.open(mode="r", fileobj=io.BytesIO(bundle)) as tf:
+        assert tf.getnames() == ["salt"]
+        assert tf.extractfile("salt").read() == "encodeSalt = abc"
+
+    # same files produce the same archive
+    assert make_bundle({"salt": u"encodeSalt = abc"}) == bundle
+
+
+def test_make_bundle_modes():
+    import io
+    import tarfile
+    from gluuengine.setup.artifacts import make_bundle
+
+    bundle = make_bundle({"a.crt": "cert", "a.key": "key"},
+                         modes={"a.key": 0o600})
+    with tarfile.open(mode="r", fileobj=io.BytesIO(bundle)) as tf:
+        assert tf.getmember("a.crt").mode == 0o644
+        assert tf.getmember("a.key").mode == 0o600
+
+def test_get_bundle_cached():
+    from gluuengine.setup.artifacts import ArtifactCache
+
+    cache = ArtifactCache()
+    calls = []
+
+    def render(ctx):
+        calls.append(ctx)
+        return {"salt": ctx["salt"]}
+
+    bundle = cache.get_bundle("salt", {"salt": "abc"}, render)
+    assert cache.get_bundle("salt", {"salt": "abc"}, render) == bundle
+    assert len(calls) == 1
+
+    # different context renders new bundle
+    assert cache.get_bundle("salt", {"salt": "xyz"}, render) != bundle
+    assert len(calls) == 2
+
+
+def test_get_bundle_evicted():
+    from gluuengine.setup.artifacts import ArtifactCache
+
+    cache = ArtifactCache(size=2)
+    for salt in ["a", "b", "c"]:
+        cache.get_bundle("salt", {"salt": salt}, lambda ctx: {"salt": ctx["salt"]})
+    assert len(cache) == 2
+
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,29 @@
+from distutils.spawn import find_executable
+
+import pytest
+
+
+@pytest.mark.skipif(not find_executable("openssl"), reason="openssl is not installed")
+def test_generate_cert():
+    from gluuengine.setup.certgen import generate_cert
+
+    files = generate_cert("nginx", "secret", "/C=US/O=Gluu Inc/CN=localhost")
+    assert sorted(files) == ["nginx.crt", "nginx.csr", "nginx.key", "nginx.key.orig"]
+    assert files["nginx.crt"].startswith("-----BEGIN CERTIFICATE-----")
+
+
+@pytest.mark.skipif(not find_executable("openssl"), reason="openssl is not installed")
+def test_generate_cert_existing_key():
+    from gluuengine.setup.certgen import generate_cert
+
+    key = generate_cert("nginx", "secret", "/CN=localhost")["nginx.key"]
+    files = generate_cert("web", "secret", "/CN=localhost", key=key)
+    assert files["web.key"] == key
+
+
+def test_generate_cert_error(monkeypatch):
+    from gluuengine.setup.certgen import generate_cert
+
+    monkeypatch.setenv("PATH", "")
+    with pytest.raises(RuntimeError):
+        generate_cert("nginx", "secret", "/CN=localhost")
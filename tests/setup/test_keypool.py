@@ -0,0 +1,37 @@
+from distutils.spawn import find_executable
+
+import pytest
+
+
+@pytest.mark.skipif(not find_executable("openssl"), reason="openssl is not installed")
+def test_refill_and_claim_key(tmpdir):
+    from gluuengine.setup.keypool import KeyPool
+
+    pool = KeyPool(str(tmpdir), 2)
+
+    # skip the slow DH parameters generation
+    tmpdir.join("dhparams.pem").write("dhparams")
+
+    pool.refill()
+    assert pool.count() == 2
+
+    key = pool.claim_key()
+    assert key.startswith("-----BEGIN")
+    assert pool.count() == 1
+
+
+def test_claim_key_empty(tmpdir):
+    from gluuengine.setup.keypool import KeyPool
+
+    pool = KeyPool(str(tmpdir), 2)
+    assert pool.claim_key() is None
+
+
+def test_get_dhparams(tmpdir):
+    from gluuengine.setup.keypool import KeyPool
+
+    pool = KeyPool(str(tmpdir), 2)
+    assert pool.get_dhparams() is None
+
+    tmpdir.join("dhparams.pem").write("dhparams")
+    assert pool.get_dhparams() == "dhparams"
@@ -33,3 +33,75 @@ def test_teardown(nginx_setup, nginx_node, provider):
     provider.type = "master"
     nginx_setup.provider = provider
     nginx_setup.teardown()
+
+
+class FakeNginxSetting(object):
+    proxy_cache = True
+    cache_ttl = 60
+    cache_inactive = 600
+    cache_max_size = 100
+    cache_keys_zone = 10
+    stale_while_revalidate = True
+    serve_static = True
+    static_ttl = 3600
+
+
+def test_nginx_setting_ctx_missing():
+    from gluuengine.setup.nginx_setup import get_nginx_setting_ctx
+
+    ctx = get_nginx_setting_ctx(None)
+    assert ctx["proxy_cache"] is None
+    assert ctx["serve_static"] is False
+
+
+def test_render_https_conf_proxy_cache(app):
+    from gluuengine.setup.nginx_setup import TICKET_KEY_FILES
+    from gluuengine.setup.nginx_setup import get_nginx_setting_ctx
+    from gluuengine.setup.nginx_setup import get_tls_ctx
+    from gluuengine.setup.templates import TemplateRegistry
+
+    ctx = {
+        "ox_cluster_hostname": "ox.example.com",
+        "cert_file": "/etc/certs/nginx.crt",
+        "key_file": "/etc/certs/nginx.key",
+        "oxauth_containers": ["oxauth"],
+        "oxtrust_containers": [],
+    }
+    ctx.update(get_nginx_setting_ctx(FakeNginxSetting()))
+    ctx["tls"] = get_tls_ctx(FakeNginxSetting())
+    ctx["tls"]["ticket_keys"] = TICKET_KEY_FILES
+
+    registry = TemplateRegistry(app.config["TEMPLATES_DIR"])
+    rendered = registry.render("nginx/gluu_https.conf", ctx)
+    assert "keys_zone=gluu_discovery:10m max_size=100m inactive=600s" in rendered
+    assert "proxy_cache_valid 200 60s;" in rendered
+    assert "proxy_cache_background_update on;" in rendered
+    assert "try_files $uri @oxauth_backend;" in rendered
+    assert "listen 443 ssl http2;" in rendered
+    assert "ssl_session_ticket_key /etc/certs/ticket_previous.key;" in rendered
+    assert "ssl_stapling" not in rendered
+
+
+def test_tls_ctx_defaults():
+    from gluuengine.setup.nginx_setup import get_tls_ctx
+
+    nginx_setting = FakeNginxSetting()
+    nginx_setting.http2 = False
+    nginx_setting.ssl_session_cache = None
+
+    ctx = get_tls_ctx(nginx_setting)
+    assert ctx["http2"] is False
+    assert ctx["ssl_session_cache"] == 10
+    assert get_tls_ctx(None)["worker_connections"] == 4096
+
+
+@pytest.mark.parametrize("cpus, container_attrs, workers", [
+    (8, None, 8),
+    (8, {"cpuset": "2-3"}, 2),
+    (8, {"resources": {"cpu_quota": 150000}}, 2),
+    (1, {"resources": {"cpu_quota": 400000}}, 1),
+    (0, {}, 1),
+])
+def test_worker_processes(cpus, container_attrs, workers):
+    from gluuengine.setup.nginx_setup import get_worker_processes
+    assert get_worker_processes(cpus, container_attrs) == workers
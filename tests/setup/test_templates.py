@@ -0,0 +1,42 @@
+def test_registry_render(tmpdir):
+    from gluuengine.setup.templates import TemplateRegistry
+
+    tmpdir.join("hello.txt").write("hello {{ name }}")
+    registry = TemplateRegistry(str(tmpdir))
+    assert registry.render("hello.txt", {"name": "johndoe"}) == "hello johndoe"
+
+
+def test_registry_render_text(tmpdir):
+    from gluuengine.setup.templates import TemplateRegistry
+
+    src = tmpdir.join("hello.txt")
+    src.write("hello %(name)s")
+    registry = TemplateRegistry(str(tmpdir))
+    assert registry.render_text(str(src), {"name": "johndoe"}) == "hello johndoe"
+
+    # content is cached, hence changes to the file are not picked up
+    src.write("bye %(name)s")
+    assert registry.render_text(str(src), {"name": "johndoe"}) == "hello johndoe"
+
+
+def test_registry_bytecode_cache(tmpdir):
+    from gluuengine.setup.templates import TemplateRegistry
+
+    template_dir = tmpdir.mkdir("templates")
+    template_dir.join("hello.txt").write("hello {{ name }}")
+    cache_dir = tmpdir.join("cache")
+
+    TemplateRegistry(str(template_dir), str(cache_dir)).precompile()
+    assert len(cache_dir.listdir()) == 1
+
+    # other registry (e.g. in other process) loads the cached bytecode
+    registry = TemplateRegistry(str(template_dir), str(cache_dir))
+    assert registry.render("hello.txt", {"name": "johndoe"}) == "hello johndoe"
+
+
+def test_precompile_package_templates(app):
+    from gluuengine.setup.templates import TemplateRegistry
+
+    registry = TemplateRegistry(app.config["TEMPLATES_DIR"])
+    registry.precompile()
+    assert registry.get_template("nginx/gluu_https.conf")
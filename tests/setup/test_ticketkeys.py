@@ -0,0 +1,26 @@
+def test_get_keys_generates_key(tmpdir):
+    from gluuengine.setup.ticketkeys import TicketKeyStore
+    from gluuengine.setup.ticketkeys import TICKET_KEY_SIZE
+
+    store = TicketKeyStore(str(tmpdir.join("ticket_keys")))
+    assert store.get_age() is None
+
+    current, previous = store.get_keys()
+    assert len(current) == TICKET_KEY_SIZE
+    # key has never been rotated
+    assert previous == current
+    assert store.get_keys() == [current, current]
+
+
+def test_rotate(tmpdir):
+    from gluuengine.setup.ticketkeys import TicketKeyStore
+
+    store = TicketKeyStore(str(tmpdir))
+    old, _ = store.get_keys()
+
+    current, previous = store.rotate()
+    assert previous == old
+    assert current != old
+    assert store.get_keys() == [current, previous]
+    assert store.get_age() < 60
+    assert not [fn for fn in tmpdir.listdir() if fn.ext == ".tmp"]
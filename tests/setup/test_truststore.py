@@ -0,0 +1,50 @@
+def test_truststore_digest_stable():
+    from gluuengine.setup.truststore import get_truststore_digest
+
+    certs = {"gluu-nginx": "nginx-cert", "gluu-ldap-ldap.local": "ldap-cert"}
+    digest = get_truststore_digest("base", certs)
+
+    # order of certificates doesn't matter
+    reordered = dict(reversed(list(certs.items())))
+    assert get_truststore_digest("base", reordered) == digest
+
+
+def test_truststore_digest_changed():
+    from gluuengine.setup.truststore import get_truststore_digest
+
+    digest = get_truststore_digest("base", {"gluu-nginx": "nginx-cert"})
+    assert get_truststore_digest("base", {"gluu-nginx": "new-cert"}) != digest
+    assert get_truststore_digest("new-base", {"gluu-nginx": "nginx-cert"}) != digest
+
+
+def test_get_ldap_cert_fallback(app, monkeypatch, tmpdir):
+    import pytest
+    from gluuengine.errors import DockerExecError
+    from gluuengine.model import OxauthContainer
+    from gluuengine.setup.truststore import TruststoreManager
+
+    class FakeDocker(object):
+        def __init__(self, retval):
+            self.retval = retval
+
+        def exec_cmd(self, container, cmd):
+            if self.retval is None:
+                raise DockerExecError("error while running docker exec", "", 1)
+            return type("Result", (object,), {"retval": self.retval})
+
+    container = OxauthContainer()
+    container.cid = "aaa"
+    manager = TruststoreManager(app)
+    manager.store_dir = str(tmpdir)
+
+    # LDAP is unreachable and no certificate was retrieved before
+    monkeypatch.setattr(manager, "get_docker", lambda c: FakeDocker(None))
+    with pytest.raises(RuntimeError):
+        manager.get_ldap_cert(container, "ldap.local", 1636)
+
+    monkeypatch.setattr(manager, "get_docker", lambda c: FakeDocker("ldap-cert"))
+    assert manager.get_ldap_cert(container, "ldap.local", 1636) == "ldap-cert\n"
+
+    # last retrieved certificate is used when LDAP is unreachable
+    monkeypatch.setattr(manager, "get_docker", lambda c: FakeDocker(None))
+    assert manager.get_ldap_cert(container, "ldap.local", 1636) == "ldap-cert\n"
@@ -0,0 +1,58 @@
+STUB_STATUS = """Active connections: 291
+server accepts handled requests
+ 16630948 16630948 31070465
+Reading: 6 Writing: 179 Waiting: 106
+"""
+
+
+def test_parse_stub_status():
+    from gluuengine.task.autoscaler import parse_stub_status
+
+    status = parse_stub_status(STUB_STATUS)
+    assert status["active"] == 291
+    assert status["requests"] == 31070465
+    assert status["waiting"] == 106
+    assert parse_stub_status("curl: not found") == {}
+
+
+def test_desired_replicas_highest_proposal():
+    from gluuengine.task.autoscaler import get_desired_replicas
+
+    desired, proposals = get_desired_replicas(
+        4, {"cpu": 1.4, "memory": 0.4, "rps": None},
+        {"cpu": 0.7, "memory": 0.8, "rps": 50}, 1, 10,
+    )
+    assert desired == 8
+    assert proposals == {"cpu": 8, "memory": 2}
+
+
+def test_desired_replicas_bounded():
+    from gluuengine.task.autoscaler import get_desired_replicas
+
+    targets = {"cpu": 0.5}
+    assert get_desired_replicas(4, {"cpu": 5.0}, targets, 1, 10)[0] == 10
+    assert get_desired_replicas(4, {"cpu": 0.01}, targets, 2, 10)[0] == 2
+
+
+def test_desired_replicas_within_tolerance():
+    from gluuengine.task.autoscaler import get_desired_replicas
+
+    desired, _ = get_desired_replicas(4, {"cpu": 0.73}, {"cpu": 0.7}, 1, 10)
+    assert desired == 4
+
+
+def test_restore_status(app, monkeypatch, tmpdir):
+    import json
+    from gluuengine.task.autoscaler import Autoscaler
+    from gluuengine.task.autoscaler import get_status_file
+
+    monkeypatch.setitem(app.config, "DATA_DIR", str(tmpdir))
+    autoscaler = Autoscaler(app)
+
+    # other process has scaled the deployment after this object is created
+    with open(get_status_file(app), "w") as fp:
+        fp.write(json.dumps({"last_scale_out_at": 100}))
+
+    autoscaler.restore_status()
+    assert autoscaler.status["last_scale_out_at"] == 100
+    assert autoscaler.status["last_scale_in_at"] == 0
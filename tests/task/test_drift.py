@@ -0,0 +1,173 @@
+class FakeContainer(object):
+    def __init__(self, name, cid, state="SUCCESS", node_id="node-1"):
+        self.id = name
+        self.name = name
+        self.cid = cid
+        self.state = state
+        self.node_id = node_id
+        self.type = "oxauth"
+        self.image = "oxauth"
+
+
+def docker_container(cid, name, state="running", image="gluufederation/oxauth:latest"):
+    return {
+        "Id": cid + "0" * 52,
+        "Names": ["/" + name],
+        "Image": image,
+        "State": state,
+        "Status": "",
+    }
+
+
+def test_classify_drift():
+    from gluuengine.task.drift import classify_drift
+
+    containers = [
+        FakeContainer("ok", "aaaaaaaaaaaa"),
+        FakeContainer("missing", "bbbbbbbbbbbb"),
+        FakeContainer("stopped", "cccccccccccc"),
+        FakeContainer("old", "dddddddddddd"),
+        FakeContainer("disabled", "eeeeeeeeeeee", state="DISABLED"),
+        FakeContainer("unreachable", "ffffffffffff", node_id="node-2"),
+    ]
+    listings = {"node-1": [
+        docker_container("aaaaaaaaaaaa", "ok"),
+        docker_container("cccccccccccc", "stopped", state="exited"),
+        docker_container("dddddddddddd", "old", image="gluufederation/oxauth:3.0.0"),
+        docker_container("eeeeeeeeeeee", "disabled", state="exited"),
+        docker_container("111111111111", "orphan"),
+        docker_container("222222222222", "registrator", image="gliderlabs/registrator"),
+    ]}
+
+    drift = classify_drift(containers, listings, "latest")
+    assert [e["name"] for e in drift["missing"]] == ["missing"]
+    assert [e["name"] for e in drift["stopped"]] == ["stopped"]
+    assert [e["name"] for e in drift["image_mismatch"]] == ["old"]
+    assert [e["name"] for e in drift["orphaned"]] == ["orphan"]
+
+
+def test_classify_drift_by_name():
+    from gluuengine.task.drift import classify_drift
+
+    # container created, but its cid is not saved yet
+    containers = [FakeContainer("new", None, state="IN_PROGRESS")]
+    listings = {"node-1": [docker_container("aaaaaaaaaaaa", "new")]}
+
+    drift = classify_drift(containers, listings, "latest")
+    assert not any(drift.values())
+
+
+def test_check_container_deployed_during_listing(app, monkeypatch, tmpdir):
+    from gluuengine.extensions import db
+    from gluuengine.model import Container
+    from gluuengine.model import MasterNode
+    from gluuengine.model import OxauthContainer
+    from gluuengine.task.drift import DriftReconciler
+
+    monkeypatch.setitem(app.config, "DATA_DIR", str(tmpdir))
+
+    with app.app_context():
+        db.create_all()
+        node = MasterNode()
+        node.id = u"node-1"
+        node.name = u"gluu.master"
+        db.session.add(node)
+
+        container = OxauthContainer()
+        container.id = u"oxauth-1"
+        container.name = u"oxauth_1"
+        container.node_id = node.id
+        container.state = "IN_PROGRESS"
+        db.session.add(container)
+        db.session.commit()
+
+    def list_docker_containers(nodes):
+        # container finishes its setup after Docker listing is taken
+        Container.query.filter_by(id=u"oxauth-1").update(
+            {"state": "SUCCESS", "cid": u"aaaaaaaaaaaa"},
+            synchronize_session=False,
+        )
+        db.session.commit()
+        return {u"node-1": []}, []
+
+    try:
+        reconciler = DriftReconciler(app)
+        monkeypatch.setattr(reconciler, "list_docker_containers",
+                            list_docker_containers)
+        report = reconciler.check(autofix=True)
+        assert report["drift"]["missing"] == []
+
+        with app.app_context():
+            assert Container.query.get(u"oxauth-1").state == "SUCCESS"
+    finally:
+        with app.app_context():
+            db.drop_all()
+
+
+def test_list_docker_containers_unreachable(app):
+    from gluuengine.task.drift import DriftReconciler
+
+    class FakeNode(object):
+        def __init__(self, id_, name):
+            self.id = id_
+            self.name = name
+
+    class FakeDocker(object):
+        def list_containers(self, all_=False):
+            return [docker_container("aaaaaaaaaaaa", "ok")]
+
+    def get_docker(name):
+        if name == "gluu.worker.1":
+            raise RuntimeError("host is not running")
+        return FakeDocker()
+
+    reconciler = DriftReconciler(app)
+    reconciler.lifecycle.get_docker = get_docker
+
+    listings, unreachable = reconciler.list_docker_containers([
+        FakeNode(u"node-1", "gluu.master"),
+        FakeNode(u"node-2", "gluu.worker.1"),
+    ])
+    assert list(listings) == [u"node-1"]
+    assert unreachable == ["gluu.worker.1"]
+
+
+def test_fix_skips_registered_orphan(app):
+    from gluuengine.extensions import db
+    from gluuengine.model import OxauthContainer
+    from gluuengine.task.drift import DriftReconciler
+
+    removed = []
+
+    class FakeDocker(object):
+        def remove_container(self, cid):
+            removed.append(cid)
+
+    with app.app_context():
+        db.create_all()
+        # saved after drift check read the database
+        container = OxauthContainer()
+        container.name = u"oxauth_new"
+        container.state = "IN_PROGRESS"
+        db.session.add(container)
+        db.session.commit()
+
+    try:
+        reconciler = DriftReconciler(app)
+        reconciler.lifecycle.get_docker = lambda name: FakeDocker()
+        drift = {
+            "missing": [],
+            "stopped": [],
+            "image_mismatch": [],
+            "orphaned": [
+                {"cid": "aaaaaaaaaaaa", "name": "oxauth_new", "node_id": u"node-1"},
+                {"cid": "bbbbbbbbbbbb", "name": "oxauth_old", "node_id": u"node-1"},
+            ],
+        }
+        with app.app_context():
+            fixed = reconciler.fix(drift, {u"node-1": "gluu.master"})
+        assert removed == ["bbbbbbbbbbbb"]
+        assert fixed == [{"name": "oxauth_old", "action": "remove"}]
+    finally:
+        with app.app_context():
+            db.drop_all()
@@ -0,0 +1,93 @@
+def test_state_transition():
+    from gluuengine.task.eventwatcher import get_state_transition
+
+    assert get_state_transition("die", "SUCCESS") == "STOPPED"
+    assert get_state_transition("start", "STOPPED") == "SUCCESS"
+    assert get_state_transition("destroy", "STOPPED") == "FAILED"
+
+
+def test_state_transition_ignored():
+    from gluuengine.task.eventwatcher import get_state_transition
+
+    # containers stopped by engine (e.g. disabled by license) are untouched
+    assert get_state_transition("die", "DISABLED") is None
+    assert get_state_transition("start", "DISABLED") is None
+    assert get_state_transition("exec_start", "SUCCESS") is None
+
+
+def make_event(action, time_, cid="aaaaaaaaaaaa", name="oxauth_1"):
+    return {
+        "id": cid + "0" * 52,
+        "Action": action,
+        "time": time_,
+        "timeNano": time_ * 10 ** 9,
+        "Actor": {"Attributes": {"name": name}},
+    }
+
+
+def test_handle_event_replay(app, monkeypatch, tmpdir):
+    from gluuengine.task.eventwatcher import DockerEventWatcher
+
+    monkeypatch.setitem(app.config, "DATA_DIR", str(tmpdir))
+    updates = []
+
+    watcher = DockerEventWatcher(app)
+    monkeypatch.setattr(
+        watcher, "update_container",
+        lambda docker_id, name, action, event_time: updates.append((action, event_time)),
+    )
+
+    # events of the cursor's second are replayed after reconnecting
+    for event in [make_event("die", 100),
+                  make_event("health_status: healthy", 100),
+                  make_event("die", 100),
+                  make_event("exec_start", 101)]:
+        watcher.handle_event(event)
+
+    assert updates == [("die", 100), ("health_status: healthy", 100)]
+    assert watcher.cursor == 101
+
+    # stream is resumed from the saved cursor
+    assert DockerEventWatcher(app).cursor == 101
+
+
+def test_update_container(app, monkeypatch, tmpdir):
+    from gluuengine.extensions import db
+    from gluuengine.model import Container
+    from gluuengine.model import OxauthContainer
+    from gluuengine.task.eventwatcher import DockerEventWatcher
+
+    monkeypatch.setitem(app.config, "DATA_DIR", str(tmpdir))
+
+    with app.app_context():
+        db.create_all()
+        container = OxauthContainer()
+        container.id = u"oxauth-1"
+        container.name = u"oxauth_1"
+        container.cid = u"aaaaaaaaaaaa"
+        container.state = "SUCCESS"
+        db.session.add(container)
+        db.session.commit()
+
+    try:
+        watcher = DockerEventWatcher(app)
+        topology_changes = []
+        monkeypatch.setattr(watcher, "schedule_topology_change",
+                            lambda: topology_changes.append(True))
+
+        # swarm prefixes the name with node name
+        watcher.handle_event(make_event("die", 100, name="gluu.worker.1/oxauth_1"))
+        watcher.handle_event(make_event("die", 100, name="gluu.worker.1/oxauth_1"))
+        # another die event (e.g. replayed by a restarted engine)
+        # doesn't change the state
+        watcher.handle_event(make_event("die", 101))
+
+        with app.app_context():
+            container = Container.query.get(u"oxauth-1")
+            assert container.state == "STOPPED"
+            assert container.container_attrs["last_event"] == "die"
+            assert container.container_attrs["last_event_at"] == 100
+        assert topology_changes == [True]
+    finally:
+        with app.app_context():
+            db.drop_all()
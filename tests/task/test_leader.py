@@ -0,0 +1,33 @@
+def test_leader_lock_single_owner(tmpdir):
+    from gluuengine.task.leader import LeaderLock
+
+    path = str(tmpdir.join("task.lock"))
+    first = LeaderLock(path)
+    second = LeaderLock(path)
+
+    assert first.acquire() is True
+    assert second.acquire() is False
+    assert first.acquired is True
+    assert second.acquired is False
+
+
+def test_leader_lock_takeover(tmpdir):
+    from gluuengine.task.leader import LeaderLock
+
+    path = str(tmpdir.join("task.lock"))
+    first = LeaderLock(path)
+    second = LeaderLock(path)
+
+    first.acquire()
+    first.release()
+    assert second.acquire() is True
+
+
+def test_leader_lock_reentrant(tmpdir):
+    from gluuengine.task.leader import LeaderLock
+
+    lock = LeaderLock(str(tmpdir.join("task.lock")))
+    assert lock.acquire() is True
+    assert lock.acquire() is True
+    lock.release()
+    assert lock.acquired is False
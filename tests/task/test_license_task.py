@@ -77,3 +77,21 @@ def test_enable_nodes(db, license_key, provider, app,
         let = LicenseExpirationTask(app)
         let.monitor_license()
         assert db.get(oxauth_node.id, "nodes").state == "SUCCESS"
+
+
+@pytest.mark.parametrize("attempt", [0, 1, 2, 3, 10])
+def test_get_retry_delay(attempt):
+    from gluuengine.task.licensewatcher import get_retry_delay
+
+    delay = get_retry_delay(attempt, base=10, cap=60)
+    expected = min(60, 10 * (2 ** attempt))
+    assert expected / 2.0 <= delay <= expected
+
+
+def test_read_status_missing(tmpdir):
+    from gluuengine.task.licensewatcher import read_status
+
+    class FakeApp(object):
+        config = {"DATA_DIR": str(tmpdir)}
+
+    assert read_status(FakeApp()) == {}
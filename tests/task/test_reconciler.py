@@ -0,0 +1,64 @@
+def test_compute_diff_scale_out():
+    from gluuengine.task.reconciler import compute_diff
+
+    diff = compute_diff(40, {"SUCCESS": 10, "IN_PROGRESS": 5}, 5)
+    assert diff == {"remove_failed": 0, "scale_out": 5, "scale_in": 0}
+
+
+def test_compute_diff_replace_failed():
+    from gluuengine.task.reconciler import compute_diff
+
+    diff = compute_diff(3, {"SUCCESS": 2, "FAILED": 1}, 5)
+    assert diff == {"remove_failed": 1, "scale_out": 1, "scale_in": 0}
+
+
+def test_compute_diff_scale_in():
+    from gluuengine.task.reconciler import compute_diff
+
+    # containers being deployed are not removed
+    diff = compute_diff(1, {"SUCCESS": 2, "IN_PROGRESS": 3}, 5)
+    assert diff == {"remove_failed": 0, "scale_out": 0, "scale_in": 2}
+
+
+def test_compute_diff_converged():
+    from gluuengine.task.reconciler import compute_diff
+
+    diff = compute_diff(2, {"SUCCESS": 2, "DISABLED": 1}, 5)
+    assert not any(diff.values())
+
+    # stopped container is restarted by Docker instead of replaced
+    diff = compute_diff(2, {"SUCCESS": 1, "STOPPED": 1}, 5)
+    assert not any(diff.values())
+
+
+def test_fail_stale_containers(app):
+    from datetime import datetime
+    from datetime import timedelta
+    from gluuengine.extensions import db
+    from gluuengine.model import Container
+    from gluuengine.model import OxauthContainer
+    from gluuengine.task.reconciler import DeploymentReconciler
+
+    with app.app_context():
+        db.create_all()
+        for name, age in [("oxauth_stale", 7200), ("oxauth_new", 60)]:
+            container = OxauthContainer()
+            container.name = name
+            container.state = "IN_PROGRESS"
+            container.created_at = datetime.utcnow() - timedelta(seconds=age)
+            db.session.add(container)
+        db.session.commit()
+
+    try:
+        with app.app_context():
+            reconciler = DeploymentReconciler(app)
+            reconciler.setup_timeout = 1800
+            assert reconciler.fail_stale_containers("oxauth") == 1
+
+            states = {container.name: container.state
+                      for container in Container.query.all()}
+        assert states == {"oxauth_stale": "FAILED",
+                          "oxauth_new": "IN_PROGRESS"}
+    finally:
+        with app.app_context():
+            db.drop_all()
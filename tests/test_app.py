@@ -21,3 +21,37 @@ def test_create_app():
     os.environ["API_ENV"] = "test"
     app = create_app()
     assert hasattr(app, "config")
+
+
+def test_import_app_is_lightweight():
+    import subprocess
+    import sys
+
+    code = "; ".join([
+        "import sys",
+        "import gluuengine.app",
+        "heavy = ['docker', 'gluuengine.helper', 'gluuengine.resource.node']",
+        "print(','.join(m for m in heavy if m in sys.modules))",
+    ])
+    output = subprocess.check_output([sys.executable, "-c", code])
+    assert output.strip() == ""
+
+
+def test_create_app_twice():
+    import os
+    from gluuengine.app import create_app
+
+    os.environ["API_ENV"] = "test"
+    app1 = create_app()
+    app2 = create_app()
+    assert app1.url_map is not app2.url_map
+    assert "create_node" in app2.view_functions
+
+
+def test_resource_methods(app):
+    for rule in app.url_map.iter_rules():
+        view_func = app.view_functions[rule.endpoint]
+        view_class = getattr(view_func, "view_class", None)
+        if view_class is None:
+            continue
+        assert set(view_class.methods) <= rule.methods
@@ -108,3 +108,116 @@ def test_swarm_conf_str(dockerclient):
 @pytest.mark.skip(reason="implement me")
 def test_exec_cmd(dockerclient):
     pass
+
+
+def test_container_op_routed_to_node(monkeypatch):
+    from gluuengine.dockerclient import Docker
+
+    base_urls = []
+
+    def inspect_container(cls, container):
+        base_urls.append(cls.base_url)
+        return {}
+
+    monkeypatch.setattr("docker.Client.inspect_container", inspect_container)
+
+    client = Docker({"base_url": "http://10.10.10.11:2375"},
+                    {"base_url": "http://10.10.10.10:3375"})
+    client.inspect_container("oxauth")
+    assert base_urls == ["http://10.10.10.11:2375"]
+
+
+def test_container_op_swarm_fallback(monkeypatch):
+    from requests.exceptions import ConnectionError
+    from requests.packages.urllib3.exceptions import MaxRetryError
+    from requests.packages.urllib3.exceptions import NewConnectionError
+    from gluuengine.dockerclient import Docker
+
+    base_urls = []
+
+    def inspect_container(cls, container):
+        base_urls.append(cls.base_url)
+        if cls.base_url.endswith(":2375"):
+            reason = NewConnectionError(None, "Connection refused")
+            raise ConnectionError(MaxRetryError(None, "/containers", reason))
+        return {}
+
+    monkeypatch.setattr("docker.Client.inspect_container", inspect_container)
+
+    client = Docker({"base_url": "http://10.10.10.11:2375"},
+                    {"base_url": "http://10.10.10.10:3375"})
+    client.inspect_container("oxauth")
+    assert base_urls == ["http://10.10.10.11:2375", "http://10.10.10.10:3375"]
+
+
+def test_container_op_no_fallback_after_sent(monkeypatch):
+    import pytest
+    from requests.exceptions import ConnectionError
+    from gluuengine.dockerclient import Docker
+
+    base_urls = []
+
+    def exec_create(cls, container, cmd):
+        return {"Id": "abc"}
+
+    def exec_start(cls, exec_id):
+        # connection is dropped while the command is running
+        base_urls.append(cls.base_url)
+        raise ConnectionError("Connection aborted")
+
+    monkeypatch.setattr("docker.Client.exec_create", exec_create)
+    monkeypatch.setattr("docker.Client.exec_start", exec_start)
+
+    client = Docker({"base_url": "http://10.10.10.11:2375"},
+                    {"base_url": "http://10.10.10.10:3375"})
+    with pytest.raises(ConnectionError):
+        client.exec_cmd("oxauth", "supervisorctl restart jetty")
+    assert base_urls == ["http://10.10.10.11:2375"]
+
+
+def test_get_resource_config():
+    from gluuengine.dockerclient._docker import get_resource_config
+
+    config = get_resource_config(
+        {"mem_limit": 1073741824, "cpu_quota": 50000, "nofile": 65536,
+         "cpu_shares": None},
+        [{"name": "nofile", "soft": 1024, "hard": 4096},
+         {"name": "memlock", "soft": -1, "hard": -1}],
+    )
+    assert config["mem_limit"] == 1073741824
+    assert config["cpu_quota"] == 50000
+    assert config["cpu_period"] == 100000
+    assert "cpu_shares" not in config
+    assert config["ulimits"] == [
+        {"name": "memlock", "soft": -1, "hard": -1},
+        {"name": "nofile", "soft": 65536, "hard": 65536},
+    ]
+
+
+def test_get_resource_config_empty():
+    from gluuengine.dockerclient._docker import get_resource_config
+    assert get_resource_config() == {"ulimits": []}
+
+
+def test_ensure_network(monkeypatch):
+    from gluuengine.dockerclient import Docker
+
+    created = []
+
+    def networks(cls, names=None):
+        # partial names are matched as well
+        return [{"Name": "gluunet"}]
+
+    def create_network(cls, name, **kwargs):
+        created.append((cls.base_url, name,
+                        kwargs["ipam"]["Config"][0]["Subnet"]))
+
+    monkeypatch.setattr("docker.Client.networks", networks)
+    monkeypatch.setattr("docker.Client.create_network", create_network)
+
+    client = Docker({"base_url": "http://10.10.10.11:2375"},
+                    {"base_url": "http://10.10.10.10:3375"})
+    assert client.ensure_network("gluunet", "overlay", "10.0.8.0/21") is False
+    assert client.ensure_network("gluunet-edge", "overlay", "10.0.16.0/22") is True
+    assert created == [("http://10.10.10.10:3375", "gluunet-edge",
+                        "10.0.16.0/22")]
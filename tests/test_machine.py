@@ -0,0 +1,40 @@
+class FakeNode(object):
+    name = "worker-node"
+    type = "worker"
+
+
+class FakeProvider(object):
+    driver = "generic"
+    generic_ip_address = "10.0.0.2"
+    generic_ssh_key = "/root/.ssh/id_rsa"
+    generic_ssh_user = "root"
+    generic_ssh_port = 22
+
+
+class FakeDiscovery(object):
+    ip = "10.0.0.1"
+    port = 8500
+
+
+def test_create_engine_opts(monkeypatch):
+    from gluuengine.machine import Machine
+
+    cmds = []
+    monkeypatch.setattr(Machine, "_run",
+                        lambda self, cmd, raise_error=True: cmds.append(cmd))
+
+    Machine().create(FakeNode(), FakeProvider(), FakeDiscovery(),
+                     engine_opts=["userland-proxy=false"])
+    assert "--engine-opt=userland-proxy=false" in cmds[0]
+    assert cmds[0].endswith("worker-node")
+
+
+def test_create_without_engine_opts(monkeypatch):
+    from gluuengine.machine import Machine
+
+    cmds = []
+    monkeypatch.setattr(Machine, "_run",
+                        lambda self, cmd, raise_error=True: cmds.append(cmd))
+
+    Machine().create(FakeNode(), FakeProvider(), FakeDiscovery())
+    assert "userland-proxy" not in cmds[0]
@@ -52,3 +52,62 @@ def test_decrypt_text():
     key = "123456789012345678901234"
     enc_text = "im6yqa0BROeTNcwvx4XCaw=="
     assert decrypt_text(enc_text, key) == "password"
+
+
+def test_get_current_date_cached(monkeypatch):
+    import time
+    from gluuengine import utils
+
+    calls = []
+
+    def fake_retrieve_current_date():
+        calls.append(1)
+        return int(time.time() * 1000)
+
+    monkeypatch.setattr("gluuengine.utils.retrieve_current_date",
+                        fake_retrieve_current_date)
+    monkeypatch.setattr("gluuengine.utils._license_clock",
+                        {"offset": None, "synced_at": 0})
+
+    utils.get_current_date()
+    utils.get_current_date()
+    assert len(calls) == 1
+
+
+def test_get_current_date_sync_failure(monkeypatch):
+    import time
+    from gluuengine import utils
+
+    calls = []
+
+    def fake_retrieve_current_date():
+        calls.append(1)
+        raise ValueError("No JSON object could be decoded")
+
+    monkeypatch.setattr("gluuengine.utils.retrieve_current_date",
+                        fake_retrieve_current_date)
+    monkeypatch.setattr("gluuengine.utils._license_clock",
+                        {"offset": 1000, "synced_at": 0})
+
+    now = int(time.time() * 1000)
+    assert utils.get_current_date() >= now + 1000
+    # failed re-synchronization is not retried on every call
+    utils.get_current_date()
+    assert len(calls) == 1
+
+
+def test_get_current_date_never_synced(monkeypatch):
+    import pytest
+    from requests.exceptions import ConnectionError
+    from gluuengine import utils
+
+    def fake_retrieve_current_date():
+        raise ConnectionError("license server is unreachable")
+
+    monkeypatch.setattr("gluuengine.utils.retrieve_current_date",
+                        fake_retrieve_current_date)
+    monkeypatch.setattr("gluuengine.utils._license_clock",
+                        {"offset": None, "synced_at": 0})
+
+    with pytest.raises(ConnectionError):
+        utils.get_current_date()